@@ -0,0 +1,57 @@
+"""
+Latency of scoring one client against the in-memory listing snapshot behind
+GET /clients/<id>/matches (the part that runs on every request once the
+snapshot is loaded).
+
+    python benchmarks/matching_bench.py [listings] [repeats]
+
+Fills the snapshot arrays directly, so no database is needed.
+"""
+import os
+import sys
+import time
+from decimal import Decimal
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from models.sql_models import Client  # noqa: E402
+from helpers.matching import PropertySnapshot  # noqa: E402
+
+
+def make_snapshot(count):
+    rng = np.random.default_rng(7)
+    snapshot = PropertySnapshot()
+    snapshot.ids = np.arange(1, count + 1, dtype=np.int64)
+    snapshot.price = rng.integers(8000, 120000, count).astype(float)
+    snapshot.bedrooms = rng.integers(0, 5, count).astype(float)
+    snapshot.bathrooms = rng.integers(1, 4, count).astype(float)
+    snapshot.size = rng.uniform(25, 250, count)
+    snapshot.area = rng.choice(np.array(["SK", "SL", "ST", "AR", "TL", "PT"], dtype=object), count)
+    snapshot.available = rng.random(count) < 0.7
+    # A few missing values, as in real data
+    snapshot.size[rng.random(count) < 0.05] = np.nan
+    return snapshot
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    snapshot = make_snapshot(count)
+    clients = {
+        "budget only": Client(budget=Decimal(30000)),
+        "every criterion": Client(budget=Decimal(30000), area="SK, SL", bedrooms=2, bath=2, size=Decimal(60)),
+    }
+    print(f"{count} listings, best and median of {repeats}")
+    for label, client in clients.items():
+        timings = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            snapshot.top_matches(client, 20)
+            timings.append(time.perf_counter() - started)
+        print(f"  {label:<16} best {min(timings) * 1000:6.2f} ms  median {np.median(timings) * 1000:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Throughput of the property list serialization: the hand-written dicts and
+standard library json the routes used before, against the shared
+serializer and orjson they use now.
+
+    python benchmarks/serializers_bench.py [rows] [repeats]
+
+Runs on transient Property objects, so no database is needed.
+"""
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from flask import Flask  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+from models.sql_models import Building, Property  # noqa: E402
+import helpers.building_cache as building_cache  # noqa: E402
+from helpers.json_provider import OrjsonProvider  # noqa: E402
+from helpers.serializers import serialize_property  # noqa: E402
+
+
+def legacy_serialize_property(prop):
+    # The per-route dict as it was written before helpers.serializers
+    return {
+        "id": prop.id,
+        "property_code": prop.property_code,
+        "building": building_cache.get_building_directory().name(prop.building_id, prop.building_name),
+        "building_id": prop.building_id,
+        "unit": prop.unit,
+        "owner": prop.owner,
+        "contact": prop.contact,
+        "size": float(prop.size) if prop.size else None,
+        "bedrooms": prop.bedrooms,
+        "bathrooms": prop.bathrooms,
+        "year_built": prop.year_built,
+        "floor": prop.floor,
+        "area": prop.area,
+        "status": prop.status,
+        "price": float(prop.price) if prop.price else None,
+        "sell_price": float(prop.sell_price) if prop.sell_price else None,
+        "sent": prop.sent,
+        "preferred_tenant": prop.preferred_tenant,
+        "photo_urls": prop.get_photo_urls(),
+        "photo_variants": prop.photo_variants or {},
+        "created_at": prop.created_at.strftime('%Y-%m-%d %H:%M:%S') if prop.created_at else None,
+    }
+
+
+def make_rows(count):
+    # Every column is set, as on rows loaded from the database
+    buildings = [Building(id=i + 1, name=f"Tower {i}") for i in range(50)]
+    building_cache._directory = building_cache.BuildingDirectory(buildings)
+    start = datetime(2024, 1, 1)
+    return [
+        Property(
+            id=i + 1,
+            property_code=f"P{i:06d}",
+            building_id=i % 50 + 1,
+            building_name=None,
+            unit=f"{i % 40}/{i % 7}",
+            owner=f"Owner {i % 997}",
+            contact="+66 81 234 5678",
+            size=Decimal("35.50") + i % 80,
+            bedrooms=i % 4 + 1,
+            bathrooms=i % 3 + 1,
+            year_built=1995 + i % 28,
+            floor=i % 40,
+            area=("Sukhumvit", "Silom", "Sathorn", "Ari")[i % 4],
+            status="Available" if i % 3 else "Rented",
+            price=Decimal(15000 + (i % 200) * 500),
+            sell_price=Decimal(3500000 + i * 10) if i % 2 else None,
+            sent=bool(i % 2),
+            preferred_tenant="Any",
+            # A dict, as the JSON column returns it
+            photo_urls={"main": [f"https://cdn.example.com/{i}/1.jpg"], "bedroom": [f"https://cdn.example.com/{i}/2.jpg"]},
+            photo_variants=None,
+            created_at=start + timedelta(minutes=i),
+        )
+        for i in range(count)
+    ]
+
+
+def best_of(repeats, func):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    rows = make_rows(count)
+    app = Flask(__name__)
+    stdlib, fast = DefaultJSONProvider(app), OrjsonProvider(app)
+
+    legacy = [legacy_serialize_property(prop) for prop in rows]
+    assert serialize_property.many(rows) == legacy
+    assert json.loads(fast.dumps(legacy)) == json.loads(stdlib.dumps(legacy))
+
+    cases = [
+        ("dicts: hand-written", lambda: [legacy_serialize_property(prop) for prop in rows]),
+        ("dicts: shared serializer", lambda: serialize_property.many(rows)),
+        ("encode: json", lambda: stdlib.dumps(legacy)),
+        ("encode: orjson", lambda: fast.dumps(legacy)),
+        ("total: hand-written + json", lambda: stdlib.dumps([legacy_serialize_property(prop) for prop in rows])),
+        ("total: serializer + orjson", lambda: fast.dumps(serialize_property.many(rows))),
+    ]
+    print(f"{count} properties, best of {repeats}")
+    results = {}
+    for label, func in cases:
+        seconds, _ = best_of(repeats, func)
+        results[label] = seconds
+        print(f"  {label:<30} {seconds * 1000:8.1f} ms  {count / seconds:>10,.0f} rows/s")
+    speedup = results["total: hand-written + json"] / results["total: serializer + orjson"]
+    print(f"  end to end speedup: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
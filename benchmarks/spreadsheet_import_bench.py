@@ -0,0 +1,72 @@
+"""
+Throughput of POST /properties/import: CSV parsing and row validation on
+their own, then the whole import (COPY into staging, reject steps, merge).
+
+    DATABASE_URL=postgresql://... python benchmarks/spreadsheet_import_bench.py [rows] [buildings]
+
+Needs a migrated scratch PostgreSQL database. The listings and buildings it
+creates carry a unique prefix and are deleted again afterwards.
+"""
+import csv
+import io
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sqlalchemy import text  # noqa: E402
+from app import app  # noqa: E402
+from database import db  # noqa: E402
+from helpers.spreadsheet_import import _Report, _valid_batches, import_spreadsheet, iter_csv_rows  # noqa: E402
+
+
+def make_csv(count, buildings, prefix):
+    # About one row in 100 repeats an earlier code and one in 100 has no
+    # unit, so the reject steps have work to do
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["Property Code", "Building", "Unit", "Bedrooms", "Bathrooms", "Size", "Area",
+                     "Status", "Price", "Owner"])
+    for i in range(count):
+        code = f"{prefix}{i - 1 if i % 97 == 96 else i:07d}"
+        unit = "" if i % 89 == 42 else f"{i % 40}/{i % 7}"
+        writer.writerow([code, f"{prefix} Tower {i % buildings}", unit, i % 4 + 1, i % 3 + 1,
+                         35 + i % 80, ("SK", "SL", "ST", "AR")[i % 4], "Available",
+                         15000 + (i % 200) * 500, f"Owner {i % 997}"])
+    return buffer.getvalue().encode("utf-8")
+
+
+def cleanup(prefix):
+    with db.engine.begin() as connection:
+        connection.execute(text("DELETE FROM properties WHERE property_code LIKE :p"), {"p": f"{prefix}%"})
+        connection.execute(text("DELETE FROM buildings WHERE name LIKE :p"), {"p": f"{prefix} %"})
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    buildings = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    prefix = f"B{uuid.uuid4().hex[:6].upper()}"
+    data = make_csv(count, buildings, prefix)
+    print(f"{count} rows, {buildings} new buildings, {len(data) / 1e6:.1f} MB of CSV")
+
+    started = time.perf_counter()
+    valid = sum(len(batch) for batch in _valid_batches(iter_csv_rows(io.BytesIO(data)), _Report()))
+    parse_seconds = time.perf_counter() - started
+    print(f"  parse + validate  {parse_seconds:8.2f} s  {count / parse_seconds:>10,.0f} rows/s  ({valid} valid)")
+
+    with app.app_context():
+        try:
+            started = time.perf_counter()
+            report = import_spreadsheet(iter_csv_rows(io.BytesIO(data)))
+            import_seconds = time.perf_counter() - started
+            print(f"  full import       {import_seconds:8.2f} s  {count / import_seconds:>10,.0f} rows/s")
+            print(f"  counts: {report['counts']}, buildings created: {report['buildings_created']}")
+        finally:
+            db.session.remove()
+            cleanup(prefix)
+
+
+if __name__ == "__main__":
+    main()
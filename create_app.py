@@ -2,12 +2,21 @@ from flask import Flask
 from flask_cors import CORS
 from config import Config
 from database import db, bcrypt
+from database.migrate import init_migrations
+from helpers.analytics import init_analytics
+from helpers.bulk_sql import check_upsert_support
+from helpers.json_provider import OrjsonProvider
+from helpers.metrics import init_metrics
+from helpers.notifications import init_notifications
 import os
 
 
 def create_app():
     app = Flask(__name__)
 
+    # Faster JSON encoding for jsonify() and the streamed list responses
+    app.json = OrjsonProvider(app)
+
     # Apply configuration from Config class
     app.config.from_object(Config)
 
@@ -15,6 +24,21 @@ def create_app():
     db.init_app(app)
     bcrypt.init_app(app)
 
+    # The bulk import, batch assign and version counters all rely on ON CONFLICT
+    check_upsert_support(app)
+
+    # Request latency, status and SQL statistics exposed on /metrics
+    init_metrics(app)
+
+    # Per-worker LISTEN/NOTIFY thread that keeps in-process caches coherent
+    init_notifications(app)
+
+    # Refreshes the /analytics materialized views in the background after writes
+    init_analytics(app)
+
+    # `flask db upgrade` / `flask db status` / `flask db check-plans`
+    init_migrations(app)
+
     #    # Fetch allowed origins from environment variable and split them into a list
     allowed_origins = os.getenv("CORS_ORIGINS", "").split(",")  # Split by comma
 
@@ -1,7 +1,8 @@
 # database/__init__.py
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
+from database.session import RequestSession
 
 # Initialize SQLAlchemy and Bcrypt
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RequestSession})
 bcrypt = Bcrypt()
@@ -0,0 +1,26 @@
+# database/analytics.py
+# Materialized views behind GET /analytics. They are refreshed CONCURRENTLY
+# (readers are never blocked) by helpers/analytics.py shortly after writes,
+# so the endpoint only ever reads a few small precomputed tables. The views
+# are created by database/migrations (0010, 0014); changing one means a new
+# migration.
+
+# Listing counts per status, per area and per bedroom count, plus the total
+PROPERTY_COUNTS_VIEW = "analytics_property_counts"
+# Per building: listings, listings with a rent (rental_priced_listings) or sale
+# price, and the rent and sale price percentiles
+BUILDING_PRICES_VIEW = "analytics_building_prices"
+# Assigned and active listings per client
+CLIENT_ASSIGNMENTS_VIEW = "analytics_client_assignments"
+# The resource versions the views above were last refreshed from
+SOURCE_VERSIONS_VIEW = "analytics_source_versions"
+
+# Collection version keys (helpers/versioning.py) the views are built from
+ANALYTICS_SOURCES = ("properties", "clients", "buildings")
+
+# Refreshed in this order; SOURCE_VERSIONS_VIEW first, so the versions it
+# records are never newer than the data refreshed after it
+ANALYTICS_VIEWS = (SOURCE_VERSIONS_VIEW, PROPERTY_COUNTS_VIEW, BUILDING_PRICES_VIEW, CLIENT_ASSIGNMENTS_VIEW)
+
+# Percentiles in BUILDING_PRICES_VIEW (rent_p25, ..., sale_p90)
+PERCENTILES = (0.25, 0.5, 0.75, 0.9)
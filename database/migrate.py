@@ -0,0 +1,190 @@
+# database/migrate.py
+# Versioned schema migrations. Each module in database/migrations is named
+# NNNN_description.py and defines upgrade(connection); the runner applies
+# the ones not yet recorded in schema_migrations, in order, each in its own
+# transaction. A module that sets TRANSACTIONAL = False (e.g. for
+# CREATE INDEX CONCURRENTLY) runs on an autocommit connection instead, so
+# its statements must be safe to re-run if it fails part way.
+#
+#   flask --app app db upgrade        apply pending migrations
+#   flask --app app db status         list applied and pending migrations
+#   flask --app app db check-plans    EXPLAIN every route's queries (see database/query_plans.py)
+#   flask --app app db refresh-analytics   refresh the /analytics materialized views now
+
+import importlib
+import pkgutil
+import re
+from datetime import datetime
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import text
+from database import db
+from models.sql_models import SchemaMigration
+
+MIGRATIONS_PACKAGE = "database.migrations"
+# Held for the whole run so two deploys never migrate at the same time
+MIGRATION_LOCK_ID = 7_424_001
+
+_MODULE_NAME = re.compile(r"^(\d{4})_(\w+)$")
+
+
+class Migration:
+    def __init__(self, version, name, module):
+        self.version = version
+        self.name = name
+        self.module = module
+        self.transactional = getattr(module, "TRANSACTIONAL", True)
+        self.description = (module.__doc__ or name).strip().splitlines()[0]
+
+
+def discover_migrations():
+    """Every migration module, ordered by version. Raises on duplicate versions."""
+    package = importlib.import_module(MIGRATIONS_PACKAGE)
+    migrations = {}
+    for info in pkgutil.iter_modules(package.__path__):
+        match = _MODULE_NAME.match(info.name)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise RuntimeError(f"Duplicate migration version {version}: {info.name}")
+        module = importlib.import_module(f"{MIGRATIONS_PACKAGE}.{info.name}")
+        migrations[version] = Migration(version, match.group(2), module)
+    return [migrations[version] for version in sorted(migrations)]
+
+
+def applied_versions(connection):
+    SchemaMigration.__table__.create(connection, checkfirst=True)
+    return {row.version for row in connection.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def upgrade(engine, target=None):
+    """
+    Apply pending migrations up to target (default: all). Returns the
+    versions applied.
+    """
+    applied = []
+    with engine.connect() as lock_connection:
+        postgres = engine.dialect.name == "postgresql"
+        if postgres:
+            lock_connection.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+            lock_connection.commit()
+        try:
+            with engine.begin() as connection:
+                done = applied_versions(connection)
+            for migration in discover_migrations():
+                if migration.version in done or (target is not None and migration.version > target):
+                    continue
+                print(f"[MIGRATE] Applying {migration.version:04d} {migration.name}: {migration.description}")
+                if migration.transactional:
+                    with engine.begin() as connection:
+                        migration.module.upgrade(connection)
+                        _record(connection, migration)
+                else:
+                    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+                        migration.module.upgrade(connection)
+                    with engine.begin() as connection:
+                        _record(connection, migration)
+                applied.append(migration.version)
+        finally:
+            if postgres:
+                lock_connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+                lock_connection.commit()
+    print(f"[MIGRATE] {len(applied)} migration(s) applied.")
+    return applied
+
+
+def _record(connection, migration):
+    connection.execute(
+        SchemaMigration.__table__.insert().values(
+            version=migration.version, name=migration.name, applied_at=datetime.utcnow()
+        )
+    )
+
+
+# ----------------------------------------
+# Helpers for migration modules
+# ----------------------------------------
+def create_index(connection, name, definition, unique=False, concurrently=False):
+    """
+    CREATE [UNIQUE] INDEX name unless a valid index of that name exists.
+    definition is everything after the name ("ON properties (status)"). An
+    invalid index left behind by a failed concurrent build is dropped and
+    built again.
+    """
+    if connection.dialect.name == "postgresql":
+        valid = connection.execute(
+            text(
+                "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = :name AND pg_table_is_visible(c.oid)"
+            ),
+            {"name": name},
+        ).scalar()
+        if valid:
+            return
+        if valid is False:
+            print(f"[MIGRATE] Rebuilding invalid index {name}.")
+            connection.execute(text(f"DROP INDEX {'CONCURRENTLY ' if concurrently else ''}IF EXISTS {name}"))
+    else:
+        concurrently = False
+    connection.execute(text(
+        f"CREATE {'UNIQUE ' if unique else ''}INDEX {'CONCURRENTLY ' if concurrently else ''}"
+        f"IF NOT EXISTS {name} {definition}"
+    ))
+
+
+def add_column(connection, table, column, column_type):
+    connection.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {column_type}"))
+
+
+# ----------------------------------------
+# CLI
+# ----------------------------------------
+def init_migrations(app):
+    """Register the `flask db ...` commands."""
+    app.cli.add_command(db_cli)
+
+
+@click.group("db")
+def db_cli():
+    """Schema migrations and query plan checks."""
+
+
+@db_cli.command("upgrade")
+@click.option("--target", type=int, default=None, help="Stop after this migration version.")
+@with_appcontext
+def upgrade_command(target):
+    """Apply pending migrations."""
+    upgrade(db.engine, target)
+
+
+@db_cli.command("status")
+@with_appcontext
+def status_command():
+    """List migrations and whether each is applied."""
+    with db.engine.begin() as connection:
+        done = applied_versions(connection)
+    for migration in discover_migrations():
+        state = "applied" if migration.version in done else "pending"
+        click.echo(f"{migration.version:04d} {state:<8} {migration.name}: {migration.description}")
+
+
+@db_cli.command("check-plans")
+@with_appcontext
+def check_plans_command():
+    """EXPLAIN every route's queries; exit 1 if any plans a sequential scan."""
+    from flask import current_app
+    from database.query_plans import check_query_plans
+
+    problems = check_query_plans(current_app)
+    if problems:
+        raise SystemExit(1)
+
+
+@db_cli.command("refresh-analytics")
+@with_appcontext
+def refresh_analytics_command():
+    """Refresh the /analytics materialized views now."""
+    from helpers.analytics import refresh_analytics
+
+    click.echo(refresh_analytics(db.engine))
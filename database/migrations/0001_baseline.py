@@ -0,0 +1,97 @@
+"""Create the tables the app started with: users, clients, buildings, properties and client_properties."""
+from sqlalchemy import text
+
+# The schema as it stood before versioned migrations, pinned here so the
+# later migrations each add exactly their own change on top of it. IF NOT
+# EXISTS leaves the tables of a database that predates migrations alone.
+BASELINE_DDL = (
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id SERIAL PRIMARY KEY,
+        user_uuid VARCHAR(36) NOT NULL UNIQUE,
+        password_hash TEXT NOT NULL,
+        first_name VARCHAR(100) NOT NULL,
+        last_name VARCHAR(100) NOT NULL,
+        email VARCHAR(255) NOT NULL UNIQUE,
+        created_at TIMESTAMP WITHOUT TIME ZONE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS clients (
+        id SERIAL PRIMARY KEY,
+        code VARCHAR(50) NOT NULL UNIQUE,
+        title VARCHAR(10),
+        first_name VARCHAR(100) NOT NULL,
+        last_name VARCHAR(100) NOT NULL,
+        nationality VARCHAR(100),
+        contact_type VARCHAR(50),
+        contact VARCHAR(100) NOT NULL,
+        starting_date DATE,
+        move_in DATE,
+        budget NUMERIC(10, 2),
+        bedrooms INTEGER,
+        bath INTEGER,
+        area VARCHAR(50),
+        size NUMERIC(10, 2),
+        preferred TEXT,
+        status VARCHAR(100),
+        work_sheet VARCHAR(255),
+        created_at TIMESTAMP WITHOUT TIME ZONE,
+        login_link VARCHAR(255),
+        access_key VARCHAR(50)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS buildings (
+        id SERIAL PRIMARY KEY,
+        name VARCHAR(255) NOT NULL UNIQUE,
+        year_built INTEGER,
+        nearest_bts VARCHAR(100),
+        nearest_mrt VARCHAR(100),
+        distance_to_bts NUMERIC(10, 2),
+        distance_to_mrt NUMERIC(10, 2),
+        facilities JSON,
+        photo_urls JSON,
+        created_at TIMESTAMP WITHOUT TIME ZONE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS properties (
+        id SERIAL PRIMARY KEY,
+        property_code VARCHAR(50) NOT NULL UNIQUE,
+        building_id INTEGER NOT NULL REFERENCES buildings (id),
+        building_name VARCHAR(255),
+        unit VARCHAR(50) NOT NULL,
+        owner VARCHAR(255),
+        contact VARCHAR(100),
+        size NUMERIC(10, 2),
+        bedrooms INTEGER,
+        bathrooms INTEGER,
+        year_built INTEGER,
+        floor INTEGER,
+        area VARCHAR(2),
+        status VARCHAR(100),
+        price NUMERIC(10, 2),
+        sell_price NUMERIC(10, 2),
+        preferred_tenant TEXT,
+        sent VARCHAR(3),
+        photo_urls JSON,
+        created_at TIMESTAMP WITHOUT TIME ZONE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS client_properties (
+        id SERIAL PRIMARY KEY,
+        client_id INTEGER NOT NULL REFERENCES clients (id) ON DELETE CASCADE,
+        property_id INTEGER NOT NULL REFERENCES properties (id) ON DELETE CASCADE,
+        comment TEXT,
+        created_at TIMESTAMP WITHOUT TIME ZONE,
+        is_active BOOLEAN NOT NULL
+    )
+    """,
+)
+
+
+def upgrade(connection):
+    for statement in BASELINE_DDL:
+        connection.execute(text(statement))
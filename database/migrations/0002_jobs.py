@@ -0,0 +1,22 @@
+"""Create the jobs table for the background job runner (helpers/jobs.py)."""
+from sqlalchemy import text
+
+CREATE_JOBS = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id VARCHAR(36) PRIMARY KEY,
+        kind VARCHAR(50) NOT NULL,
+        status VARCHAR(20) NOT NULL,
+        total INTEGER,
+        processed INTEGER NOT NULL,
+        counts JSON,
+        errors JSON,
+        result JSON,
+        created_at TIMESTAMP WITHOUT TIME ZONE,
+        started_at TIMESTAMP WITHOUT TIME ZONE,
+        finished_at TIMESTAMP WITHOUT TIME ZONE
+    )
+"""
+
+
+def upgrade(connection):
+    connection.execute(text(CREATE_JOBS))
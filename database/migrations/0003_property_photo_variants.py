@@ -0,0 +1,6 @@
+"""Add properties.photo_variants (original URL -> resized/re-encoded variant URLs)."""
+from database.migrate import add_column
+
+
+def upgrade(connection):
+    add_column(connection, "properties", "photo_variants", "JSON")
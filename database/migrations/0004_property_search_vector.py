@@ -0,0 +1,58 @@
+"""Add the trigger-maintained full-text search_vector to properties."""
+from sqlalchemy import text
+from database.migrate import add_column, create_index
+
+# Pinned as first shipped; later changes to these objects get their own
+# migrations (0011 replaces the building rename trigger)
+SEARCH_DDL = (
+    """
+    CREATE OR REPLACE FUNCTION properties_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', coalesce(
+                (SELECT b.name FROM buildings b WHERE b.id = NEW.building_id), NEW.building_name, '')), 'A') ||
+            setweight(to_tsvector('simple', NEW.property_code || ' ' || coalesce(NEW.unit, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(NEW.owner, '')), 'B') ||
+            setweight(to_tsvector('simple', coalesce(NEW.area, '') || ' ' || coalesce(NEW.status, '')), 'C') ||
+            setweight(to_tsvector('simple', coalesce(NEW.preferred_tenant, '')), 'D');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    DROP TRIGGER IF EXISTS properties_search_vector_trg ON properties
+    """,
+    """
+    CREATE TRIGGER properties_search_vector_trg
+    BEFORE INSERT OR UPDATE OF property_code, building_id, building_name, unit, owner, area, status, preferred_tenant
+    ON properties FOR EACH ROW EXECUTE FUNCTION properties_search_vector_update()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION buildings_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        UPDATE properties SET building_id = building_id WHERE building_id = NEW.id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    DROP TRIGGER IF EXISTS buildings_search_vector_trg ON buildings
+    """,
+    """
+    CREATE TRIGGER buildings_search_vector_trg
+    AFTER UPDATE OF name ON buildings
+    FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION buildings_search_vector_update()
+    """,
+)
+
+
+def upgrade(connection):
+    if connection.dialect.name != "postgresql":
+        return
+    add_column(connection, "properties", "search_vector", "TSVECTOR")
+    for statement in SEARCH_DDL:
+        connection.execute(text(statement))
+    # Fill search_vector for rows written before the trigger existed
+    connection.execute(text("UPDATE properties SET unit = unit WHERE search_vector IS NULL"))
+    create_index(connection, "ix_properties_search_vector", "ON properties USING gin (search_vector)")
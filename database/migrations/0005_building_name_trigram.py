@@ -0,0 +1,10 @@
+"""Add the pg_trgm index behind building autocomplete and name search."""
+from sqlalchemy import text
+from database.migrate import create_index
+
+
+def upgrade(connection):
+    if connection.dialect.name != "postgresql":
+        return
+    connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    create_index(connection, "ix_buildings_name_trgm", "ON buildings USING gin (name gin_trgm_ops)")
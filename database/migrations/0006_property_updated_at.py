@@ -0,0 +1,8 @@
+"""Add properties.updated_at, backfilled from created_at."""
+from sqlalchemy import text
+from database.migrate import add_column
+
+
+def upgrade(connection):
+    add_column(connection, "properties", "updated_at", "TIMESTAMP WITHOUT TIME ZONE")
+    connection.execute(text("UPDATE properties SET updated_at = created_at WHERE updated_at IS NULL"))
@@ -0,0 +1,98 @@
+"""Add the trigger-maintained pgvector embedding and its HNSW index to properties."""
+from sqlalchemy import text
+from database.migrate import add_column, create_index
+
+# Pinned as first shipped; later changes to these objects get their own
+# migrations (0012 replaces the building trigger).
+
+# (column expression, scale, low, high): each feature is mapped onto 0..1
+# between low and high; "log" features are compared on a log scale so a
+# 5,000 THB gap matters more at 15,000 than at 150,000. Missing values sit in
+# the middle (0.5) so they neither attract nor repel.
+EMBEDDING_FEATURES = (
+    ("NEW.price", "log", 5000, 1000000),
+    ("NEW.sell_price", "log", 500000, 200000000),
+    ("NEW.size", "log", 20, 1000),
+    ("NEW.bedrooms", "linear", 0, 6),
+    ("NEW.bathrooms", "linear", 0, 6),
+    ("NEW.floor", "linear", 0, 80),
+    ("NEW.year_built", "linear", 1970, 2030),
+    ("bts", "linear", 0, 3),
+    ("mrt", "linear", 0, 3),
+)
+# Area codes are one-hot encoded into a fixed number of hashed buckets
+AREA_BUCKETS = 8
+EMBEDDING_DIMENSIONS = len(EMBEDDING_FEATURES) + AREA_BUCKETS
+
+
+def _feature_sql(expression, scale, low, high):
+    if scale == "log":
+        expression, low, high = f"ln(1 + {expression})", f"ln(1 + {low})", f"ln(1 + {high})"
+    return (
+        f"CASE WHEN {expression} IS NULL THEN 0.5 "
+        f"ELSE least(greatest(({expression}::numeric - {low}) / ({high} - {low}), 0), 1) END"
+    )
+
+
+PROPERTY_EMBEDDING_DDL = (
+    f"""
+    CREATE OR REPLACE FUNCTION properties_embedding_update() RETURNS trigger AS $$
+    DECLARE
+        bts numeric;
+        mrt numeric;
+        features real[];
+    BEGIN
+        SELECT b.distance_to_bts, b.distance_to_mrt INTO bts, mrt
+        FROM buildings b WHERE b.id = NEW.building_id;
+        features := ARRAY[
+            {", ".join(_feature_sql(*feature) for feature in EMBEDDING_FEATURES)}
+        ]::real[] || array_fill(0::real, ARRAY[{AREA_BUCKETS}]);
+        IF coalesce(NEW.area, '') <> '' THEN
+            features[{len(EMBEDDING_FEATURES) + 1} + mod(get_byte(decode(md5(upper(NEW.area)), 'hex'), 0), {AREA_BUCKETS})] := 1;
+        END IF;
+        NEW.embedding := features::vector;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    DROP TRIGGER IF EXISTS properties_embedding_trg ON properties
+    """,
+    """
+    CREATE TRIGGER properties_embedding_trg
+    BEFORE INSERT OR UPDATE OF price, sell_price, size, bedrooms, bathrooms, floor, year_built, area, building_id
+    ON properties FOR EACH ROW EXECUTE FUNCTION properties_embedding_update()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION buildings_embedding_update() RETURNS trigger AS $$
+    BEGIN
+        UPDATE properties SET building_id = building_id WHERE building_id = NEW.id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    DROP TRIGGER IF EXISTS buildings_embedding_trg ON buildings
+    """,
+    """
+    CREATE TRIGGER buildings_embedding_trg
+    AFTER UPDATE OF distance_to_bts, distance_to_mrt ON buildings
+    FOR EACH ROW WHEN (OLD.distance_to_bts IS DISTINCT FROM NEW.distance_to_bts
+                       OR OLD.distance_to_mrt IS DISTINCT FROM NEW.distance_to_mrt)
+    EXECUTE FUNCTION buildings_embedding_update()
+    """,
+)
+
+
+def upgrade(connection):
+    if connection.dialect.name != "postgresql":
+        return
+    connection.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+    add_column(connection, "properties", "embedding", f"vector({EMBEDDING_DIMENSIONS})")
+    for statement in PROPERTY_EMBEDDING_DDL:
+        connection.execute(text(statement))
+    # Fill embedding for rows written before the trigger existed
+    connection.execute(text("UPDATE properties SET area = area WHERE embedding IS NULL"))
+    create_index(
+        connection, "ix_properties_embedding_hnsw", "ON properties USING hnsw (embedding vector_l2_ops)"
+    )
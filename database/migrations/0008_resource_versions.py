@@ -0,0 +1,14 @@
+"""Create resource_versions, the per-resource change counters behind ETags (helpers/versioning.py)."""
+from sqlalchemy import text
+
+CREATE_RESOURCE_VERSIONS = """
+    CREATE TABLE IF NOT EXISTS resource_versions (
+        resource VARCHAR(100) PRIMARY KEY,
+        version BIGINT NOT NULL,
+        updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL
+    )
+"""
+
+
+def upgrade(connection):
+    connection.execute(text(CREATE_RESOURCE_VERSIONS))
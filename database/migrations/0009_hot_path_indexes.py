@@ -0,0 +1,47 @@
+"""Index the link table and the property list filters."""
+from sqlalchemy import text
+from database.migrate import create_index
+
+# Built CONCURRENTLY so the tables stay writable while the indexes build
+TRANSACTIONAL = False
+
+PROPERTY_INDEXES = (
+    ("ix_properties_building_id", "ON properties (building_id)"),
+    ("ix_properties_status", "ON properties (status)"),
+    ("ix_properties_area", "ON properties (area)"),
+    ("ix_properties_price", "ON properties (price)"),
+    ("ix_properties_created_at_id", "ON properties (created_at, id)"),
+    ("ix_properties_updated_at", "ON properties (updated_at)"),
+)
+
+# Keep one link per (client, property): the active one, then the one with a
+# comment, then the oldest
+DELETE_DUPLICATE_LINKS = """
+    DELETE FROM client_properties
+    WHERE id IN (
+        SELECT id FROM (
+            SELECT id, row_number() OVER (
+                PARTITION BY client_id, property_id
+                ORDER BY is_active DESC, (comment IS NOT NULL) DESC, id
+            ) AS position
+            FROM client_properties
+        ) ranked
+        WHERE position > 1
+    )
+"""
+
+
+def upgrade(connection):
+    removed = connection.execute(text(DELETE_DUPLICATE_LINKS)).rowcount
+    if removed:
+        print(f"[MIGRATE] Removed {removed} duplicate client/property links.")
+    create_index(
+        connection, "ux_client_properties_client_property", "ON client_properties (client_id, property_id)",
+        unique=True, concurrently=True,
+    )
+    create_index(
+        connection, "ix_client_properties_property_id", "ON client_properties (property_id)",
+        concurrently=True,
+    )
+    for name, definition in PROPERTY_INDEXES:
+        create_index(connection, name, definition, concurrently=True)
@@ -0,0 +1,97 @@
+"""Create the materialized views behind GET /analytics."""
+from sqlalchemy import text
+
+# Pinned as first shipped; the view names are the ones database/analytics.py
+# refreshes
+SOURCE_VERSIONS_VIEW = "analytics_source_versions"
+PROPERTY_COUNTS_VIEW = "analytics_property_counts"
+BUILDING_PRICES_VIEW = "analytics_building_prices"
+CLIENT_ASSIGNMENTS_VIEW = "analytics_client_assignments"
+ANALYTICS_SOURCES = ("properties", "clients", "buildings")
+PERCENTILES = (0.25, 0.5, 0.75, 0.9)
+
+
+def _percentile_columns(column, prefix):
+    return ", ".join(
+        f"{prefix}[{i + 1}] AS {column}_p{int(p * 100)}" for i, p in enumerate(PERCENTILES)
+    )
+
+
+# Every view needs a unique index on plain columns for REFRESH ... CONCURRENTLY
+ANALYTICS_DDL = (
+    f"""
+    CREATE MATERIALIZED VIEW IF NOT EXISTS {SOURCE_VERSIONS_VIEW} AS
+    SELECT resource, version, now() AS refreshed_at
+    FROM resource_versions
+    WHERE resource IN ({", ".join(f"'{source}'" for source in ANALYTICS_SOURCES)})
+    """,
+    f"""
+    CREATE UNIQUE INDEX IF NOT EXISTS ux_{SOURCE_VERSIONS_VIEW} ON {SOURCE_VERSIONS_VIEW} (resource)
+    """,
+    f"""
+    CREATE MATERIALIZED VIEW IF NOT EXISTS {PROPERTY_COUNTS_VIEW} AS
+    SELECT
+        CASE
+            WHEN grouping(status) = 0 THEN 'status'
+            WHEN grouping(area) = 0 THEN 'area'
+            WHEN grouping(bedrooms) = 0 THEN 'bedrooms'
+            ELSE 'total'
+        END AS dimension,
+        coalesce(status, area, bedrooms::text) AS value,
+        count(*) AS listings
+    FROM properties
+    GROUP BY GROUPING SETS ((status), (area), (bedrooms), ())
+    """,
+    f"""
+    CREATE UNIQUE INDEX IF NOT EXISTS ux_{PROPERTY_COUNTS_VIEW} ON {PROPERTY_COUNTS_VIEW} (dimension, value)
+    """,
+    f"""
+    CREATE MATERIALIZED VIEW IF NOT EXISTS {BUILDING_PRICES_VIEW} AS
+    SELECT
+        building_id, building, listings, rented_listings, for_sale_listings,
+        {_percentile_columns("rent", "rent")},
+        {_percentile_columns("sale", "sale")}
+    FROM (
+        SELECT
+            b.id AS building_id,
+            b.name AS building,
+            count(p.id) AS listings,
+            count(p.id) FILTER (WHERE p.price > 0) AS rented_listings,
+            count(p.id) FILTER (WHERE p.sell_price > 0) AS for_sale_listings,
+            percentile_cont(ARRAY{list(PERCENTILES)}) WITHIN GROUP (ORDER BY p.price)
+                FILTER (WHERE p.price > 0) AS rent,
+            percentile_cont(ARRAY{list(PERCENTILES)}) WITHIN GROUP (ORDER BY p.sell_price)
+                FILTER (WHERE p.sell_price > 0) AS sale
+        FROM buildings b
+        LEFT JOIN properties p ON p.building_id = b.id
+        GROUP BY b.id, b.name
+    ) per_building
+    """,
+    f"""
+    CREATE UNIQUE INDEX IF NOT EXISTS ux_{BUILDING_PRICES_VIEW} ON {BUILDING_PRICES_VIEW} (building_id)
+    """,
+    f"""
+    CREATE MATERIALIZED VIEW IF NOT EXISTS {CLIENT_ASSIGNMENTS_VIEW} AS
+    SELECT
+        c.id AS client_id,
+        c.code,
+        c.first_name,
+        c.last_name,
+        c.status,
+        count(cp.id) AS assigned,
+        count(cp.id) FILTER (WHERE cp.is_active) AS active
+    FROM clients c
+    LEFT JOIN client_properties cp ON cp.client_id = c.id
+    GROUP BY c.id
+    """,
+    f"""
+    CREATE UNIQUE INDEX IF NOT EXISTS ux_{CLIENT_ASSIGNMENTS_VIEW} ON {CLIENT_ASSIGNMENTS_VIEW} (client_id)
+    """,
+)
+
+
+def upgrade(connection):
+    if connection.dialect.name != "postgresql":
+        return
+    for statement in ANALYTICS_DDL:
+        connection.execute(text(statement))
@@ -0,0 +1,50 @@
+"""Re-index a renamed building's properties by writing only their search_vector."""
+from sqlalchemy import text
+
+# The building name is passed in, so a rename no longer has to touch
+# building_id (which rewrote every listing of the building and fired the
+# embedding trigger as well) just to get the property trigger to run.
+SEARCH_DDL = (
+    """
+    CREATE OR REPLACE FUNCTION property_search_vector(
+        building text, property_code text, unit text, owner text, area text, status text, preferred_tenant text
+    ) RETURNS tsvector AS $$
+        SELECT
+            setweight(to_tsvector('simple', coalesce(building, '')), 'A') ||
+            setweight(to_tsvector('simple', property_code || ' ' || coalesce(unit, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(owner, '')), 'B') ||
+            setweight(to_tsvector('simple', coalesce(area, '') || ' ' || coalesce(status, '')), 'C') ||
+            setweight(to_tsvector('simple', coalesce(preferred_tenant, '')), 'D')
+    $$ LANGUAGE sql IMMUTABLE
+    """,
+    """
+    CREATE OR REPLACE FUNCTION properties_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := property_search_vector(
+            coalesce((SELECT b.name FROM buildings b WHERE b.id = NEW.building_id), NEW.building_name),
+            NEW.property_code, NEW.unit, NEW.owner, NEW.area, NEW.status, NEW.preferred_tenant
+        );
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION buildings_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        UPDATE properties
+        SET search_vector = property_search_vector(
+            NEW.name, property_code, unit, owner, area, status, preferred_tenant
+        )
+        WHERE building_id = NEW.id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+)
+
+
+def upgrade(connection):
+    if connection.dialect.name != "postgresql":
+        return
+    for statement in SEARCH_DDL:
+        connection.execute(text(statement))
@@ -0,0 +1,86 @@
+"""Re-embed a building's properties by writing only their embedding when its transit distances change."""
+from sqlalchemy import text
+
+# Same features, scales and buckets as 0007, moved into a function of the
+# values alone. The building trigger passes the new distances in, so it no
+# longer touches building_id (which rewrote every listing of the building
+# and fired the search trigger as well) to get the property trigger to run.
+EMBEDDING_FEATURES = (
+    ("price", "log", 5000, 1000000),
+    ("sell_price", "log", 500000, 200000000),
+    ("size", "log", 20, 1000),
+    ("bedrooms", "linear", 0, 6),
+    ("bathrooms", "linear", 0, 6),
+    ("floor", "linear", 0, 80),
+    ("year_built", "linear", 1970, 2030),
+    ("bts", "linear", 0, 3),
+    ("mrt", "linear", 0, 3),
+)
+AREA_BUCKETS = 8
+
+
+def _feature_sql(expression, scale, low, high):
+    if scale == "log":
+        expression, low, high = f"ln(1 + {expression})", f"ln(1 + {low})", f"ln(1 + {high})"
+    return (
+        f"CASE WHEN {expression} IS NULL THEN 0.5 "
+        f"ELSE least(greatest(({expression}::numeric - {low}) / ({high} - {low}), 0), 1) END"
+    )
+
+
+EMBEDDING_DDL = (
+    f"""
+    CREATE OR REPLACE FUNCTION property_embedding(
+        price numeric, sell_price numeric, size numeric, bedrooms integer, bathrooms integer,
+        floor integer, year_built integer, area text, bts numeric, mrt numeric
+    ) RETURNS vector AS $$
+    DECLARE
+        features real[];
+    BEGIN
+        features := ARRAY[
+            {", ".join(_feature_sql(*feature) for feature in EMBEDDING_FEATURES)}
+        ]::real[] || array_fill(0::real, ARRAY[{AREA_BUCKETS}]);
+        IF coalesce(area, '') <> '' THEN
+            features[{len(EMBEDDING_FEATURES) + 1} + mod(get_byte(decode(md5(upper(area)), 'hex'), 0), {AREA_BUCKETS})] := 1;
+        END IF;
+        RETURN features::vector;
+    END
+    $$ LANGUAGE plpgsql IMMUTABLE
+    """,
+    """
+    CREATE OR REPLACE FUNCTION properties_embedding_update() RETURNS trigger AS $$
+    DECLARE
+        bts numeric;
+        mrt numeric;
+    BEGIN
+        SELECT b.distance_to_bts, b.distance_to_mrt INTO bts, mrt
+        FROM buildings b WHERE b.id = NEW.building_id;
+        NEW.embedding := property_embedding(
+            NEW.price, NEW.sell_price, NEW.size, NEW.bedrooms, NEW.bathrooms,
+            NEW.floor, NEW.year_built, NEW.area, bts, mrt
+        );
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION buildings_embedding_update() RETURNS trigger AS $$
+    BEGIN
+        UPDATE properties
+        SET embedding = property_embedding(
+            price, sell_price, size, bedrooms, bathrooms, floor, year_built, area,
+            NEW.distance_to_bts, NEW.distance_to_mrt
+        )
+        WHERE building_id = NEW.id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+)
+
+
+def upgrade(connection):
+    if connection.dialect.name != "postgresql":
+        return
+    for statement in EMBEDDING_DDL:
+        connection.execute(text(statement))
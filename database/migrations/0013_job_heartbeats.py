@@ -0,0 +1,12 @@
+"""Record which worker owns a job and when it last reported, so orphaned jobs can be failed."""
+from database.migrate import add_column, create_index
+
+
+def upgrade(connection):
+    add_column(connection, "jobs", "owner", "VARCHAR(100)")
+    add_column(connection, "jobs", "heartbeat_at", "TIMESTAMP WITHOUT TIME ZONE")
+    # The stale-job sweep only looks at unfinished jobs
+    create_index(
+        connection, "ix_jobs_unfinished_heartbeat",
+        "ON jobs (heartbeat_at) WHERE status IN ('queued', 'running')",
+    )
@@ -0,0 +1,15 @@
+"""
+Rename analytics_building_prices.rented_listings to rental_priced_listings.
+
+The column counts every listing with a rent price, whatever its status, so
+the old name overstated it.
+"""
+from sqlalchemy import text
+
+
+def upgrade(connection):
+    if connection.dialect.name != "postgresql":
+        return
+    connection.execute(text(
+        "ALTER MATERIALIZED VIEW analytics_building_prices RENAME COLUMN rented_listings TO rental_priced_listings"
+    ))
@@ -0,0 +1,11 @@
+"""Backfill properties.created_at and make it NOT NULL so keyset pagination can seek on (created_at, id)."""
+from sqlalchemy import text
+
+
+def upgrade(connection):
+    # Legacy rows without a created_at take their last update time (or now) instead
+    connection.execute(text(
+        "UPDATE properties SET created_at = COALESCE(updated_at, now() AT TIME ZONE 'utc') "
+        "WHERE created_at IS NULL"
+    ))
+    connection.execute(text("ALTER TABLE properties ALTER COLUMN created_at SET NOT NULL"))
@@ -0,0 +1,4 @@
+# database/migrations
+# Numbered schema migrations applied by database/migrate.py. Add a new
+# module as NNNN_description.py with a one-line docstring and an
+# upgrade(connection) function; never edit one that has shipped.
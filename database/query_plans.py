@@ -0,0 +1,137 @@
+# database/query_plans.py
+# `flask db check-plans`: drive every read route (and the link-table write
+# routes) through the test client against a seeded database, capture the
+# SQL each one runs, and EXPLAIN it with sequential scans disabled. The
+# planner then picks an index whenever one can serve the query, so a Seq
+# Scan that still applies a filter means no index covers that predicate.
+#
+# Run it against a disposable, seeded database: the write routes assign a
+# property to a client, update the link and remove it again.
+
+import json
+from sqlalchemy import event
+from database import db
+from helpers.pagination import encode_cursor
+from models.sql_models import Building, Client, ClientProperty, Property
+
+# Tables whose filtered scans are acceptable (bookkeeping, never large)
+SEQ_SCAN_ALLOWED = {"resource_versions", "schema_migrations"}
+
+
+def _route_checks(sample):
+    """(method, url, json body) for every route worth checking, filled in from the seeded rows."""
+    p, c, b, code, free, cursor = (
+        sample["property_id"], sample["client_id"], sample["building_id"], sample["client_code"],
+        sample["unassigned_property_id"], sample["cursor"],
+    )
+    return [
+        ("GET", "/properties?limit=20", None),
+        # Later pages seek on (created_at, id) instead of scanning past the cursor
+        ("GET", f"/properties?limit=20&cursor={cursor}", None),
+        ("GET", f"/properties?limit=20&status=Available&cursor={cursor}", None),
+        ("GET", "/properties?limit=20&status=Available", None),
+        ("GET", "/properties?limit=20&area=SK", None),
+        ("GET", f"/properties?limit=20&building_id={b}", None),
+        ("GET", "/properties?limit=20&min_price=10000&max_price=20000", None),
+        ("GET", "/properties?limit=20&fields=id,property_code,price", None),
+        ("GET", "/properties/search?q=tower&limit=20", None),
+        ("GET", f"/properties/{p}", None),
+        ("GET", f"/properties/{p}/similar?k=10", None),
+        ("GET", "/clients", None),
+        ("GET", f"/clients/{c}", None),
+        ("GET", f"/clients/{c}/matches?limit=20", None),
+        ("GET", f"/clients/code/{code}", None),
+        ("GET", "/buildings", None),
+        ("GET", "/buildings?search=tow", None),
+        ("GET", "/buildings/autocomplete?q=tower", None),
+        ("GET", f"/buildings/{b}", None),
+        ("GET", "/analytics", None),
+        ("POST", f"/clients/{c}/properties", {"property_id": free}),
+        ("PUT", f"/clients/{c}/properties/{free}/comment", {"comment": "plan check", "is_active": False}),
+        ("PATCH", f"/clients/{c}/properties/batch", {"updates": [{"property_id": free, "is_active": True}]}),
+        ("DELETE", f"/clients/{c}/properties/{free}", None),
+    ]
+
+
+def _sample_rows():
+    prop = db.session.query(Property.id, Property.building_id).order_by(Property.id).first()
+    oldest = db.session.query(Property.created_at, Property.id).order_by(Property.created_at, Property.id).first()
+    link = db.session.query(ClientProperty.client_id).first()
+    client_id = link.client_id if link else db.session.query(Client.id).order_by(Client.id).scalar()
+    if prop is None or client_id is None or db.session.query(Building.id).first() is None:
+        raise RuntimeError("check-plans needs a seeded database (properties, buildings and clients)")
+    assigned = db.session.query(ClientProperty.property_id).filter(ClientProperty.client_id == client_id)
+    free = (
+        db.session.query(Property.id)
+        .filter(Property.id.notin_(assigned))
+        .order_by(Property.id)
+        .limit(1)
+        .scalar()
+    )
+    return {
+        "property_id": prop.id,
+        "building_id": prop.building_id,
+        "client_id": client_id,
+        "client_code": db.session.query(Client.code).filter(Client.id == client_id).scalar(),
+        "unassigned_property_id": free or prop.id,
+        "cursor": encode_cursor(oldest.created_at, oldest.id),
+    }
+
+
+def _seq_scans(plan):
+    """
+    Relation names read by filtered Seq Scan nodes anywhere in a JSON plan.
+    A scan without a filter reads the whole table on purpose (GET /clients)
+    and no index would help it.
+    """
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and "Filter" in plan:
+        found.append(plan.get("Relation Name"))
+    for child in plan.get("Plans", ()):
+        found.extend(_seq_scans(child))
+    return found
+
+
+def check_query_plans(app):
+    """
+    Run every route check and EXPLAIN the statements it issued. Prints a
+    line per statement with a sequential scan and returns them as
+    (route, table, sql) tuples; an empty list means every plan uses indexes.
+    """
+    sample = _sample_rows()
+    db.session.remove()
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().split(None, 1)[0].upper() in ("SELECT", "UPDATE", "DELETE"):
+            captured.append((statement, parameters))
+
+    client = app.test_client()
+    problems = []
+    engine = db.engine
+    for method, url, body in _route_checks(sample):
+        captured.clear()
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            response = client.open(url, method=method, json=body)
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+        route = f"{method} {url}"
+        print(f"[PLANS] {route} -> {response.status_code}, {len(captured)} statement(s)")
+
+        with engine.connect() as connection:
+            # LOCAL: undone by the rollback below, so the pooled connection is left as it was
+            connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+            for statement, parameters in captured:
+                explained = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+                plan = (json.loads(explained) if isinstance(explained, str) else explained)[0]["Plan"]
+                for table in _seq_scans(plan):
+                    if table in SEQ_SCAN_ALLOWED:
+                        continue
+                    sql = " ".join(statement.split())
+                    print(f"[PLANS]   Seq Scan on {table}: {sql[:200]}")
+                    problems.append((route, table, sql))
+            connection.rollback()
+
+    print(f"[PLANS] {len(problems)} sequential scan(s) found.")
+    return problems
@@ -0,0 +1,9 @@
+# database/search.py
+# GET /properties/search. properties.search_vector is kept current by
+# triggers so every write path (ORM, bulk import, COPY merge, raw SQL)
+# indexes the row the same way. The column, the triggers and the GIN index
+# are created by database/migrations (0004, 0011).
+
+# 'simple' rather than a language config: names, units and area codes must
+# match as typed, not stemmed. The triggers index with the same config.
+SEARCH_CONFIG = "simple"
@@ -1,20 +1,39 @@
 # database/session.py
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, scoped_session
-import os
+from flask import has_request_context, request
+from flask_sqlalchemy.session import Session
 
-# Get the raw database URL from the environment
-raw_db_url = os.getenv("DATABASE_URL")
+# Requests with these methods never write, so their transactions run read-only
+READ_ONLY_METHODS = {"GET", "HEAD"}
 
-# If the URL starts with postgres://, replace it with postgresql://
-if raw_db_url and raw_db_url.startswith("postgres://"):
-    raw_db_url = raw_db_url.replace("postgres://", "postgresql://", 1)
+_read_only_engines = {}
 
-engine = create_engine(raw_db_url, pool_pre_ping=True)
 
-# Create a configured "Session" class
-SessionFactory = sessionmaker(bind=engine)
+def _read_only_engine(engine):
+    """
+    A view of the engine that shares its pool but opens PostgreSQL
+    transactions as BEGIN READ ONLY (psycopg2 sets this on the connection, so
+    it costs no extra round trip and is reset when the connection is returned).
+    """
+    if engine.dialect.name != "postgresql":
+        return engine
+    read_only = _read_only_engines.get(engine)
+    if read_only is None:
+        read_only = engine.execution_options(postgresql_readonly=True)
+        _read_only_engines[engine] = read_only
+    return read_only
 
-# Create a scoped session
-ScopedSession = scoped_session(SessionFactory)
+
+class RequestSession(Session):
+    """
+    The session behind db.session. A connection is only checked out of the
+    pool when the first statement runs, and GET/HEAD requests are bound to the
+    read-only engine. Flask-SQLAlchemy closes the session when the app context
+    ends, so a request that never commits never sends a COMMIT either.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is None and has_request_context() and request.method in READ_ONLY_METHODS:
+            return _read_only_engine(engine)
+        return engine
@@ -0,0 +1,11 @@
+# database/similarity.py
+# GET /properties/<id>/similar. properties.embedding is a pgvector column
+# filled by a trigger from the listing's own numbers and its building's
+# transit distances, so every write path keeps it current. The column, the
+# triggers and the HNSW index are created by database/migrations (0007,
+# 0012); changing the features means a new migration that re-embeds.
+#
+# Dimensions: price, sell_price and size (log scale), bedrooms, bathrooms,
+# floor, year_built and the BTS/MRT distances, each mapped onto 0..1, then
+# the area code one-hot encoded into 8 hashed buckets.
+EMBEDDING_DIMENSIONS = 9 + 8
@@ -0,0 +1,87 @@
+import os
+import threading
+import time
+from sqlalchemy import select, text
+from database import db
+from database.analytics import ANALYTICS_SOURCES, ANALYTICS_VIEWS, SOURCE_VERSIONS_VIEW
+from models.sql_models import ResourceVersion
+from helpers.notifications import subscribe
+from helpers.versioning import RESOURCE_CHANNEL
+
+# Background refresh of the analytics materialized views. Every worker hears
+# about committed changes on RESOURCE_CHANNEL and, ANALYTICS_REFRESH_DELAY
+# seconds after the first one, tries to refresh. An advisory lock lets one
+# worker refresh at a time, and the versions recorded with the views let the
+# others see the refresh already covered their change and do nothing.
+
+# Seconds between a write and the refresh it triggers; a burst of writes
+# (an import, a bulk update) inside the window costs a single refresh
+ANALYTICS_REFRESH_DELAY = float(os.getenv("ANALYTICS_REFRESH_DELAY", "5"))
+ANALYTICS_LOCK_ID = 7_424_002
+
+_app = None
+_timer = None
+_timer_lock = threading.Lock()
+
+
+def init_analytics(app):
+    """Remember the app so the background refresh can reach the database."""
+    global _app
+    _app = app
+
+
+def refresh_analytics(engine):
+    """
+    REFRESH ... CONCURRENTLY every analytics view in one transaction, unless
+    they were already refreshed from the current versions. Returns
+    "refreshed", "current" or "busy" (another worker is refreshing).
+    """
+    if engine.dialect.name != "postgresql":
+        return "current"
+    with engine.begin() as connection:
+        locked = connection.execute(
+            text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": ANALYTICS_LOCK_ID}
+        ).scalar()
+        if not locked:
+            return "busy"
+        current = dict(connection.execute(
+            select(ResourceVersion.resource, ResourceVersion.version)
+            .where(ResourceVersion.resource.in_(ANALYTICS_SOURCES))
+        ).all())
+        refreshed = dict(connection.execute(text(f"SELECT resource, version FROM {SOURCE_VERSIONS_VIEW}")).all())
+        if current == refreshed:
+            return "current"
+        started = time.monotonic()
+        for view in ANALYTICS_VIEWS:
+            connection.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}"))
+    print(f"[ANALYTICS] Refreshed {len(ANALYTICS_VIEWS)} views in {time.monotonic() - started:.2f}s.")
+    return "refreshed"
+
+
+def schedule_analytics_refresh(payload=None):
+    """RESOURCE_CHANNEL handler: queue a refresh when a source collection changed."""
+    if payload and payload != "*" and not set(payload.split(",")).intersection(ANALYTICS_SOURCES):
+        return
+    global _timer
+    with _timer_lock:
+        if _timer is not None or _app is None:
+            return
+        _timer = threading.Timer(ANALYTICS_REFRESH_DELAY, _run_refresh)
+        _timer.daemon = True
+        _timer.start()
+
+
+def _run_refresh():
+    global _timer
+    with _timer_lock:
+        _timer = None  # changes from here on queue another refresh
+    try:
+        with _app.app_context():
+            outcome = refresh_analytics(db.engine)
+        if outcome == "busy":
+            schedule_analytics_refresh()
+    except Exception as e:
+        print(f"[ANALYTICS] Refresh failed: {str(e)}")
+
+
+subscribe(RESOURCE_CHANNEL, schedule_analytics_refresh)
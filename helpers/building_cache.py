@@ -0,0 +1,122 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from database import db
+from models.sql_models import Building
+from helpers.notifications import publish, subscribe
+from helpers.query_budget import uncounted
+from helpers.serializers import serialize_building
+
+# Per-worker caches of building data. Every committed building change sends
+# a NOTIFY on BUILDING_CHANNEL and each worker's listener clears its copy,
+# so the workers stay coherent without polling; the TTLs only bound the
+# damage if a notification is ever lost.
+BUILDING_CHANNEL = "building_changed"
+
+# Prefixes up to this many characters are answered from memory. They are the
+# most common lookups and the ones the trigram index helps least with.
+PREFIX_CACHE_MAX_LENGTH = int(os.getenv("BUILDING_PREFIX_CACHE_MAX_LENGTH", "3"))
+PREFIX_CACHE_SIZE = int(os.getenv("BUILDING_PREFIX_CACHE_SIZE", "2048"))
+PREFIX_CACHE_TTL_SECONDS = float(os.getenv("BUILDING_PREFIX_CACHE_TTL", "300"))
+# The whole buildings table (it is small) as serialized rows
+BUILDING_CACHE_TTL_SECONDS = float(os.getenv("BUILDING_CACHE_TTL", "300"))
+
+_entries = OrderedDict()  # prefix -> (stored_at, matches)
+_directory = None
+_generation = 0  # bumped by every invalidation; stale loads are not stored
+_lock = threading.Lock()
+
+
+class BuildingDirectory:
+    """Every building, serialized once, with lookups by id and by name."""
+
+    def __init__(self, buildings):
+        self.loaded_at = time.monotonic()
+        self.buildings = serialize_building.many(buildings)
+        self.by_id = {b["id"]: b for b in self.buildings}
+        self.ids_by_name = {b["name"]: b["id"] for b in self.buildings}
+
+    def name(self, building_id, default=None):
+        building = self.by_id.get(building_id)
+        return building["name"] if building else default
+
+
+def get_building_directory():
+    """The cached BuildingDirectory, loading it with one query when missing or expired."""
+    global _directory
+    directory = _directory
+    if directory is not None and time.monotonic() - directory.loaded_at <= BUILDING_CACHE_TTL_SECONDS:
+        return directory
+    generation = _generation
+    with uncounted():  # a per-worker cache fill, not part of any route's budget
+        directory = BuildingDirectory(db.session.query(Building).order_by(Building.id).all())
+    with _lock:
+        if generation == _generation:
+            _directory = directory
+    return directory
+
+
+# ----------------------------------------
+# Autocomplete prefix cache (LRU + TTL)
+# ----------------------------------------
+def cacheable_prefix(term):
+    """Normalized cache key for a search term, or None when it is too long to cache."""
+    prefix = term.strip().lower()
+    if prefix and len(prefix) <= PREFIX_CACHE_MAX_LENGTH:
+        return prefix
+    return None
+
+
+def get_cached_matches(prefix):
+    """(matches or None, generation); pass the generation back to store_matches."""
+    with _lock:
+        entry = _entries.get(prefix)
+        if entry is None:
+            return None, _generation
+        stored_at, matches = entry
+        if time.monotonic() - stored_at > PREFIX_CACHE_TTL_SECONDS:
+            del _entries[prefix]
+            return None, _generation
+        _entries.move_to_end(prefix)
+        return matches, _generation
+
+
+def store_matches(prefix, matches, generation):
+    with _lock:
+        if generation != _generation:
+            return
+        _entries[prefix] = (time.monotonic(), matches)
+        _entries.move_to_end(prefix)
+        while len(_entries) > PREFIX_CACHE_SIZE:
+            _entries.popitem(last=False)
+
+
+# ----------------------------------------
+# Invalidation
+# ----------------------------------------
+def invalidate_building_cache(payload=None):
+    """Drop this worker's cached buildings and prefixes."""
+    global _directory, _generation
+    with _lock:
+        _generation += 1
+        _directory = None
+        _entries.clear()
+
+
+def publish_building_change(session, building_id=""):
+    """Tell every worker, on commit, that buildings changed."""
+    publish(session, BUILDING_CHANNEL, building_id)
+
+
+subscribe(BUILDING_CHANNEL, invalidate_building_cache)
+
+
+@event.listens_for(Session, "after_flush")
+def _publish_flushed_buildings(session, flush_context):
+    changed = [obj for obj in (*session.new, *session.dirty, *session.deleted)
+               if isinstance(obj, Building) and (obj not in session.dirty or session.is_modified(obj))]
+    if changed:
+        publish_building_change(session, changed[0].id if len(changed) == 1 else "")
@@ -0,0 +1,62 @@
+from sqlalchemy import Boolean, case, cast, column, values
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from database import db
+
+# Databases whose INSERT supports .on_conflict_do_nothing() / .on_conflict_do_update()
+UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def check_upsert_support(app):
+    """
+    Refuse to start against a database dialect_insert() cannot serve, rather
+    than failing on the first import or version bump.
+    """
+    backend = make_url(app.config["SQLALCHEMY_DATABASE_URI"]).get_backend_name()
+    if backend not in UPSERT_INSERTS:
+        raise RuntimeError(
+            f"Unsupported database {backend!r}: ON CONFLICT inserts need one of {', '.join(UPSERT_INSERTS)}"
+        )
+
+
+def dialect_insert(model):
+    """
+    INSERT construct for the active database that supports
+    .on_conflict_do_nothing() / .on_conflict_do_update() (checked at startup
+    by check_upsert_support()).
+    """
+    return UPSERT_INSERTS[db.session.get_bind().dialect.name](model)
+
+
+def chunked(items, size):
+    """Yield successive lists of at most size items."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def update_from_values(table, key, patches, **assignments):
+    """
+    One UPDATE table .. FROM (VALUES ...) applying per-row patches
+    ({key value: {column: value}}) matched on the key column. Rows that do
+    not set a column carry a false set_<column> flag and keep their current
+    value; a column every row sets is assigned directly. assignments are
+    set on every matched row (e.g. updated_at). Add further .where() /
+    .returning() to the statement returned.
+    """
+    fields = sorted({field for patch in patches.values() for field in patch})
+    columns = [column(key, table.c[key].type)]
+    columns += [column(field, table.c[field].type) for field in fields]
+    columns += [column(f"set_{field}", Boolean) for field in fields]
+    rows = [
+        (key_value, *(patch.get(field) for field in fields), *(field in patch for field in fields))
+        for key_value, patch in patches.items()
+    ]
+    patch_values = values(*columns, name="patch").data(rows)
+
+    for field in fields:
+        new_value = cast(patch_values.c[field], table.c[field].type)
+        if all(field in patch for patch in patches.values()):
+            assignments[field] = new_value
+        else:
+            assignments[field] = case((patch_values.c[f"set_{field}"], new_value), else_=table.c[field])
+    return table.update().where(table.c[key] == patch_values.c[key]).values(assignments)
@@ -0,0 +1,36 @@
+import io
+import warnings
+from PIL import Image, ImageOps, features
+
+# This module is what the image process pool imports, so it stays free of
+# Flask, database and storage imports.
+
+# Longest edge, in pixels, of each generated variant
+VARIANT_SIZES = {"thumb": 320, "medium": 1280}
+
+
+def available_formats():
+    """WebP always; AVIF when this Pillow build includes the encoder."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # older Pillow warns about the unknown "avif" feature
+        has_avif = features.check("avif")
+    return ("webp", "avif") if has_avif else ("webp",)
+
+
+def render_variants(data, sizes=VARIANT_SIZES, formats=("webp",)):
+    """
+    Resize one original image to every size and encode it in every format.
+    Returns {(size_name, format): encoded_bytes}. Runs in a worker process.
+    """
+    rendered = {}
+    with Image.open(io.BytesIO(data)) as original:
+        image = ImageOps.exif_transpose(original)
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+        for size_name, edge in sizes.items():
+            resized = image.copy()
+            resized.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+            for fmt in formats:
+                buffer = io.BytesIO()
+                resized.save(buffer, format=fmt.upper(), quality=80)
+                rendered[(size_name, fmt)] = buffer.getvalue()
+    return rendered
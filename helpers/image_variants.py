@@ -0,0 +1,175 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy.orm import load_only
+from database import db
+from models.sql_models import Property
+from helpers.bulk_sql import chunked
+from helpers.image_render import VARIANT_SIZES, available_formats, render_variants
+from helpers.jobs import submit_job
+from helpers.storage import R2_BUCKET, PLACEHOLDER_PHOTO_KEY, key_from_url, public_url, s3_client
+
+# Processes per gunicorn worker that resize and encode images
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def _get_process_pool():
+    # "spawn" keeps the children clear of the threads and sockets of the worker
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=IMAGE_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _process_pool
+
+
+def variant_key(key, size_name, fmt):
+    """Variants sit next to the original: photo.jpg -> photo_thumb.webp."""
+    stem = key.rsplit(".", 1)[0]
+    return f"{stem}_{size_name}.{fmt}"
+
+
+def stored_photo_urls(photo_urls):
+    """URLs in a photo_urls dict that point at photos in our bucket, other than the placeholder."""
+    stored = []
+    for urls in (photo_urls or {}).values():
+        for url in ([urls] if isinstance(urls, str) else urls or []):
+            key = key_from_url(url)
+            if key and key != PLACEHOLDER_PHOTO_KEY and url not in stored:
+                stored.append(url)
+    return stored
+
+
+def photo_urls_missing_variants(prop):
+    """
+    Stored photos of a property that have no derivatives yet. Photos whose
+    render failed are recorded as {"error": ...} and are not retried.
+    """
+    done = prop.photo_variants or {}
+    return [url for url in stored_photo_urls(prop.get_photo_urls()) if url not in done]
+
+
+def schedule_photo_variants(prop):
+    """Queue a background job for any of the property's photos without variants."""
+    missing = photo_urls_missing_variants(prop)
+    if not missing:
+        return None
+    return submit_job("photo_variants", generate_photo_variants, prop.id, missing, total=len(missing))
+
+
+def schedule_bulk_photo_variants(property_ids):
+    """
+    Queue one job for the photos without variants across many properties,
+    e.g. the rows an import has just committed. Never raises: the rows are
+    saved already, and a failure here is only logged.
+    """
+    try:
+        missing = []
+        for batch in chunked(list(property_ids), 1000):
+            props = (
+                db.session.query(Property)
+                .options(load_only(Property.id, Property.photo_urls, Property.photo_variants))
+                .filter(Property.id.in_(batch))
+                .order_by(Property.id)
+            )
+            missing.extend((prop.id, urls) for prop in props if (urls := photo_urls_missing_variants(prop)))
+        if not missing:
+            return None
+        return submit_job("photo_variants", generate_bulk_photo_variants, missing, total=len(missing))
+    except Exception as e:
+        db.session.rollback()
+        print(f"[PHOTO VARIANTS] Could not queue variants for {len(property_ids)} properties: {str(e)}")
+        return None
+
+
+def _render_photo(url, formats):
+    """
+    Download one original, render its variants in the process pool and upload
+    them beside it. Returns {size: {format: URL}}, or {"error": reason} when
+    Pillow cannot decode the original; download and upload errors raise.
+    """
+    key = key_from_url(url)
+    original = s3_client.get_object(Bucket=R2_BUCKET, Key=key)["Body"].read()
+    try:
+        rendered = _get_process_pool().submit(render_variants, original, VARIANT_SIZES, formats).result()
+    except Exception as e:
+        return {"error": str(e)}
+    variants = {}
+    for (size_name, fmt), body in rendered.items():
+        target = variant_key(key, size_name, fmt)
+        s3_client.put_object(
+            Bucket=R2_BUCKET, Key=target, Body=body,
+            ContentType=f"image/{fmt}", ACL="public-read",
+        )
+        variants.setdefault(size_name, {})[fmt] = public_url(target)
+    return variants
+
+
+def _record_variants(property_id, generated):
+    # Merge under a row lock; photos removed meanwhile are not re-added
+    prop = db.session.query(Property).filter(Property.id == property_id).with_for_update().first()
+    if prop:
+        current = set(stored_photo_urls(prop.get_photo_urls()))
+        merged = {url: v for url, v in (prop.photo_variants or {}).items() if url in current}
+        merged.update({url: v for url, v in generated.items() if url in current})
+        prop.photo_variants = merged
+        db.session.commit()
+
+
+def _render_or_error(url, formats, errors):
+    """_render_photo, logging and collecting failures. Returns None when nothing should be recorded."""
+    try:
+        variants = _render_photo(url, formats)
+    except Exception as e:
+        variants, reason = None, str(e)
+    else:
+        reason = variants.get("error")
+    if reason is not None:
+        print(f"[PHOTO VARIANTS] Failed for {url}: {reason}")
+        errors.append({"url": url, "reason": reason})
+    return variants
+
+
+def generate_photo_variants(job, property_id, urls):
+    """
+    Job body: download each original, render the variants in the process pool,
+    upload them beside the original and record them in Property.photo_variants.
+    An original Pillow cannot decode is recorded as {"error": reason} so it is
+    not scheduled again; download and upload errors are left to a later run.
+    """
+    formats = available_formats()
+    generated = {}
+    errors = []
+    for done, url in enumerate(urls, start=1):
+        variants = _render_or_error(url, formats, errors)
+        if variants is not None:
+            generated[url] = variants
+        job.update(processed=done, errors=errors)
+
+    _record_variants(property_id, generated)
+    print(f"[PHOTO VARIANTS] Property {property_id}: {len(urls) - len(errors)} photos processed, {len(errors)} failed.")
+    return {"generated": len(urls) - len(errors), "failed": len(errors)}
+
+
+def generate_bulk_photo_variants(job, missing):
+    """
+    Job body for schedule_bulk_photo_variants; missing is a list of
+    (property_id, urls). Imported rows often share photos, so each distinct
+    URL is rendered once and its result recorded on every property using it.
+    """
+    formats = available_formats()
+    rendered = {}
+    errors = []
+    for done, (property_id, urls) in enumerate(missing, start=1):
+        for url in urls:
+            if url not in rendered:
+                rendered[url] = _render_or_error(url, formats, errors)
+        _record_variants(property_id, {url: rendered[url] for url in urls if rendered[url] is not None})
+        job.update(processed=done, errors=errors)
+    print(f"[PHOTO VARIANTS] {len(missing)} properties: {len(rendered) - len(errors)} photos processed, {len(errors)} failed.")
+    return {"properties": len(missing), "generated": len(rendered) - len(errors), "failed": len(errors)}
@@ -0,0 +1,202 @@
+import os
+import socket
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from database import db
+from models.sql_models import Job
+
+# Background threads per gunicorn worker that run queued jobs
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# How often a worker refreshes heartbeat_at on the jobs it owns, and how long
+# an unfinished job may go without one before it is marked failed (its worker
+# died or was recycled with the job still queued or running in memory)
+JOB_HEARTBEAT_SECONDS = int(os.getenv("JOB_HEARTBEAT_SECONDS", "15"))
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "120"))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+_executor = None
+_executor_lock = threading.Lock()
+# Ids of the queued and running jobs this worker owns
+_owned_jobs = set()
+
+
+def _owner():
+    # Evaluated per call rather than at import so forked workers differ
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _get_executor(app):
+    # Created on first use so each forked gunicorn worker gets its own threads
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="job")
+            threading.Thread(target=_heartbeat_loop, args=(app,), name="job-heartbeat", daemon=True).start()
+        return _executor
+
+
+def _heartbeat_loop(app):
+    """Keep this worker's jobs alive and fail the ones whose worker is gone."""
+    while True:
+        time.sleep(JOB_HEARTBEAT_SECONDS)
+        try:
+            with app.app_context(), Session(db.engine) as session:
+                with _executor_lock:
+                    job_ids = list(_owned_jobs)
+                if job_ids:
+                    session.execute(
+                        update(Job).where(Job.id.in_(job_ids)).values(heartbeat_at=datetime.utcnow())
+                    )
+                fail_stale_jobs(session)
+                session.commit()
+        except Exception as e:
+            print(f"[JOBS] Heartbeat failed: {str(e)}")
+
+
+def fail_stale_jobs(session, job_id=None):
+    """
+    Mark queued/running jobs with no heartbeat for JOB_STALE_SECONDS as
+    failed (only job_id when given). The caller commits. Returns the number
+    of jobs failed.
+    """
+    now = datetime.utcnow()
+    statement = (
+        update(Job)
+        .where(Job.status.in_((QUEUED, RUNNING)), Job.heartbeat_at < now - timedelta(seconds=JOB_STALE_SECONDS))
+        .values(
+            status=FAILED,
+            errors=[{"reason": f"No heartbeat from the worker running this job for {JOB_STALE_SECONDS}s"}],
+            finished_at=now,
+        )
+    )
+    if job_id is not None:
+        statement = statement.where(Job.id == job_id)
+    failed = session.execute(statement).rowcount
+    if failed:
+        print(f"[JOBS] Marked {failed} stale job(s) failed.")
+    return failed
+
+
+class JobContext:
+    """Handed to a running job so it can report progress on its Job row."""
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+
+    def update(self, **values):
+        """
+        Write progress fields (processed, counts, errors, ...) in a separate
+        short transaction so status polls see them while the job still runs.
+        """
+        _update_job(self.job_id, RUNNING, **values)
+
+
+def _update_job(job_id, expected_status, **values):
+    """
+    Update the job if it is still in expected_status, so a job already
+    failed as stale is not brought back. Returns whether it was updated.
+    """
+    with Session(db.engine) as session:
+        updated = session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == expected_status)
+            .values(heartbeat_at=datetime.utcnow(), **values)
+        ).rowcount
+        session.commit()
+    return bool(updated)
+
+
+def submit_job(kind, func, *args, total=None, **kwargs):
+    """
+    Record a queued Job and run func(job_context, *args, **kwargs) on the
+    background pool inside an app context. Whatever func returns is stored as
+    the job's result. Returns the job id.
+
+    Jobs live in this worker's memory. The worker records itself as the
+    job's owner and refreshes heartbeat_at while the job is unfinished; if
+    the worker exits, the job is failed once the heartbeat goes stale.
+    """
+    job = Job(
+        id=str(uuid.uuid4()), kind=kind, status=QUEUED, total=total, processed=0,
+        owner=_owner(), heartbeat_at=datetime.utcnow(),
+    )
+    db.session.add(job)
+    db.session.commit()
+    app = current_app._get_current_object()
+    executor = _get_executor(app)
+    with _executor_lock:
+        _owned_jobs.add(job.id)
+    executor.submit(_run_job, app, job.id, func, args, kwargs)
+    print(f"[JOBS] Queued {kind} job {job.id}.")
+    return job.id
+
+
+def _run_job(app, job_id, func, args, kwargs):
+    with app.app_context():
+        try:
+            if not _update_job(job_id, QUEUED, status=RUNNING, started_at=datetime.utcnow()):
+                print(f"[JOBS] Job {job_id} is no longer queued; not running it.")
+                return
+            try:
+                result = func(JobContext(job_id), *args, **kwargs)
+                finished = _update_job(
+                    job_id, RUNNING, status=SUCCEEDED, result=result, finished_at=datetime.utcnow()
+                )
+                print(f"[JOBS] Job {job_id} succeeded.")
+            except Exception as e:
+                db.session.rollback()
+                traceback.print_exc()
+                finished = _update_job(
+                    job_id, RUNNING, status=FAILED, errors=[{"reason": str(e)}], finished_at=datetime.utcnow()
+                )
+                print(f"[JOBS] Job {job_id} failed: {str(e)}")
+            if not finished:
+                print(f"[JOBS] Job {job_id} was already failed as stale; its outcome was not recorded.")
+        finally:
+            with _executor_lock:
+                _owned_jobs.discard(job_id)
+
+
+def fail_if_stale(job):
+    """
+    Fail job (a loaded Job) if its heartbeat is stale, in a short separate
+    transaction so read-only GET sessions can call it. Returns whether it
+    was failed; job is refreshed when it was.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=JOB_STALE_SECONDS)
+    if job.status not in (QUEUED, RUNNING) or job.heartbeat_at is None or job.heartbeat_at >= cutoff:
+        return False
+    with Session(db.engine) as session:
+        failed = fail_stale_jobs(session, job.id)
+        session.commit()
+    db.session.refresh(job)
+    return bool(failed)
+
+
+def serialize_job(job):
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "total": job.total,
+        "processed": job.processed,
+        "counts": job.counts,
+        "errors": job.errors,
+        "result": job.result,
+        "created_at": job.created_at.strftime('%Y-%m-%d %H:%M:%S') if job.created_at else None,
+        "started_at": job.started_at.strftime('%Y-%m-%d %H:%M:%S') if job.started_at else None,
+        "finished_at": job.finished_at.strftime('%Y-%m-%d %H:%M:%S') if job.finished_at else None,
+        "owner": job.owner,
+        "heartbeat_at": job.heartbeat_at.strftime('%Y-%m-%d %H:%M:%S') if job.heartbeat_at else None,
+    }
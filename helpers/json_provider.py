@@ -0,0 +1,38 @@
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+# orjson encodes the API's large lists several times faster than the
+# standard library. Dates and datetimes are passed through to Flask's own
+# default() so they keep their HTTP-date format, as do Decimal, UUID and
+# dataclasses; everything else orjson handles natively. Output is UTF-8
+# rather than \u-escaped ASCII, which is the same JSON to any client.
+_BASE_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    def _options(self, sort_keys=None, indent=None):
+        options = _BASE_OPTIONS
+        if self.sort_keys if sort_keys is None else sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def _encode(self, obj, **kwargs):
+        return orjson.dumps(
+            obj, default=self.default, option=self._options(kwargs.get("sort_keys"), kwargs.get("indent"))
+        )
+
+    def dumps(self, obj, **kwargs):
+        return self._encode(obj, **kwargs).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Same as Flask's, but hands the encoded bytes straight to the response
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = None
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            indent = 2
+        return self._app.response_class(self._encode(obj, indent=indent), mimetype=self.mimetype)
@@ -0,0 +1,206 @@
+import os
+import re
+import threading
+import time
+from datetime import timedelta
+import numpy as np
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+from database import db
+from models.sql_models import Property
+
+# Listing statuses that can be offered to a client (compared case-insensitively)
+MATCH_STATUSES = {
+    status.strip().lower()
+    for status in os.getenv("MATCH_STATUSES", "Available").split(",") if status.strip()
+}
+# Seconds between checks for rows changed by other workers
+MATCH_REFRESH_INTERVAL = float(os.getenv("MATCH_REFRESH_INTERVAL", "5"))
+# updated_at is stamped at flush, before commit; re-read this far back so rows
+# committed late are not skipped by the watermark
+MATCH_WATERMARK_SLACK = timedelta(seconds=int(os.getenv("MATCH_WATERMARK_SLACK", "120")))
+# Listings up to this fraction over budget still match, with a lower price score
+MATCH_BUDGET_TOLERANCE = float(os.getenv("MATCH_BUDGET_TOLERANCE", "0.15"))
+
+# Relative weight of each criterion in the overall score
+MATCH_WEIGHTS = {"price": 3.0, "area": 2.0, "bedrooms": 2.0, "bath": 1.0, "size": 1.0}
+
+_SNAPSHOT_COLUMNS = (
+    Property.id, Property.price, Property.bedrooms, Property.bathrooms,
+    Property.size, Property.area, Property.status, Property.updated_at,
+)
+
+
+def _float_or_nan(value):
+    return float(value) if value is not None else np.nan
+
+
+class PropertySnapshot:
+    """
+    Columnar copy of the fields matching needs, one NumPy array per column,
+    so a client can be scored against every listing in a few vector ops.
+
+    Rows changed since the last refresh are re-read by updated_at and
+    patched in place; when the row count shows deletes, the current id list
+    is read and the missing rows are dropped.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stale = True
+        self._loaded = False
+        self._checked_at = 0.0
+        self._watermark = None
+        self._position = {}
+        self.ids = np.empty(0, dtype=np.int64)
+        self.price = np.empty(0)
+        self.bedrooms = np.empty(0)
+        self.bathrooms = np.empty(0)
+        self.size = np.empty(0)
+        self.area = np.empty(0, dtype=object)
+        self.available = np.empty(0, dtype=bool)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def mark_stale(self):
+        """Force a refresh on the next match (this worker wrote properties)."""
+        self._stale = True
+
+    def refresh(self, force=False):
+        with self._lock:
+            if not force and not self._stale and time.monotonic() - self._checked_at < MATCH_REFRESH_INTERVAL:
+                return
+            self._stale = False
+            self._checked_at = time.monotonic()
+            if not self._loaded:
+                self._load_all()
+                return
+            since = self._watermark - MATCH_WATERMARK_SLACK if self._watermark else None
+            query = db.session.query(*_SNAPSHOT_COLUMNS)
+            if since is not None:
+                query = query.filter(Property.updated_at > since)
+            self._apply(query.all())
+            if db.session.query(func.count(Property.id)).scalar() != len(self.ids):
+                self._drop_deleted()
+
+    def _drop_deleted(self):
+        existing = np.fromiter((property_id for (property_id,) in db.session.query(Property.id)), dtype=np.int64)
+        keep = np.isin(self.ids, existing)
+        for column in ("ids", "price", "bedrooms", "bathrooms", "size", "area", "available"):
+            setattr(self, column, getattr(self, column)[keep])
+        self._position = {int(property_id): i for i, property_id in enumerate(self.ids)}
+
+    def _load_all(self):
+        started = time.perf_counter()
+        rows = db.session.query(*_SNAPSHOT_COLUMNS).order_by(Property.id).all()
+        self.ids = np.fromiter((row.id for row in rows), dtype=np.int64, count=len(rows))
+        self.price = np.array([_float_or_nan(row.price) for row in rows], dtype=float)
+        self.bedrooms = np.array([_float_or_nan(row.bedrooms) for row in rows], dtype=float)
+        self.bathrooms = np.array([_float_or_nan(row.bathrooms) for row in rows], dtype=float)
+        self.size = np.array([_float_or_nan(row.size) for row in rows], dtype=float)
+        self.area = np.array([(row.area or "").upper() for row in rows], dtype=object)
+        self.available = np.array([(row.status or "").lower() in MATCH_STATUSES for row in rows], dtype=bool)
+        self._position = {int(property_id): i for i, property_id in enumerate(self.ids)}
+        self._watermark = max((row.updated_at for row in rows if row.updated_at), default=None)
+        self._loaded = True
+        print(f"[MATCHING] Loaded {len(rows)} properties in {time.perf_counter() - started:.2f}s.")
+
+    def _apply(self, rows):
+        new_rows = []
+        for row in rows:
+            i = self._position.get(row.id)
+            if i is None:
+                new_rows.append(row)
+                continue
+            self.price[i] = _float_or_nan(row.price)
+            self.bedrooms[i] = _float_or_nan(row.bedrooms)
+            self.bathrooms[i] = _float_or_nan(row.bathrooms)
+            self.size[i] = _float_or_nan(row.size)
+            self.area[i] = (row.area or "").upper()
+            self.available[i] = (row.status or "").lower() in MATCH_STATUSES
+        if new_rows:
+            start = len(self.ids)
+            self.ids = np.concatenate([self.ids, np.array([row.id for row in new_rows], dtype=np.int64)])
+            self.price = np.concatenate([self.price, [_float_or_nan(row.price) for row in new_rows]])
+            self.bedrooms = np.concatenate([self.bedrooms, [_float_or_nan(row.bedrooms) for row in new_rows]])
+            self.bathrooms = np.concatenate([self.bathrooms, [_float_or_nan(row.bathrooms) for row in new_rows]])
+            self.size = np.concatenate([self.size, [_float_or_nan(row.size) for row in new_rows]])
+            self.area = np.concatenate([self.area, np.array([(row.area or "").upper() for row in new_rows], dtype=object)])
+            self.available = np.concatenate([
+                self.available, [(row.status or "").lower() in MATCH_STATUSES for row in new_rows]
+            ])
+            for offset, row in enumerate(new_rows):
+                self._position[row.id] = start + offset
+        changed = [row.updated_at for row in rows if row.updated_at]
+        if changed and (self._watermark is None or max(changed) > self._watermark):
+            self._watermark = max(changed)
+
+    def score(self, client):
+        """
+        Score every available listing against the client's budget, area,
+        bedrooms, bath and size. Returns (ids, scores) for listings that pass
+        the hard limits. Criteria the client left empty are skipped; listings
+        missing a value get half marks for it.
+        """
+        mask = self.available.copy()
+        total = np.zeros(len(self.ids))
+        weight = 0.0
+
+        def add(name, component):
+            nonlocal total, weight
+            total = total + MATCH_WEIGHTS[name] * np.where(np.isnan(component), 0.5, component)
+            weight += MATCH_WEIGHTS[name]
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if client.budget:
+                budget = float(client.budget)
+                over = (self.price - budget) / (budget * MATCH_BUDGET_TOLERANCE)
+                mask &= ~(over > 1)
+                add("price", np.where(np.isnan(self.price), np.nan, np.clip(1 - np.maximum(over, 0), 0, 1)))
+            areas = {code for code in re.split(r"[^A-Za-z]+", (client.area or "").upper()) if code}
+            if areas:
+                add("area", np.isin(self.area, list(areas)).astype(float))
+            if client.bedrooms:
+                wanted = float(client.bedrooms)
+                mask &= ~(self.bedrooms < wanted)
+                add("bedrooms", np.where(np.isnan(self.bedrooms), np.nan, np.where(self.bedrooms == wanted, 1.0, 0.6)))
+            if client.bath:
+                wanted = float(client.bath)
+                add("bath", np.where(np.isnan(self.bathrooms), np.nan, np.where(self.bathrooms >= wanted, 1.0, 0.3)))
+            if client.size:
+                wanted = float(client.size)
+                add("size", np.where(np.isnan(self.size), np.nan, np.clip(self.size / wanted, 0, 1)))
+
+        scores = total / weight if weight else np.ones(len(self.ids))
+        return self.ids[mask], scores[mask]
+
+    def top_matches(self, client, limit, min_score=0.0):
+        """[(property_id, score)] best first, at most limit of them."""
+        with self._lock:
+            ids, scores = self.score(client)
+        keep = scores >= min_score
+        ids, scores = ids[keep], scores[keep]
+        if len(ids) > limit:
+            best = np.argpartition(-scores, limit - 1)[:limit]
+            ids, scores = ids[best], scores[best]
+        order = np.lexsort((ids, -scores))
+        return [(int(ids[i]), float(scores[i])) for i in order]
+
+
+property_snapshot = PropertySnapshot()
+
+
+# ----------------------------------------
+# Mark the snapshot stale when this worker commits property changes
+# ----------------------------------------
+@event.listens_for(Session, "after_flush")
+def _note_property_writes(session, flush_context):
+    if any(isinstance(obj, Property) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info["properties_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _refresh_after_property_writes(session):
+    if session.info.pop("properties_changed", False):
+        property_snapshot.mark_stale()
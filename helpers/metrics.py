@@ -0,0 +1,146 @@
+import hmac
+import os
+import time
+from flask import Response, g, has_app_context, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+    generate_latest, multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import Pool
+
+# Under gunicorn, PROMETHEUS_MULTIPROC_DIR is set (see gunicorn.conf.py) and each
+# worker writes its samples there; /metrics then merges every worker's files.
+
+# Bearer token the scraper must send to /metrics (Prometheus: authorization
+# credentials). The endpoint exposes every route and its SQL timings, so it
+# is disabled (404) while this is unset.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency",
+    ["blueprint", "endpoint", "method"],
+)
+REQUEST_COUNT = Counter(
+    "http_requests_total", "Requests by final status code",
+    ["blueprint", "endpoint", "method", "status"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "Requests currently being handled",
+    ["blueprint", "endpoint"], multiprocess_mode="livesum",
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request", "SQL statements executed per request",
+    ["blueprint", "endpoint"], buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250),
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds", "Total SQL execution time per request",
+    ["blueprint", "endpoint"],
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "Duration of individual SQL statements",
+    ["blueprint", "endpoint"],
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10),
+)
+
+
+def _route_labels():
+    rule = request.url_rule.rule if request.url_rule else "unmatched"
+    return request.blueprint or "app", rule
+
+
+def init_metrics(app):
+    """Attach the request hooks that feed the HTTP and per-request SQL metrics."""
+
+    @app.before_request
+    def start_request_metrics():
+        g._metrics_labels = _route_labels()
+        g._metrics_started = time.perf_counter()
+        g._metrics_queries = 0
+        g._metrics_query_time = 0.0
+        REQUESTS_IN_FLIGHT.labels(*g._metrics_labels).inc()
+
+    @app.after_request
+    def record_status(response):
+        g._metrics_status = response.status_code
+        return response
+
+    # Teardown runs after a streamed body has been fully sent, so streaming
+    # responses are timed end to end.
+    @app.teardown_request
+    def finish_request_metrics(exception=None):
+        labels = g.pop("_metrics_labels", None)
+        if labels is None:
+            return
+        elapsed = time.perf_counter() - g.pop("_metrics_started")
+        status = 500 if exception else g.pop("_metrics_status", 500)
+        REQUESTS_IN_FLIGHT.labels(*labels).dec()
+        REQUEST_LATENCY.labels(*labels, request.method).observe(elapsed)
+        REQUEST_COUNT.labels(*labels, request.method, str(status)).inc()
+        DB_QUERIES_PER_REQUEST.labels(*labels).observe(g.pop("_metrics_queries", 0))
+        DB_TIME_PER_REQUEST.labels(*labels).observe(g.pop("_metrics_query_time", 0.0))
+
+
+def metrics_authorized():
+    """True when the request carries "Authorization: Bearer <METRICS_TOKEN>"."""
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    return scheme == "Bearer" and hmac.compare_digest(token.encode(), METRICS_TOKEN.encode())
+
+
+def metrics_response():
+    """Render every metric in the Prometheus text format."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+
+# ----------------------------------------
+# SQLAlchemy event hooks
+# ----------------------------------------
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_metrics_query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["_metrics_query_start"].pop()
+    labels = g.get("_metrics_labels") if has_app_context() else None
+    if labels is None:
+        DB_QUERY_DURATION.labels("none", "background").observe(elapsed)
+        return
+    DB_QUERY_DURATION.labels(*labels).observe(elapsed)
+    g._metrics_queries += 1
+    g._metrics_query_time += elapsed
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_query_timer(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("_metrics_query_start"):
+        conn.info["_metrics_query_start"].pop()
+
+
+# Statements that go through the session only reach the pool after this
+# event, so the gap between it and the checkout is the wait for a connection.
+@event.listens_for(Session, "do_orm_execute")
+def _mark_checkout_start(orm_execute_state):
+    if has_app_context():
+        g._metrics_checkout_requested = time.perf_counter()
+
+
+@event.listens_for(Pool, "checkout")
+def _record_checkout_wait(dbapi_connection, connection_record, connection_proxy):
+    if not has_app_context():
+        return
+    requested = g.pop("_metrics_checkout_requested", None)
+    if requested is not None:
+        DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - requested)
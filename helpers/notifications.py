@@ -0,0 +1,119 @@
+import os
+import select
+import threading
+import time
+from sqlalchemy import text
+from database import db
+
+# Cross-worker messages over PostgreSQL LISTEN/NOTIFY. Each gunicorn worker
+# runs one listener thread on its own connection (outside the pool) and
+# hands every notification to the handlers subscribed to its channel.
+# NOTIFY is transactional: a message published inside a transaction is only
+# delivered if and when that transaction commits.
+
+# Seconds to wait before reconnecting after the listener connection drops
+LISTEN_RECONNECT_SECONDS = float(os.getenv("LISTEN_RECONNECT_SECONDS", "5"))
+
+_handlers = {}  # channel -> [handler(payload)]
+_listener_pid = None
+_listener_lock = threading.Lock()
+
+
+def subscribe(channel, handler):
+    """
+    Call handler(payload) in the listener thread for each NOTIFY on
+    channel. After a reconnect, handlers get payload None: messages may have
+    been missed, so they should drop everything they cached.
+    """
+    _handlers.setdefault(channel, []).append(handler)
+
+
+def publish(session, channel, payload=""):
+    """Queue a NOTIFY in the session's transaction (PostgreSQL only)."""
+    if session.get_bind().dialect.name != "postgresql":
+        return
+    session.connection().execute(
+        text("SELECT pg_notify(:channel, :payload)"), {"channel": channel, "payload": str(payload)}
+    )
+
+
+def dispatch_local(channel, payload=""):
+    """Run this worker's handlers for channel right away, without a round trip."""
+    _dispatch(channel, payload)
+
+
+def init_notifications(app):
+    """
+    Start the listener lazily on a worker's first request, so it is created
+    after gunicorn forks and only when the app actually serves traffic.
+    """
+
+    @app.before_request
+    def ensure_listener():
+        if _listener_pid != os.getpid():
+            _start_listener(db.engine)
+
+
+def _start_listener(engine):
+    global _listener_pid
+    with _listener_lock:
+        if _listener_pid == os.getpid():
+            return
+        _listener_pid = os.getpid()
+        if engine.dialect.name != "postgresql" or not _handlers:
+            return
+        thread = threading.Thread(target=_listen_forever, args=(engine,), name="notify-listener", daemon=True)
+        thread.start()
+
+
+def _connect(engine):
+    # A dedicated DBAPI connection with the engine's settings, kept out of the pool
+    cargs, cparams = engine.dialect.create_connect_args(engine.url)
+    connection = engine.dialect.dbapi.connect(*cargs, **cparams)
+    connection.autocommit = True
+    cursor = connection.cursor()
+    for channel in _handlers:
+        cursor.execute(f'LISTEN "{channel}"')
+    cursor.close()
+    return connection
+
+
+def _dispatch(channel, payload):
+    for handler in _handlers.get(channel, ()):
+        try:
+            handler(payload)
+        except Exception as e:
+            print(f"[NOTIFY] Handler for {channel} failed: {str(e)}")
+
+
+def _listen_forever(engine):
+    reconnecting = False
+    connection = None
+    while True:
+        try:
+            connection = _connect(engine)
+            print(f"[NOTIFY] Listening on {', '.join(_handlers)} (pid {os.getpid()}).")
+            if reconnecting:
+                for channel in _handlers:
+                    _dispatch(channel, None)
+            while True:
+                if select.select([connection], [], [], 60) == ([], [], []):
+                    # Idle: make sure the connection is still alive
+                    cursor = connection.cursor()
+                    cursor.execute("SELECT 1")
+                    cursor.close()
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    notification = connection.notifies.pop(0)
+                    _dispatch(notification.channel, notification.payload)
+        except Exception as e:
+            print(f"[NOTIFY] Listener connection lost: {str(e)}")
+            if connection is not None:
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+                connection = None
+            reconnecting = True
+            time.sleep(LISTEN_RECONNECT_SECONDS)
@@ -0,0 +1,54 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(created_at, row_id):
+    """Encode the (created_at, id) position of the last row on a page as an opaque token."""
+    payload = [created_at.isoformat(), row_id]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token):
+    """Decode a token produced by encode_cursor. Raises ValueError if it is malformed."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def parse_page_size(value):
+    """Parse the ?limit= argument, clamped to MAX_PAGE_SIZE."""
+    if value in (None, ""):
+        return DEFAULT_PAGE_SIZE
+    limit = int(value)
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def apply_keyset(query, created_col, id_col, cursor, limit):
+    """
+    Order the query by (created_at, id) and seek past the cursor position with
+    a row comparison, which Postgres answers from the (created_at, id) index.
+    One extra row is fetched to detect a further page.
+    """
+    if cursor:
+        query = query.filter(tuple_(created_col, id_col) > tuple_(*cursor))
+    return query.order_by(created_col.asc(), id_col.asc()).limit(limit + 1)
+
+
+def split_page(rows, limit):
+    """Trim the look-ahead row and build the cursor for the next page (or None)."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.created_at, last.id)
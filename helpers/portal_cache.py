@@ -0,0 +1,106 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, request
+from helpers.notifications import subscribe
+from helpers.versioning import RESOURCE_CHANNEL
+
+# Serialized /clients/code/<code> responses, per worker. Each entry records
+# the version keys it was built from (client:<id>, property:<id>,
+# building:<id>); a committed change to any of them, announced on
+# RESOURCE_CHANNEL, drops exactly the entries that used it. The TTL only
+# bounds the damage if a notification is ever lost.
+PORTAL_CACHE_SIZE = int(os.getenv("PORTAL_CACHE_SIZE", "1000"))
+PORTAL_CACHE_TTL_SECONDS = float(os.getenv("PORTAL_CACHE_TTL", "600"))
+
+
+class _Entry:
+    __slots__ = ("body", "etag", "dependencies", "stored_at")
+
+    def __init__(self, body, dependencies):
+        self.body = body
+        self.etag = hashlib.sha1(body).hexdigest()[:20]
+        self.dependencies = dependencies
+        self.stored_at = time.monotonic()
+
+
+_entries = OrderedDict()  # client code -> _Entry
+_dependents = {}  # version key -> {client codes}
+_generation = 0
+_lock = threading.Lock()
+
+
+def _drop(code):
+    entry = _entries.pop(code, None)
+    if entry is not None:
+        for key in entry.dependencies:
+            codes = _dependents.get(key)
+            if codes is not None:
+                codes.discard(code)
+                if not codes:
+                    del _dependents[key]
+
+
+def cached_portal_response():
+    """
+    The cached response for the current request's client code (a 304 when
+    If-None-Match matches) and the generation to hand to store_portal_response
+    on a miss.
+    """
+    code = request.view_args["client_code"]
+    with _lock:
+        entry = _entries.get(code)
+        if entry is not None and time.monotonic() - entry.stored_at > PORTAL_CACHE_TTL_SECONDS:
+            _drop(code)
+            entry = None
+        if entry is None:
+            return None, _generation
+        _entries.move_to_end(code)
+    return _respond(entry), None
+
+
+def store_portal_response(response, dependencies, generation):
+    """
+    Keep a freshly built 200 response, unless something it depends on
+    changed while it was being built. Returns the response to send.
+    """
+    code = request.view_args["client_code"]
+    entry = _Entry(response.get_data(), frozenset(dependencies))
+    with _lock:
+        if generation == _generation:
+            _drop(code)
+            _entries[code] = entry
+            for key in entry.dependencies:
+                _dependents.setdefault(key, set()).add(code)
+            while len(_entries) > PORTAL_CACHE_SIZE:
+                _drop(next(iter(_entries)))
+    return _respond(entry)
+
+
+def _respond(entry):
+    if request.if_none_match.contains(entry.etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = current_app.response_class(entry.body, mimetype="application/json")
+    response.set_etag(entry.etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def invalidate_portal_cache(payload=None):
+    """Drop the entries built from any of the comma separated keys ("*" or None: all)."""
+    global _generation
+    with _lock:
+        _generation += 1
+        if not payload or payload == "*":
+            _entries.clear()
+            _dependents.clear()
+            return
+        for key in payload.split(","):
+            for code in list(_dependents.get(key, ())):
+                _drop(code)
+
+
+subscribe(RESOURCE_CHANNEL, invalidate_portal_cache)
@@ -0,0 +1,246 @@
+import os
+from datetime import datetime
+from database import db
+from models.sql_models import Building, Property
+from helpers.building_cache import get_building_directory, invalidate_building_cache, publish_building_change
+from helpers.bulk_sql import chunked, dialect_insert
+from helpers.image_variants import schedule_bulk_photo_variants
+from helpers.versioning import bump_versions
+
+# Rows inserted (and committed) per batch
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+
+CREATED = "created"
+SKIPPED_DUPLICATE = "skipped_duplicate"
+INVALID = "invalid"
+
+_INT_FIELDS = ("bedrooms", "bathrooms", "year_built", "floor")
+_FLOAT_FIELDS = ("size", "price", "sell_price")
+_TEXT_FIELDS = ("unit", "owner", "contact", "area", "status", "sent", "preferred_tenant")
+
+# Column limits, checked up front so one bad row cannot fail a whole batch
+_MAX_LENGTHS = {"property_code": 50, "unit": 50, "owner": 255, "contact": 100,
+                "area": 2, "status": 100, "sent": 3, "building": 255}
+_MAX_NUMERIC = 10 ** 8  # Numeric(10, 2)
+
+
+def coerce_property_row(raw):
+    """
+    Validate one incoming listing and convert it to Property column values.
+    The building is returned separately as (building_id, building_name) since
+    a name may still need resolving. Raises ValueError with the reason.
+    """
+    if not isinstance(raw, dict):
+        raise ValueError("row is not an object")
+
+    property_code = (raw.get("property_code") or "").strip()
+    if not property_code:
+        raise ValueError("missing property_code")
+
+    values = {"property_code": property_code}
+    for field in _TEXT_FIELDS:
+        value = raw.get(field)
+        values[field] = value.strip() if isinstance(value, str) else value
+    if not values["unit"]:
+        raise ValueError("missing unit")
+    for field, max_length in _MAX_LENGTHS.items():
+        value = values.get(field, raw.get(field))
+        if isinstance(value, str) and len(value.strip()) > max_length:
+            raise ValueError(f"{field} is longer than {max_length} characters")
+
+    for field in _INT_FIELDS:
+        try:
+            values[field] = int(raw[field]) if raw.get(field) else None
+        except (TypeError, ValueError):
+            raise ValueError(f"{field} must be an integer, got {raw.get(field)!r}")
+        if values[field] is not None and abs(values[field]) >= 2 ** 31:
+            raise ValueError(f"{field} is too large")
+    for field in _FLOAT_FIELDS:
+        try:
+            values[field] = float(raw[field]) if raw.get(field) else None
+        except (TypeError, ValueError):
+            raise ValueError(f"{field} must be a number, got {raw.get(field)!r}")
+        if values[field] is not None and abs(values[field]) >= _MAX_NUMERIC:
+            raise ValueError(f"{field} is too large")
+
+    values["photo_urls"] = raw.get("photo_urls")
+
+    building_name = raw.get("building")
+    building_name = building_name.strip() if isinstance(building_name, str) else None
+    building_id = raw.get("building_id")
+    if building_id:
+        try:
+            building_id = int(building_id)
+        except (TypeError, ValueError):
+            raise ValueError(f"building_id must be an integer, got {building_id!r}")
+    if not building_id and not building_name:
+        raise ValueError("missing building or building_id")
+
+    return values, building_id or None, building_name or None
+
+
+def resolve_building_names(names):
+    """
+    Map building names to ids, creating the missing buildings. Known names
+    come from the building cache; the rest take one lookup, one INSERT ..
+    ON CONFLICT DO NOTHING and (if anything was missing) one more lookup to
+    pick up rows a concurrent import created first.
+    """
+    names = set(names)
+    if not names:
+        return {}
+    cached = get_building_directory().ids_by_name
+    ids = {name: cached[name] for name in names if name in cached}
+    unknown = names - ids.keys()
+    if unknown:
+        ids.update(
+            db.session.query(Building.name, Building.id).filter(Building.name.in_(unknown)).all()
+        )
+    missing = names - ids.keys()
+    if missing:
+        now = datetime.utcnow()
+        db.session.execute(
+            dialect_insert(Building).on_conflict_do_nothing(index_elements=["name"]),
+            [{"name": name, "created_at": now} for name in missing],
+        )
+        ids.update(
+            db.session.query(Building.name, Building.id).filter(Building.name.in_(missing)).all()
+        )
+        bump_versions(db.session, ["buildings"])
+        publish_building_change(db.session)
+        print(f"[BULK IMPORT] Created {len(missing)} new buildings.")
+        invalidate_building_cache()
+    return ids
+
+
+def import_properties(rows, default_photo_urls=None, chunk_size=IMPORT_CHUNK_SIZE, progress=None):
+    """
+    Import a list of listing dicts with a handful of set-based statements per
+    chunk, committing each chunk. Returns one result per input row:
+    {"index", "property_code", "status", and "id" or "reason"}, where status
+    is created, skipped_duplicate or invalid.
+
+    progress, if given, is called as progress(processed_rows, counts) after
+    every chunk. Once every chunk is done, the photos of the created rows are
+    queued for variant generation.
+    """
+    results = [None] * len(rows)
+    pending = []
+    seen_codes = set()
+
+    for index, raw in enumerate(rows):
+        code = raw.get("property_code") if isinstance(raw, dict) else None
+        try:
+            values, building_id, building_name = coerce_property_row(raw)
+        except ValueError as e:
+            results[index] = {"index": index, "property_code": code, "status": INVALID, "reason": str(e)}
+            continue
+        code = values["property_code"]
+        if code in seen_codes:
+            results[index] = {"index": index, "property_code": code, "status": SKIPPED_DUPLICATE,
+                              "reason": "property_code repeated earlier in this upload"}
+            continue
+        seen_codes.add(code)
+        pending.append((index, values, building_id, building_name))
+
+    processed = len(rows) - len(pending)
+    for chunk in chunked(pending, chunk_size):
+        try:
+            _import_chunk(chunk, results, default_photo_urls)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"[BULK IMPORT] Chunk failed: {str(e)}")
+            # Duplicates and validation failures found before the error still
+            # stand; rows with no outcome, or whose insert was rolled back, failed
+            for index, values, _, _ in chunk:
+                if results[index] is None or results[index]["status"] == CREATED:
+                    results[index] = {"index": index, "property_code": values["property_code"],
+                                      "status": INVALID, "reason": f"database error: {str(e)}"}
+        processed += len(chunk)
+        if progress:
+            progress(processed, summarize(results))
+
+    created_ids = [result["id"] for result in results if result["status"] == CREATED]
+    if created_ids:
+        schedule_bulk_photo_variants(created_ids)
+    return results
+
+
+def _import_chunk(chunk, results, default_photo_urls):
+    codes = [values["property_code"] for _, values, _, _ in chunk]
+    existing = {
+        code for (code,) in
+        db.session.query(Property.property_code).filter(Property.property_code.in_(codes)).all()
+    }
+
+    names = {name for _, values, building_id, name in chunk
+             if not building_id and values["property_code"] not in existing}
+    ids_by_name = resolve_building_names(names)
+    given_ids = {building_id for _, _, building_id, _ in chunk if building_id}
+    known_ids = {
+        building_id for (building_id,) in
+        db.session.query(Building.id).filter(Building.id.in_(given_ids)).all()
+    } if given_ids else set()
+
+    now = datetime.utcnow()
+    to_insert = {}
+    for index, values, building_id, building_name in chunk:
+        code = values["property_code"]
+        if code in existing:
+            results[index] = {"index": index, "property_code": code, "status": SKIPPED_DUPLICATE,
+                              "reason": "property_code already exists"}
+            continue
+        if building_id and building_id not in known_ids:
+            results[index] = {"index": index, "property_code": code, "status": INVALID,
+                              "reason": f"building_id {building_id} does not exist"}
+            continue
+        row = dict(values)
+        row["building_id"] = building_id or ids_by_name[building_name]
+        row["building_name"] = building_name
+        row["photo_urls"] = values["photo_urls"] or default_photo_urls
+        row["created_at"] = now
+        row["updated_at"] = now
+        to_insert[code] = (index, row)
+
+    if not to_insert:
+        return
+    stmt = (
+        dialect_insert(Property)
+        .on_conflict_do_nothing(index_elements=["property_code"])
+        .returning(Property.id, Property.property_code)
+    )
+    created = dict(
+        (code, property_id) for property_id, code in
+        db.session.execute(stmt, [row for _, row in to_insert.values()]).all()
+    )
+    if created:
+        bump_versions(db.session, ["properties"])
+    for code, (index, _) in to_insert.items():
+        if code in created:
+            results[index] = {"index": index, "property_code": code, "status": CREATED, "id": created[code]}
+        else:
+            # Inserted by a concurrent request between our lookup and the insert
+            results[index] = {"index": index, "property_code": code, "status": SKIPPED_DUPLICATE,
+                              "reason": "property_code already exists"}
+
+
+def summarize(results):
+    """Count results by status (rows not yet processed are ignored)."""
+    counts = {CREATED: 0, SKIPPED_DUPLICATE: 0, INVALID: 0}
+    for result in results:
+        if result:
+            counts[result["status"]] += 1
+    return counts
+
+
+def run_import_job(job, rows, default_photo_urls=None):
+    """Background-job entry point for import_properties (see helpers/jobs.py)."""
+    results = import_properties(
+        rows,
+        default_photo_urls=default_photo_urls,
+        progress=lambda processed, counts: job.update(processed=processed, counts=counts),
+    )
+    counts = summarize(results)
+    job.update(counts=counts, errors=[r for r in results if r["status"] != CREATED])
+    return {"counts": counts}
@@ -0,0 +1,89 @@
+import os
+from contextlib import contextmanager
+from functools import wraps
+from flask import current_app, g, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Raise instead of just logging when a route goes over its budget.
+# Always on when the app runs with TESTING=True.
+QUERY_BUDGET_ENFORCED = os.getenv("QUERY_BUDGET_ENFORCED", "false").lower() == "true"
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a request runs more SQL statements than its route allows."""
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.statements = []
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    if not has_app_context() or g.get("_uncounted_depth"):
+        return
+    for counter in g.get("_query_counters", ()):
+        counter.count += 1
+        counter.statements.append(statement)
+
+
+@contextmanager
+def count_queries():
+    """
+    Count the SQL statements executed inside the block, e.g. around a
+    test client call:
+
+        with count_queries() as counter:
+            client.get("/clients/1")
+        assert counter.count <= 2
+    """
+    counter = QueryCounter()
+    counters = g.setdefault("_query_counters", [])
+    counters.append(counter)
+    try:
+        yield counter
+    finally:
+        counters.remove(counter)
+
+
+@contextmanager
+def uncounted():
+    """
+    Statements inside the block are not charged to any budget. Only for
+    per-worker cache fills (the building directory): they run once per
+    worker and TTL, not once per request, so a budget that counted them
+    would have to allow for the cold cache on every request.
+    """
+    if not has_app_context():
+        yield
+        return
+    g._uncounted_depth = g.get("_uncounted_depth", 0) + 1
+    try:
+        yield
+    finally:
+        g._uncounted_depth -= 1
+
+
+def query_budget(max_queries):
+    """
+    Decorator that counts the statements a view executes and fails the
+    request once it exceeds max_queries (logs a warning when not enforced).
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with count_queries() as counter:
+                response = func(*args, **kwargs)
+            if counter.count > max_queries:
+                message = (
+                    f"{func.__name__} ran {counter.count} queries "
+                    f"(budget {max_queries}): {counter.statements}"
+                )
+                if QUERY_BUDGET_ENFORCED or current_app.testing:
+                    raise QueryBudgetExceeded(message)
+                print(f"[QUERY BUDGET] {message}")
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,293 @@
+from operator import attrgetter
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import load_only
+from models.sql_models import Property
+
+# Declarative serializers shared by every route. A Serializer is a list of
+# (key, source, converter) fields, turned once into a tuple of
+# (key, attribute, reader, converter) entries that one loop walks per row.
+# Plain attributes are read from the instance __dict__, where SQLAlchemy
+# keeps loaded column values, skipping the attribute descriptor; expired,
+# deferred and unloaded attributes are absent there and fall back to normal
+# attribute access, so they load exactly as they would in hand-written code.
+
+
+# ----------------------------------------
+# Converters (each one handles None itself)
+# ----------------------------------------
+def to_float(value):
+    """Numeric/Decimal -> float; zero and None become None, as the API always returned."""
+    return float(value) if value else None
+
+
+def to_float_keep_zero(value):
+    return float(value) if value is not None else None
+
+
+def to_datetime_string(value):
+    return value.strftime('%Y-%m-%d %H:%M:%S') if value else None
+
+
+def to_date_string(value):
+    return value.strftime('%Y-%m-%d') if value else None
+
+
+def or_empty_dict(value):
+    return value or {}
+
+
+class Field:
+    """
+    One output key. source is a dotted attribute path on the object
+    (defaults to the key) or a callable taking the object; convert, when
+    given, is applied to the value read. prepare, instead of a source, is
+    called once per serialization pass and returns the callable to use,
+    for sources that look up shared state such as the building directory.
+    columns names the model columns the field reads, for narrowing queries;
+    a plain attribute source is its own column.
+    """
+
+    def __init__(self, key, source=None, convert=None, columns=None, prepare=None):
+        self.key = key
+        self.source = source if source is not None else key
+        self.convert = convert
+        self.prepare = prepare
+        if columns is None:
+            plain = prepare is None and isinstance(self.source, str) and "." not in self.source
+            columns = (self.source,) if plain else ()
+        self.columns = tuple(columns)
+
+
+class Serializer:
+    def __init__(self, *fields, parent=None):
+        self.fields = tuple(field if isinstance(field, Field) else Field(field) for field in fields)
+        self.keys = tuple(field.key for field in self.fields)
+        self.columns = tuple(dict.fromkeys(column for field in self.fields for column in field.columns))
+        self.parent = parent  # the full serializer this one was narrowed from (see only())
+        self._subsets = {}
+        self._readers = self._build(self.fields)
+        self._prepared = any(field.prepare is not None for field in self.fields)
+
+    def __call__(self, obj):
+        return self.many((obj,))[0]
+
+    def many(self, objs):
+        readers = self._readers
+        if self._prepared:
+            # Resolve prepared sources once for the whole pass
+            readers = tuple(
+                (key, attribute, field.prepare() if field.prepare is not None else read, convert)
+                for field, (key, attribute, read, convert) in zip(self.fields, readers)
+            )
+        serialized = []
+        for obj in objs:
+            loaded = getattr(obj, "__dict__", _NOTHING_LOADED)
+            data = {}
+            for key, attribute, read, convert in readers:
+                if attribute is None:
+                    value = read(obj)
+                else:
+                    value = loaded.get(attribute, _NOT_LOADED)
+                    if value is _NOT_LOADED:
+                        value = getattr(obj, attribute)
+                data[key] = value if convert is None else convert(value)
+            serialized.append(data)
+        return serialized
+
+    def only(self, keys):
+        """
+        This serializer narrowed to the given keys (kept in this serializer's
+        order). Raises ValueError for unknown keys. Subsets are built once
+        and reused.
+        """
+        keys = frozenset(keys)
+        unknown = keys.difference(self.keys)
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+        subset = self._subsets.get(keys)
+        if subset is None:
+            if len(self._subsets) >= MAX_CACHED_SUBSETS:
+                self._subsets.clear()
+            subset = Serializer(*(field for field in self.fields if field.key in keys), parent=self)
+            self._subsets[keys] = subset
+        return subset
+
+    def pick(self, data):
+        """Narrow an already serialized dict to this serializer's keys."""
+        return {key: data[key] for key in self.keys}
+
+    @staticmethod
+    def _build(fields):
+        """(key, attribute, reader, converter) per field; attribute is set for plain attribute names."""
+        readers = []
+        for field in fields:
+            if field.prepare is not None:
+                readers.append((field.key, None, None, field.convert))
+            elif callable(field.source):
+                readers.append((field.key, None, field.source, field.convert))
+            elif "." in field.source:
+                readers.append((field.key, None, attrgetter(field.source), field.convert))
+            else:
+                readers.append((field.key, field.source, None, field.convert))
+        return tuple(readers)
+
+
+_NOT_LOADED = object()
+_NOTHING_LOADED = {}
+
+
+# ----------------------------------------
+# Sparse fieldsets (?fields=id,property_code,price)
+# ----------------------------------------
+# Distinct field combinations kept per serializer before the cache resets
+MAX_CACHED_SUBSETS = 256
+
+
+def requested_fields(serializer, value, extra=()):
+    """
+    Parse a ?fields= value. Returns (serializer, requested): the serializer
+    narrowed to the requested keys and the set of keys asked for, or the
+    serializer unchanged and None when no fields were given. Keys in extra
+    are ones the route adds itself (e.g. "assigned_properties"); they are
+    accepted but left to the route. Raises ValueError for unknown keys.
+    """
+    if not value:
+        return serializer, None
+    requested = {key.strip() for key in value.split(",") if key.strip()}
+    if not requested:
+        raise ValueError("fields must list at least one field")
+    return serializer.only(requested.difference(extra)), requested
+
+
+def narrow_query(query, model, serializer, *always):
+    """
+    Load only the columns a narrowed serializer reads (plus always, e.g.
+    the keyset columns), so unrequested text and JSON columns are neither
+    fetched nor decoded. A full serializer leaves the query as it is.
+    """
+    if serializer.parent is None:
+        return query
+    columns = dict.fromkeys((*serializer.columns, *always)) or {sa_inspect(model).primary_key[0].key: None}
+    return query.options(load_only(*(getattr(model, column) for column in columns)))
+
+
+# ----------------------------------------
+# Buildings
+# ----------------------------------------
+serialize_building = Serializer(
+    "id",
+    "name",
+    "year_built",
+    "nearest_bts",
+    "nearest_mrt",
+    Field("distance_to_bts", convert=to_float_keep_zero),
+    Field("distance_to_mrt", convert=to_float_keep_zero),
+    "facilities",
+    "photo_urls",
+    Field("created_at", convert=to_datetime_string),
+)
+
+
+# ----------------------------------------
+# Properties
+# ----------------------------------------
+def _building_name_reader():
+    # Imported here because helpers.building_cache uses serialize_building
+    from helpers.building_cache import get_building_directory
+    name = get_building_directory().name
+    return lambda prop: name(prop.building_id, prop.building_name)
+
+
+PROPERTY_FIELDS = (
+    "id",
+    "property_code",
+    Field("building", prepare=_building_name_reader, columns=("building_id", "building_name")),
+    "building_id",
+    "unit",
+    "owner",
+    "contact",
+    Field("size", convert=to_float),
+    "bedrooms",
+    "bathrooms",
+    "year_built",
+    "floor",
+    "area",
+    "status",
+    Field("price", convert=to_float),
+    Field("sell_price", convert=to_float),
+    "sent",
+    "preferred_tenant",
+    Field("photo_urls", Property.get_photo_urls, columns=("photo_urls",)),
+    Field("photo_variants", convert=or_empty_dict),
+    Field("created_at", convert=to_datetime_string),
+)
+
+serialize_property = Serializer(*PROPERTY_FIELDS)
+
+
+def _link_property_field(field):
+    """A property field read through ClientProperty.property."""
+    field = field if isinstance(field, Field) else Field(field)
+    if field.prepare is not None:
+        prepare = field.prepare
+
+        def prepare_link():
+            read = prepare()
+            return lambda cp: read(cp.property)
+
+        return Field(field.key, convert=field.convert, prepare=prepare_link)
+    if callable(field.source):
+        source = field.source
+        return Field(field.key, lambda cp: source(cp.property), field.convert)
+    return Field(field.key, f"property.{field.source}", field.convert)
+
+
+# A property as listed on a client: no building_id, and created_at, comment
+# and is_active come from the assignment itself
+serialize_assigned_property = Serializer(
+    *(_link_property_field(field) for field in PROPERTY_FIELDS
+      if (field.key if isinstance(field, Field) else field) not in ("building_id", "created_at")),
+    Field("created_at", convert=to_datetime_string),
+    "comment",
+    "is_active",
+)
+
+
+# ----------------------------------------
+# Clients
+# ----------------------------------------
+CLIENT_SUMMARY_FIELDS = (
+    "id",
+    "code",
+    "title",
+    "first_name",
+    "last_name",
+    "nationality",
+    "contact_type",
+    "contact",
+    Field("starting_date", convert=to_date_string),
+    Field("move_in", convert=to_date_string),
+    Field("budget", convert=to_float),
+    "bedrooms",
+    "bath",
+    "area",
+    "preferred",
+    "status",
+    "work_sheet",
+)
+
+serialize_client_summary = Serializer(*CLIENT_SUMMARY_FIELDS)
+
+# Client detail (GET /clients/<id>); assigned_properties is added by the route
+serialize_client = Serializer(
+    *CLIENT_SUMMARY_FIELDS[:14],
+    Field("size", convert=to_float),
+    *CLIENT_SUMMARY_FIELDS[14:],
+    "login_link",
+    "access_key",
+)
+
+# Client portal (GET /clients/code/<code>); building and assigned_properties are added by the route
+serialize_client_portal = Serializer(
+    *(field for field in serialize_client.fields if field.key not in ("login_link", "access_key")),
+)
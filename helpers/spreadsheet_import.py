@@ -0,0 +1,256 @@
+import csv
+import io
+import json
+import os
+from sqlalchemy import text
+from database import db
+from helpers.building_cache import invalidate_building_cache, publish_building_change
+from helpers.image_variants import schedule_bulk_photo_variants, stored_photo_urls
+from helpers.property_import import (
+    CREATED, INVALID, SKIPPED_DUPLICATE, coerce_property_row, import_properties,
+)
+from helpers.versioning import bump_versions
+
+# Rows buffered in memory before each COPY into the staging table
+COPY_BATCH_ROWS = int(os.getenv("COPY_BATCH_ROWS", "5000"))
+# Only the first few problems are listed in the response; all of them are counted
+MAX_REPORTED_ERRORS = 200
+
+STAGING_COLUMNS = (
+    "row_number", "property_code", "building_id", "building_name", "unit", "owner",
+    "contact", "size", "bedrooms", "bathrooms", "year_built", "floor", "area",
+    "status", "price", "sell_price", "sent", "preferred_tenant",
+)
+
+_CREATE_STAGING = """
+    CREATE TEMP TABLE property_import_staging (
+        row_number integer NOT NULL,
+        property_code varchar(50) NOT NULL,
+        building_id integer,
+        building_name varchar(255),
+        unit varchar(50),
+        owner varchar(255),
+        contact varchar(100),
+        size numeric(10, 2),
+        bedrooms integer,
+        bathrooms integer,
+        year_built integer,
+        floor integer,
+        area varchar(2),
+        status varchar(100),
+        price numeric(10, 2),
+        sell_price numeric(10, 2),
+        sent varchar(3),
+        preferred_tenant text
+    ) ON COMMIT DROP
+"""
+
+# Each step removes the rows it rejects and reports them with RETURNING
+_REJECT_STEPS = (
+    (SKIPPED_DUPLICATE, "property_code repeated earlier in this file", """
+        DELETE FROM property_import_staging s
+        USING property_import_staging first
+        WHERE s.property_code = first.property_code AND s.row_number > first.row_number
+        RETURNING s.row_number, s.property_code
+    """),
+    (SKIPPED_DUPLICATE, "property_code already exists", """
+        DELETE FROM property_import_staging s
+        USING properties p
+        WHERE p.property_code = s.property_code
+        RETURNING s.row_number, s.property_code
+    """),
+    (INVALID, "building_id does not exist", """
+        DELETE FROM property_import_staging s
+        WHERE s.building_id IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM buildings b WHERE b.id = s.building_id)
+        RETURNING s.row_number, s.property_code
+    """),
+)
+
+_MERGE_BUILDINGS = """
+    INSERT INTO buildings (name, created_at)
+    SELECT DISTINCT s.building_name, timezone('utc', now())
+    FROM property_import_staging s
+    WHERE s.building_id IS NULL
+    ON CONFLICT (name) DO NOTHING
+"""
+
+_MERGE_PROPERTIES = """
+    INSERT INTO properties (
+        property_code, building_id, building_name, unit, owner, contact, size,
+        bedrooms, bathrooms, year_built, floor, area, status, price, sell_price,
+        sent, preferred_tenant, photo_urls, created_at, updated_at
+    )
+    SELECT
+        s.property_code, COALESCE(s.building_id, b.id), s.building_name, s.unit,
+        s.owner, s.contact, s.size, s.bedrooms, s.bathrooms, s.year_built, s.floor,
+        s.area, s.status, s.price, s.sell_price, s.sent, s.preferred_tenant,
+        CAST(:photo_urls AS json), timezone('utc', now()), timezone('utc', now())
+    FROM property_import_staging s
+    LEFT JOIN buildings b ON s.building_id IS NULL AND b.name = s.building_name
+    ORDER BY s.row_number
+    ON CONFLICT (property_code) DO NOTHING
+    RETURNING id
+"""
+
+
+# ----------------------------------------
+# Readers: yield (row_number, dict) one row at a time
+# ----------------------------------------
+def _normalize_header(name):
+    return str(name or "").strip().lower().replace(" ", "_")
+
+
+def iter_csv_rows(stream):
+    """Read a CSV upload row by row. The first row holds the column names."""
+    reader = csv.reader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    header = [_normalize_header(name) for name in next(reader, [])]
+    for row_number, row in enumerate(reader, start=2):
+        if any(cell.strip() for cell in row):
+            yield row_number, {key: (cell.strip() or None) for key, cell in zip(header, row)}
+
+
+def iter_xlsx_rows(stream):
+    """
+    Read the first sheet of an XLSX upload row by row (openpyxl read-only
+    mode). Raises ImportError straight away when openpyxl is not installed.
+    """
+    from openpyxl import load_workbook
+
+    def generate():
+        workbook = load_workbook(stream, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = [_normalize_header(name) for name in next(rows, ())]
+            for row_number, row in enumerate(rows, start=2):
+                values = {key: _cell_to_text(cell) for key, cell in zip(header, row)}
+                if any(value is not None for value in values.values()):
+                    yield row_number, values
+        finally:
+            workbook.close()
+
+    return generate()
+
+
+def _cell_to_text(cell):
+    # Spreadsheet numbers come back as floats; keep "12" rather than "12.0"
+    if cell is None:
+        return None
+    if isinstance(cell, float) and cell.is_integer():
+        cell = int(cell)
+    cell = str(cell).strip()
+    return cell or None
+
+
+# ----------------------------------------
+# Import
+# ----------------------------------------
+def import_spreadsheet(rows, default_photo_urls=None):
+    """
+    Validate and import (row_number, dict) rows. On PostgreSQL the valid rows
+    are COPY'd into a temporary staging table in batches and merged into
+    buildings/properties with set-based SQL in a single transaction; other
+    databases fall back to the chunked import engine.
+    """
+    report = _Report()
+    if db.session.get_bind().dialect.name == "postgresql":
+        _copy_and_merge(rows, default_photo_urls, report)
+    else:
+        _import_in_chunks(rows, default_photo_urls, report)
+    return report.as_dict()
+
+
+def _copy_and_merge(rows, default_photo_urls, report):
+    connection = db.session.connection()
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(_CREATE_STAGING)
+        copy_sql = f"COPY property_import_staging ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+
+        for batch in _valid_batches(rows, report):
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerows(batch)
+            buffer.seek(0)
+            cursor.copy_expert(copy_sql, buffer)
+    finally:
+        cursor.close()
+
+    for status, reason, sql in _REJECT_STEPS:
+        for row_number, property_code in db.session.execute(text(sql)):
+            report.add(status, row_number, property_code, reason)
+    report.buildings_created = db.session.execute(text(_MERGE_BUILDINGS)).rowcount
+    created_ids = db.session.execute(
+        text(_MERGE_PROPERTIES), {"photo_urls": json.dumps(default_photo_urls)}
+    ).scalars().all()
+    report.counts[CREATED] = len(created_ids)
+    bump_versions(db.session, ["properties", "buildings"] if report.buildings_created else ["properties"])
+    if report.buildings_created:
+        publish_building_change(db.session)
+    db.session.commit()
+    if report.buildings_created:
+        invalidate_building_cache()
+    # Every merged row carries the default photos, so there is only work to
+    # queue when those are stored photos rather than the placeholder
+    if created_ids and stored_photo_urls(default_photo_urls):
+        schedule_bulk_photo_variants(created_ids)
+
+
+def _valid_batches(rows, report):
+    """Yield lists of staging-table tuples, COPY_BATCH_ROWS at a time."""
+    batch = []
+    for row_number, raw in rows:
+        try:
+            values, building_id, building_name = coerce_property_row(raw)
+        except ValueError as e:
+            report.add(INVALID, row_number, raw.get("property_code"), str(e))
+            continue
+        values.update(row_number=row_number, building_id=building_id, building_name=building_name)
+        batch.append(tuple(values[column] for column in STAGING_COLUMNS))
+        if len(batch) >= COPY_BATCH_ROWS:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _import_in_chunks(rows, default_photo_urls, report):
+    def flush(buffered):
+        results = import_properties([raw for _, raw in buffered], default_photo_urls)
+        for (row_number, _), result in zip(buffered, results):
+            if result["status"] == CREATED:
+                report.counts[CREATED] += 1
+            else:
+                report.add(result["status"], row_number, result["property_code"], result["reason"])
+
+    buffered = []
+    for row in rows:
+        buffered.append(row)
+        if len(buffered) >= COPY_BATCH_ROWS:
+            flush(buffered)
+            buffered = []
+    if buffered:
+        flush(buffered)
+
+
+class _Report:
+    def __init__(self):
+        self.counts = {CREATED: 0, SKIPPED_DUPLICATE: 0, INVALID: 0}
+        self.errors = []
+        self.buildings_created = 0
+
+    def add(self, status, row_number, property_code, reason):
+        self.counts[status] += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({
+                "row": row_number, "property_code": property_code,
+                "status": status, "reason": reason,
+            })
+
+    def as_dict(self):
+        return {
+            "counts": self.counts,
+            "buildings_created": self.buildings_created,
+            "errors": sorted(self.errors, key=lambda error: error["row"]),
+            "errors_truncated": sum(self.counts.values()) - self.counts[CREATED] > len(self.errors),
+        }
@@ -0,0 +1,155 @@
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config as BotoConfig
+from dotenv import load_dotenv
+
+# Load .env file
+load_dotenv()
+
+# Read Cloudflare R2 credentials and endpoint from environment variables.
+# Point R2_ENDPOINT at any S3-compatible server (e.g. MinIO) for local testing.
+R2_ACCESS_KEY = os.environ.get("R2_ACCESS_KEY")
+R2_SECRET_KEY = os.environ.get("R2_SECRET_KEY")
+R2_ENDPOINT = os.environ.get("R2_ENDPOINT")
+R2_BUCKET = os.environ.get("R2_BUCKET", "amasproperties")
+
+# Files uploaded at once by POST /upload/batch, per gunicorn worker
+UPLOAD_CONCURRENCY = int(os.environ.get("UPLOAD_CONCURRENCY", "8"))
+
+# Configure boto3 client using the environment variables. The connection pool
+# is sized so every concurrent upload (and its multipart parts) gets a socket.
+s3_client = boto3.client(
+    "s3",
+    endpoint_url=R2_ENDPOINT,
+    aws_access_key_id=R2_ACCESS_KEY,
+    aws_secret_access_key=R2_SECRET_KEY,
+    config=BotoConfig(signature_version="s3v4", max_pool_connections=UPLOAD_CONCURRENCY * 4),
+)
+
+# Large photos go up as parallel multipart chunks instead of a single PUT
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=4,
+)
+
+# Photo uploads that go straight from the browser to the bucket. Only formats
+# Pillow can decode, so every accepted photo gets variants (no HEIC).
+PHOTO_CONTENT_TYPES = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+}
+# Stock image given to imported listings that arrive without photos
+PLACEHOLDER_PHOTO_KEY = "noimageyet.jpg"
+
+MAX_PHOTO_BYTES = int(os.environ.get("MAX_PHOTO_BYTES", str(15 * 1024 * 1024)))
+PRESIGN_EXPIRES_SECONDS = int(os.environ.get("PRESIGN_EXPIRES_SECONDS", "900"))
+
+
+def public_url(key):
+    """Public URL of an object, in the same form /upload has always returned."""
+    return f"{R2_ENDPOINT}/{key}"
+
+
+def key_from_url(url):
+    """Object key for a URL built by public_url, or None for foreign URLs."""
+    prefix = f"{R2_ENDPOINT}/"
+    if R2_ENDPOINT and isinstance(url, str) and url.startswith(prefix):
+        return url[len(prefix):]
+    return None
+
+
+def photo_key_prefix(property_id, label):
+    return f"properties/{property_id}/{label}/"
+
+
+def new_photo_key(property_id, label, content_type):
+    return f"{photo_key_prefix(property_id, label)}{uuid.uuid4()}{PHOTO_CONTENT_TYPES[content_type]}"
+
+
+def presign_photo_upload(key, content_type, size, method="put"):
+    """
+    Signed request the browser uses to upload one photo directly to the
+    bucket. A PUT URL is signed for the exact content type and length; a POST
+    policy pins the content type and caps the size at MAX_PHOTO_BYTES.
+    """
+    if method == "post":
+        presigned = s3_client.generate_presigned_post(
+            Bucket=R2_BUCKET,
+            Key=key,
+            Fields={"Content-Type": content_type, "acl": "public-read"},
+            Conditions=[
+                {"Content-Type": content_type},
+                {"acl": "public-read"},
+                ["content-length-range", 1, MAX_PHOTO_BYTES],
+            ],
+            ExpiresIn=PRESIGN_EXPIRES_SECONDS,
+        )
+        return {"method": "POST", "url": presigned["url"], "fields": presigned["fields"]}
+
+    url = s3_client.generate_presigned_url(
+        "put_object",
+        Params={
+            "Bucket": R2_BUCKET,
+            "Key": key,
+            "ContentType": content_type,
+            "ContentLength": size,
+            "ACL": "public-read",
+        },
+        ExpiresIn=PRESIGN_EXPIRES_SECONDS,
+    )
+    return {
+        "method": "PUT",
+        "url": url,
+        "headers": {"Content-Type": content_type, "x-amz-acl": "public-read"},
+    }
+
+
+def head_photo(key):
+    """Metadata (ContentType, ContentLength, ...) of an uploaded object."""
+    return s3_client.head_object(Bucket=R2_BUCKET, Key=key)
+
+
+_upload_pool = None
+_upload_pool_lock = threading.Lock()
+
+
+def _get_upload_pool():
+    # Created on first use so each forked gunicorn worker gets its own threads
+    global _upload_pool
+    with _upload_pool_lock:
+        if _upload_pool is None:
+            _upload_pool = ThreadPoolExecutor(max_workers=UPLOAD_CONCURRENCY, thread_name_prefix="upload")
+        return _upload_pool
+
+
+def upload_file(fileobj, key, content_type):
+    """Upload a file object as a public-read object and return its public URL."""
+    s3_client.upload_fileobj(
+        fileobj,
+        R2_BUCKET,
+        key,
+        ExtraArgs={"ACL": "public-read", "ContentType": content_type},
+        Config=TRANSFER_CONFIG,
+    )
+    return public_url(key)
+
+
+def upload_files(uploads):
+    """
+    Upload many (fileobj, key, content_type) tuples at once on the bounded
+    upload pool. Returns one (url, None) or (None, error) per upload, in order.
+    """
+    futures = [_get_upload_pool().submit(upload_file, *upload) for upload in uploads]
+    results = []
+    for future in futures:
+        try:
+            results.append((future.result(), None))
+        except Exception as e:
+            results.append((None, str(e)))
+    return results
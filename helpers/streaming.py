@@ -0,0 +1,76 @@
+import os
+import traceback
+from itertools import islice
+from flask import Response, current_app, request, stream_with_context
+
+NDJSON_MIMETYPES = ("application/x-ndjson", "application/ndjson")
+JSON_STREAM_MIMETYPE = "application/stream+json"
+
+# Rows fetched from the server-side cursor and flushed to the socket per chunk
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "500"))
+
+
+def requested_stream_format():
+    """
+    Return "ndjson" or "array" when the client explicitly asked for a streamed
+    list through the Accept header, otherwise None (wildcards never stream).
+    """
+    for mimetype, quality in request.accept_mimetypes:
+        if quality <= 0:
+            continue
+        if mimetype in NDJSON_MIMETYPES:
+            return "ndjson"
+        if mimetype == JSON_STREAM_MIMETYPE:
+            return "array"
+    return None
+
+
+def stream_query(query, serialize, fmt, batch_size=STREAM_BATCH_SIZE):
+    """
+    Stream the rows of a query as NDJSON or as a chunked JSON array.
+    Rows come off a server-side cursor (yield_per) and are serialized and
+    flushed batch_size at a time, so memory use does not grow with the result.
+
+    The query runs and the first batch is serialized before the Response is
+    built, so a failing query still raises into the route (and its 500). A
+    failure after the 200 has gone out ends the body with an error marker:
+    a final {"error": ...} line for NDJSON, or a final {"error": ...} element
+    with no closing "]" for an array, so the body is never a complete list.
+    """
+    dumps = current_app.json.dumps
+    rows = iter(query.yield_per(batch_size))
+    first_batch = [dumps(serialize(row)) for row in islice(rows, batch_size)]
+
+    def generate():
+        count = 0
+        batch = first_batch
+        if fmt == "array":
+            yield "["
+        try:
+            for row in rows:
+                if len(batch) >= batch_size:
+                    yield _encode_batch(batch, fmt, count)
+                    count += len(batch)
+                    batch = []
+                batch.append(dumps(serialize(row)))
+            if batch:
+                yield _encode_batch(batch, fmt, count)
+                count += len(batch)
+        except Exception as e:
+            traceback.print_exc()
+            print(f"[STREAM] Failed after {count} rows: {str(e)}")
+            yield _encode_batch([dumps({"error": f"Stream failed: {str(e)}"})], fmt, count)
+            return
+        if fmt == "array":
+            yield "]"
+        print(f"[STREAM] Finished streaming {count} rows as {fmt}.")
+
+    mimetype = NDJSON_MIMETYPES[0] if fmt == "ndjson" else "application/json"
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
+
+def _encode_batch(batch, fmt, already_sent):
+    if fmt == "ndjson":
+        return "\n".join(batch) + "\n"
+    prefix = "," if already_sent else ""
+    return prefix + ",".join(batch)
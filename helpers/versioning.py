@@ -0,0 +1,171 @@
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+from itertools import chain
+from flask import current_app, make_response, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from database import db
+from models.sql_models import Building, Client, ClientProperty, Property, ResourceVersion
+from helpers.bulk_sql import dialect_insert
+from helpers.notifications import dispatch_local, publish
+
+# Version keys: one per collection ("properties") and one per row
+# ("property:12"). Every committed change bumps the keys it touches, and
+# read endpoints derive their ETag / Last-Modified from the keys they depend
+# on, so an unchanged poll is answered with a single small lookup.
+#
+# The bumped keys are also broadcast on RESOURCE_CHANNEL (comma separated)
+# when the transaction commits, for in-process caches that must drop
+# exactly the entries a change affects.
+RESOURCE_CHANNEL = "resource_changed"
+# NOTIFY payloads are limited to 8000 bytes; larger key sets are sent as "*"
+MAX_NOTIFY_PAYLOAD = 7000
+
+
+def resource_keys(obj):
+    """Version keys an ORM object's changes invalidate."""
+    if isinstance(obj, Property):
+        return {"properties", f"property:{obj.id}"}
+    if isinstance(obj, Building):
+        return {"buildings", f"building:{obj.id}"}
+    if isinstance(obj, Client):
+        return {"clients", f"client:{obj.id}"}
+    if isinstance(obj, ClientProperty):
+        return {"clients", f"client:{obj.client_id}"}
+    return set()
+
+
+def bump_versions(session, keys):
+    """
+    Increment the given version keys inside the session's current
+    transaction. ORM changes are tracked automatically; call this after
+    bulk statements (INSERT .. SELECT, COPY, UPDATE .. FROM) that bypass the
+    unit of work.
+
+    Row keys ("property:12") are bumped straight away. Collection keys
+    ("properties") are a single row every writer of that collection
+    updates, so its row lock would serialize concurrent writers from their
+    first change until they commit; they are bumped in one statement just
+    before COMMIT instead (see _bump_collection_versions), which keeps the
+    lock for the length of the commit only.
+    """
+    keys = set(keys)
+    if not keys:
+        return
+    collections = {key for key in keys if ":" not in key}
+    _upsert_versions(session, keys - collections)
+    session.info.setdefault("pending_collection_versions", set()).update(collections)
+    payload = ",".join(sorted(keys))
+    publish(session, RESOURCE_CHANNEL, payload if len(payload) <= MAX_NOTIFY_PAYLOAD else "*")
+    session.info.setdefault("changed_resources", set()).update(keys)
+
+
+def _upsert_versions(session, keys):
+    keys = sorted(keys)  # fixed order so concurrent writers lock rows alike
+    if not keys:
+        return
+    now = datetime.utcnow()
+    stmt = dialect_insert(ResourceVersion)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["resource"],
+        set_={"version": ResourceVersion.version + 1, "updated_at": stmt.excluded.updated_at},
+    )
+    session.connection().execute(stmt, [{"resource": key, "version": 1, "updated_at": now} for key in keys])
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_flushed_resources(session, flush_context):
+    keys = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        keys |= resource_keys(obj)
+    bump_versions(session, keys)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_collection_versions(session):
+    # Flush first so ORM changes still pending add their keys now, not after
+    # the collection rows have been written
+    session.flush()
+    keys = session.info.pop("pending_collection_versions", None)
+    if keys:
+        _upsert_versions(session, keys)
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_committed_resources(session):
+    # This worker's own caches are cleared at once; the others on NOTIFY
+    keys = session.info.pop("changed_resources", None)
+    if keys:
+        payload = ",".join(sorted(keys))
+        dispatch_local(RESOURCE_CHANNEL, payload if len(payload) <= MAX_NOTIFY_PAYLOAD else "*")
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_resources(session):
+    session.info.pop("changed_resources", None)
+    session.info.pop("pending_collection_versions", None)
+
+
+def current_versions(keys):
+    """(etag, last_modified) for a set of version keys; one indexed lookup."""
+    rows = (
+        db.session.query(ResourceVersion.resource, ResourceVersion.version, ResourceVersion.updated_at)
+        .filter(ResourceVersion.resource.in_(keys))
+        .all()
+    )
+    versions = {row.resource: row.version for row in rows}
+    # The URL and Accept header are part of the tag: filters, pages and the
+    # streaming formats are different representations of the same versions
+    fingerprint = "|".join(
+        [request.full_path, request.headers.get("Accept", "")]
+        + [f"{key}={versions.get(key, 0)}" for key in sorted(keys)]
+    )
+    etag = hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()[:20]
+    last_modified = max((row.updated_at for row in rows), default=None)
+    if last_modified is not None:
+        last_modified = last_modified.replace(microsecond=0, tzinfo=timezone.utc)
+    return etag, last_modified
+
+
+def conditional_get(*resources):
+    """
+    Decorator for read endpoints. resources are version keys, formatted
+    with the view's URL arguments ("property:{property_id}"). Requests whose
+    If-None-Match (or If-Modified-Since) still matches get an empty 304
+    before the view runs; successful responses carry ETag and Last-Modified.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return func(*args, **kwargs)
+
+            keys = [resource.format(**kwargs) for resource in resources]
+            etag, last_modified = current_versions(keys)
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                not_modified = bool(
+                    last_modified and request.if_modified_since
+                    and last_modified <= request.if_modified_since
+                )
+            if not_modified:
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(func(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            # Let browsers keep the body but revalidate it on every poll
+            response.headers.setdefault("Cache-Control", "no-cache")
+            response.vary.add("Accept")
+            return response
+        return wrapper
+    return decorator
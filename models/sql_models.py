@@ -1,6 +1,10 @@
 from datetime import datetime
 import json
+from sqlalchemy.orm import deferred
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from pgvector.sqlalchemy import Vector
 from database import db, bcrypt
+from database.similarity import EMBEDDING_DIMENSIONS
 
 class User(db.Model):
     __tablename__ = "users"
@@ -70,6 +74,14 @@ class Building(db.Model):
     photo_urls = db.Column(db.JSON, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Trigram index for fuzzy autocomplete and ILIKE '%term%' searches
+        db.Index(
+            "ix_buildings_name_trgm", "name",
+            postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
+
     def __repr__(self):
         return f"<Building {self.name}>"
 
@@ -95,7 +107,28 @@ class Property(db.Model):
     preferred_tenant = db.Column(db.Text)
     sent = db.Column(db.String(3), nullable=True)  # Yes or No
     photo_urls = db.Column(db.JSON, nullable=True)  # Store photo URLs as JSON object
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    photo_variants = db.Column(db.JSON, nullable=True)  # Original URL -> {size: {format: URL}} or {"error": ...}
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # Keyset pagination key
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Maintained by a database trigger (migrations 0004, 0011); deferred so normal loads skip it
+    search_vector = deferred(db.Column(TSVECTOR().with_variant(db.Text, "sqlite"), nullable=True))
+    # Feature vector for "similar listings", also trigger-maintained (migrations 0007, 0012)
+    embedding = deferred(db.Column(Vector(EMBEDDING_DIMENSIONS).with_variant(db.Text, "sqlite"), nullable=True))
+
+    __table_args__ = (
+        # List filters, keyset pagination and the matching snapshot refresh
+        db.Index("ix_properties_building_id", "building_id"),
+        db.Index("ix_properties_status", "status"),
+        db.Index("ix_properties_area", "area"),
+        db.Index("ix_properties_price", "price"),
+        db.Index("ix_properties_created_at_id", "created_at", "id"),
+        db.Index("ix_properties_updated_at", "updated_at"),
+        db.Index("ix_properties_search_vector", "search_vector", postgresql_using="gin"),
+        db.Index(
+            "ix_properties_embedding_hnsw", "embedding",
+            postgresql_using="hnsw", postgresql_ops={"embedding": "vector_l2_ops"},
+        ),
+    )
 
     # Relationships
     building = db.relationship("Building", backref=db.backref("properties", lazy=True))
@@ -146,8 +179,65 @@ class ClientProperty(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=False, nullable=False)  # New column
 
+    __table_args__ = (
+        # A property is assigned to a client at most once; also serves lookups by client
+        db.Index("ux_client_properties_client_property", "client_id", "property_id", unique=True),
+        # Reverse lookups and the ON DELETE CASCADE from properties
+        db.Index("ix_client_properties_property_id", "property_id"),
+    )
+
     client = db.relationship("Client", back_populates="client_properties")
     property = db.relationship("Property", back_populates="client_properties")
 
     def __repr__(self):
         return f"<ClientProperty client_id={self.client_id} property_id={self.property_id} is_active={self.is_active}>"
+
+class Job(db.Model):
+    __tablename__ = "jobs"
+
+    id = db.Column(db.String(36), primary_key=True)  # UUID handed back to the caller
+    kind = db.Column(db.String(50), nullable=False)  # e.g. "property_import"
+    status = db.Column(db.String(20), nullable=False, default="queued")  # queued, running, succeeded, failed
+    total = db.Column(db.Integer, nullable=True)  # Units of work, when known up front
+    processed = db.Column(db.Integer, nullable=False, default=0)
+    counts = db.Column(db.JSON, nullable=True)
+    errors = db.Column(db.JSON, nullable=True)
+    result = db.Column(db.JSON, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    owner = db.Column(db.String(100), nullable=True)  # "host:pid" of the worker running it
+    heartbeat_at = db.Column(db.DateTime, nullable=True)  # Refreshed by the owner while unfinished
+
+    __table_args__ = (
+        db.Index(
+            "ix_jobs_unfinished_heartbeat", "heartbeat_at",
+            postgresql_where=db.text("status IN ('queued', 'running')"),
+        ),
+    )
+
+    def __repr__(self):
+        return f"<Job {self.id} {self.kind} {self.status}>"
+
+class ResourceVersion(db.Model):
+    __tablename__ = "resource_versions"
+
+    # "properties", "property:12", "clients", "client:3", ... (see helpers/versioning.py)
+    resource = db.Column(db.String(100), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=1)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<ResourceVersion {self.resource} v{self.version}>"
+
+class SchemaMigration(db.Model):
+    __tablename__ = "schema_migrations"
+
+    # Applied database/migrations modules (see database/migrate.py)
+    version = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(255), nullable=False)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<SchemaMigration {self.version} {self.name}>"
+
@@ -0,0 +1,88 @@
+from datetime import timezone
+from flask import Blueprint, request, jsonify
+from sqlalchemy import text
+from database import db
+from database.analytics import (
+    BUILDING_PRICES_VIEW, CLIENT_ASSIGNMENTS_VIEW, PERCENTILES, PROPERTY_COUNTS_VIEW, SOURCE_VERSIONS_VIEW,
+)
+from helpers.cors_helpers import pre_authorized_cors_preflight
+
+analytics_bp = Blueprint('analytics_bp', __name__)
+
+# Rows returned per list (buildings, clients), largest first
+ANALYTICS_DEFAULT_LIMIT = 100
+ANALYTICS_MAX_LIMIT = 1000
+
+
+def _percentiles(row, prefix):
+    values = {f"p{int(p * 100)}": row[f"{prefix}_p{int(p * 100)}"] for p in PERCENTILES}
+    values = {key: round(value, 2) if value is not None else None for key, value in values.items()}
+    values["median"] = values["p50"]
+    return values
+
+
+# ----------------------------------------
+# GET Portfolio Analytics
+# ----------------------------------------
+@analytics_bp.route("/analytics", methods=["GET"])
+@pre_authorized_cors_preflight
+def get_analytics():
+    """
+    Listing counts by status, area and bedrooms, rent and sale price
+    percentiles per building and assignment counts per client. Everything
+    is read from materialized views refreshed in the background after
+    writes (helpers/analytics.py), so "refreshed_at" may trail the latest
+    change by a few seconds.
+    """
+    try:
+        limit = max(1, min(int(request.args.get("limit") or ANALYTICS_DEFAULT_LIMIT), ANALYTICS_MAX_LIMIT))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+
+    try:
+        counts = {"status": {}, "area": {}, "bedrooms": {}}
+        total = 0
+        for row in db.session.execute(text(f"SELECT dimension, value, listings FROM {PROPERTY_COUNTS_VIEW}")):
+            if row.dimension == "total":
+                total = row.listings
+            else:
+                counts[row.dimension][row.value if row.value is not None else "unknown"] = row.listings
+
+        buildings = [
+            {
+                "building_id": row["building_id"],
+                "building": row["building"],
+                "listings": row["listings"],
+                "rental_priced_listings": row["rental_priced_listings"],
+                "for_sale_listings": row["for_sale_listings"],
+                "rent": _percentiles(row, "rent"),
+                "sale": _percentiles(row, "sale"),
+            }
+            for row in db.session.execute(
+                text(f"SELECT * FROM {BUILDING_PRICES_VIEW} ORDER BY listings DESC, building_id LIMIT :limit"),
+                {"limit": limit},
+            ).mappings()
+        ]
+
+        clients = [
+            dict(row) for row in db.session.execute(
+                text(
+                    f"SELECT client_id, code, first_name, last_name, status, assigned, active "
+                    f"FROM {CLIENT_ASSIGNMENTS_VIEW} ORDER BY assigned DESC, client_id LIMIT :limit"
+                ),
+                {"limit": limit},
+            ).mappings()
+        ]
+
+        refreshed_at = db.session.execute(text(f"SELECT max(refreshed_at) FROM {SOURCE_VERSIONS_VIEW}")).scalar()
+        return jsonify({
+            "properties": dict(counts, total=total),
+            "buildings": buildings,
+            "clients": clients,
+            "refreshed_at": (
+                refreshed_at.astimezone(timezone.utc).strftime('%Y-%m-%d %H:%M:%S') if refreshed_at else None
+            ),
+        }), 200
+    except Exception as e:
+        print(f"[ANALYTICS] Exception: {str(e)}")
+        return jsonify({"error": f"Failed to fetch analytics: {str(e)}"}), 500
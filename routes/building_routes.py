@@ -3,68 +3,125 @@ from datetime import datetime
 from flask import Blueprint, request, jsonify
 from models.sql_models import Building
 from database import db
+from sqlalchemy import func, literal, or_
+from helpers.building_cache import (
+    cacheable_prefix, get_building_directory, get_cached_matches, invalidate_building_cache, store_matches,
+)
 from helpers.cors_helpers import pre_authorized_cors_preflight
+from helpers.serializers import narrow_query, requested_fields, serialize_building
+from helpers.streaming import requested_stream_format, stream_query
+from helpers.versioning import conditional_get
 
 building_bp = Blueprint('building_bp', __name__)
 
+AUTOCOMPLETE_DEFAULT_K = 10
+AUTOCOMPLETE_MAX_K = 50
+
 # ----------------------------------------
 # 1. GET All Buildings (with optional search)
 # ----------------------------------------
 @building_bp.route("/buildings", methods=["GET"])
 @pre_authorized_cors_preflight
+@conditional_get("buildings")
 def get_all_buildings():
     search = request.args.get('search', '')
     try:
-        query = db.session.query(Building)
+        serializer, requested = requested_fields(serialize_building, request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        query = narrow_query(db.session.query(Building), Building, serializer)
         if search:
             query = query.filter(Building.name.ilike(f"%{search}%"))
-        buildings = query.all()
-        if not buildings:
+        stream_format = requested_stream_format()
+        if stream_format:
+            return stream_query(query.order_by(Building.id), serializer, stream_format)
+
+        # The unfiltered list comes from the per-worker building cache
+        if search:
+            building_list = serializer.many(query.all())
+        else:
+            building_list = get_building_directory().buildings
+            if requested is not None:
+                building_list = [serializer.pick(b) for b in building_list]
+        if not building_list:
             return jsonify({"message": "No buildings found"}), 404
 
-        building_list = []
-        for b in buildings:
-            building_data = {
-                "id": b.id,
-                "name": b.name,
-                "year_built": b.year_built,
-                "nearest_bts": b.nearest_bts,
-                "nearest_mrt": b.nearest_mrt,
-                "distance_to_bts": float(b.distance_to_bts) if b.distance_to_bts is not None else None,
-                "distance_to_mrt": float(b.distance_to_mrt) if b.distance_to_mrt is not None else None,
-                "facilities": b.facilities,
-                "photo_urls": b.photo_urls,
-                "created_at": b.created_at.strftime('%Y-%m-%d %H:%M:%S') if b.created_at else None,
-            }
-            building_list.append(building_data)
         return jsonify(building_list), 200
 
     except Exception as e:
         return jsonify({"error": f"Failed to fetch buildings: {str(e)}"}), 500
 
+# ----------------------------------------
+# AUTOCOMPLETE Building names (fuzzy, ranked)
+# ----------------------------------------
+def find_building_matches(term, k):
+    """
+    Top-k buildings for a partial name. Names starting with the term come
+    first, then the closest fuzzy matches by pg_trgm word similarity; both
+    filters are served by the trigram index on buildings.name.
+    """
+    pattern = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    score = func.word_similarity(term, Building.name)
+    starts_with = Building.name.ilike(pattern)
+    rows = (
+        db.session.query(Building.id, Building.name, score)
+        .filter(or_(literal(term).op("<%")(Building.name), starts_with))
+        .order_by(starts_with.desc(), score.desc(), Building.name)
+        .limit(k)
+        .all()
+    )
+    return [{"id": row.id, "name": row.name, "score": round(float(row[2]), 4)} for row in rows]
+
+@building_bp.route("/buildings/autocomplete", methods=["GET"])
+@pre_authorized_cors_preflight
+@conditional_get("buildings")
+def autocomplete_buildings():
+    term = (request.args.get("q") or "").strip()
+    if not term:
+        return jsonify({"error": "Missing search term 'q'"}), 400
+    try:
+        k = int(request.args.get("k") or AUTOCOMPLETE_DEFAULT_K)
+    except ValueError:
+        return jsonify({"error": "k must be an integer"}), 400
+    k = max(1, min(k, AUTOCOMPLETE_MAX_K))
+
+    try:
+        # Short prefixes are cached with the full top list and sliced per request
+        prefix = cacheable_prefix(term)
+        if prefix:
+            matches, generation = get_cached_matches(prefix)
+            if matches is None:
+                matches = find_building_matches(term, AUTOCOMPLETE_MAX_K)
+                store_matches(prefix, matches, generation)
+            return jsonify({"buildings": matches[:k]}), 200
+
+        return jsonify({"buildings": find_building_matches(term, k)}), 200
+    except Exception as e:
+        return jsonify({"error": f"Failed to autocomplete buildings: {str(e)}"}), 500
+
 # ----------------------------------------
 # 2. GET Building by ID
 # ----------------------------------------
 @building_bp.route("/buildings/<int:building_id>", methods=["GET"])
 @pre_authorized_cors_preflight
+@conditional_get("building:{building_id}")
 def get_building(building_id):
     try:
-        b = db.session.query(Building).filter(Building.id == building_id).first()
-        if not b:
-            return jsonify({"error": "Building not found"}), 404
+        serializer, _ = requested_fields(serialize_building, request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        building_data = get_building_directory().by_id.get(building_id)
+        if building_data is not None:
+            building_data = serializer.pick(building_data)
+        else:
+            # Not cached yet (e.g. created moments ago by another worker)
+            b = narrow_query(db.session.query(Building), Building, serializer).filter(Building.id == building_id).first()
+            if not b:
+                return jsonify({"error": "Building not found"}), 404
+            building_data = serializer(b)
 
-        building_data = {
-            "id": b.id,
-            "name": b.name,
-            "year_built": b.year_built,
-            "nearest_bts": b.nearest_bts,
-            "nearest_mrt": b.nearest_mrt,
-            "distance_to_bts": float(b.distance_to_bts) if b.distance_to_bts is not None else None,
-            "distance_to_mrt": float(b.distance_to_mrt) if b.distance_to_mrt is not None else None,
-            "facilities": b.facilities,
-            "photo_urls": b.photo_urls,
-            "created_at": b.created_at.strftime('%Y-%m-%d %H:%M:%S') if b.created_at else None,
-        }
         return jsonify(building_data), 200
 
     except Exception as e:
@@ -90,6 +147,7 @@ def create_building():
         )
         db.session.add(new_building)
         db.session.commit()
+        invalidate_building_cache()
         return jsonify({
             "message": "Building created successfully",
             "building_id": new_building.id
@@ -121,6 +179,7 @@ def update_building(building_id):
         b.photo_urls = data.get("photo_urls", b.photo_urls)
 
         db.session.commit()
+        invalidate_building_cache()
         return jsonify({"message": "Building updated successfully"}), 200
 
     except Exception as e:
@@ -140,6 +199,7 @@ def delete_building(building_id):
 
         db.session.delete(b)
         db.session.commit()
+        invalidate_building_cache()
         return jsonify({"message": "Building deleted successfully"}), 200
 
     except Exception as e:
@@ -1,13 +1,29 @@
+import os
 import random
 import string
 from flask import Blueprint, request, jsonify
 from models.sql_models import Client, Property, ClientProperty
 from database import db
 from datetime import datetime
+from helpers.building_cache import get_building_directory
 from helpers.cors_helpers import pre_authorized_cors_preflight
+from helpers.matching import property_snapshot
+from helpers.portal_cache import cached_portal_response, store_portal_response
+from helpers.query_budget import query_budget
+from helpers.serializers import (
+    narrow_query, requested_fields, serialize_assigned_property, serialize_client, serialize_client_portal,
+    serialize_client_summary, serialize_property,
+)
+from helpers.streaming import requested_stream_format, stream_query
+from helpers.bulk_sql import dialect_insert, update_from_values
+from helpers.versioning import bump_versions, conditional_get
+from sqlalchemy.orm import selectinload
 
 client_bp = Blueprint("client_bp", __name__)
 
+# Most property ids accepted by one batch assign/unassign request
+MAX_BATCH_PROPERTY_IDS = int(os.getenv("MAX_BATCH_PROPERTY_IDS", "1000"))
+
 def generate_random_access_key():
     # Generates a random 6-character alphanumeric string
     return ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
@@ -15,73 +31,107 @@ def generate_random_access_key():
 # ----------------------------------------
 # 1. GET Client Details by ID (including assigned properties and login details)
 # ----------------------------------------
+def query_client_with_properties():
+    """
+    Client query that loads ClientProperty -> Property up front: one query
+    for the client and one for all its links with their property joined in,
+    instead of 1 + N lazy loads. Building names come from the building cache.
+    """
+    return db.session.query(Client).options(
+        selectinload(Client.client_properties)
+        .joinedload(ClientProperty.property)
+    )
+
 @client_bp.route("/clients/<int:client_id>", methods=["GET"])
 @pre_authorized_cors_preflight
+@conditional_get("client:{client_id}", "properties", "buildings")
+@query_budget(2)
 def get_client(client_id):
     print(f"[GET] Fetching client with ID: {client_id}")
-    client = db.session.query(Client).filter(Client.id == client_id).first()
+    try:
+        serializer, requested = requested_fields(
+            serialize_client, request.args.get("fields"), extra=("assigned_properties",)
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    # The assigned properties are only loaded when they are part of the response
+    with_properties = requested is None or "assigned_properties" in requested
+    query = query_client_with_properties() if with_properties else db.session.query(Client)
+    client = narrow_query(query, Client, serializer).filter(Client.id == client_id).first()
     if not client:
         print("[GET] Client not found!")
         return jsonify({"error": "Client not found"}), 404
-    print(f"[GET] Client found: {client}")
-    
-    # Build a list of assigned properties including all needed details
-    assigned_props = []
-    for cp in client.client_properties:
-        prop = cp.property
-        # Defensive check (in case of orphaned record)
-        if not prop:
-            continue
-        assigned_props.append({
-            "id": prop.id,
-            "property_code": prop.property_code,
-            "building": prop.building.name if prop.building else prop.building_name,
-            "unit": prop.unit,
-            "owner": prop.owner,
-            "contact": prop.contact,
-            "size": float(prop.size) if prop.size else None,
-            "bedrooms": prop.bedrooms,
-            "bathrooms": prop.bathrooms,
-            "year_built": prop.year_built,
-            "floor": prop.floor,
-            "area": prop.area,
-            "status": prop.status,
-            "price": float(prop.price) if prop.price else None,
-            "sell_price": float(prop.sell_price) if prop.sell_price else None,
-            "sent": prop.sent,
-            "preferred_tenant": prop.preferred_tenant,
-            "photo_urls": prop.get_photo_urls(),
-            "created_at": cp.created_at.strftime('%Y-%m-%d %H:%M:%S') if cp.created_at else None,
-            "comment": cp.comment,
-            "is_active": cp.is_active
-        })
-    
+    print(f"[GET] Client found: {client_id}")
+
+    client_data = serializer(client)
+    if with_properties:
+        # Build a list of assigned properties including all needed details
+        # (skipping orphaned links whose property no longer exists)
+        client_data["assigned_properties"] = serialize_assigned_property.many(
+            cp for cp in client.client_properties if cp.property
+        )
+
     # Return client details without the extra 'building' field at the client level
-    return jsonify({
-        "id": client.id,
-        "code": client.code,
-        "title": client.title,
-        "first_name": client.first_name,
-        "last_name": client.last_name,
-        "nationality": client.nationality,
-        "contact_type": client.contact_type,
-        "contact": client.contact,
-        "starting_date": client.starting_date.strftime('%Y-%m-%d') if client.starting_date else None,
-        "move_in": client.move_in.strftime('%Y-%m-%d') if client.move_in else None,
-        "budget": float(client.budget) if client.budget else None,
-        "bedrooms": client.bedrooms,
-        "bath": client.bath,
-        "area": client.area,
-        "size": float(client.size) if client.size else None,
-        "preferred": client.preferred,
-        "status": client.status,
-        "work_sheet": client.work_sheet,
-        "login_link": client.login_link,
-        "access_key": client.access_key,
-        "assigned_properties": assigned_props
-    })
+    return jsonify(client_data)
 
 
+# ----------------------------------------
+# MATCH Properties to a Client's Criteria
+# ----------------------------------------
+@client_bp.route("/clients/<int:client_id>/matches", methods=["GET"])
+@pre_authorized_cors_preflight
+@conditional_get("client:{client_id}", "properties")
+def get_client_matches(client_id):
+    """
+    Rank available listings against the client's budget, area, bedrooms,
+    bath and size using the in-memory property snapshot. Properties already
+    assigned to the client are left out unless include_assigned=true.
+    """
+    try:
+        limit = max(1, min(int(request.args.get("limit") or 20), 200))
+        min_score = float(request.args.get("min_score") or 0)
+    except ValueError:
+        return jsonify({"error": "limit and min_score must be numbers"}), 400
+    try:
+        serializer, _ = requested_fields(serialize_property, request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        client = db.session.query(Client).filter(Client.id == client_id).first()
+        if not client:
+            return jsonify({"error": "Client not found"}), 404
+
+        exclude = set()
+        if request.args.get("include_assigned") != "true":
+            exclude = {
+                property_id for (property_id,) in
+                db.session.query(ClientProperty.property_id).filter(ClientProperty.client_id == client_id)
+            }
+
+        property_snapshot.refresh()
+        ranked = [
+            (property_id, score)
+            for property_id, score in property_snapshot.top_matches(client, limit + len(exclude), min_score)
+            if property_id not in exclude
+        ][:limit]
+
+        properties = {
+            prop.id: prop for prop in
+            narrow_query(db.session.query(Property), Property, serializer)
+            .filter(Property.id.in_([property_id for property_id, _ in ranked]))
+        } if ranked else {}
+        ranked = [(property_id, score) for property_id, score in ranked if property_id in properties]
+        matches = [
+            dict(data, score=round(score, 4))
+            for data, (_, score) in zip(serializer.many(properties[property_id] for property_id, _ in ranked), ranked)
+        ]
+        print(f"[MATCH] Client {client_id}: {len(matches)} matches from {len(property_snapshot)} listings.")
+        return jsonify({"client_id": client_id, "matches": matches}), 200
+    except Exception as e:
+        print(f"[MATCH] Exception: {str(e)}")
+        return jsonify({"error": f"Failed to match properties: {str(e)}"}), 500
+
 # ----------------------------------------
 # 2. UPDATE Client Details
 # ----------------------------------------
@@ -205,36 +255,26 @@ def delete_client(client_id):
 # ----------------------------------------
 @client_bp.route("/clients", methods=["GET"])
 @pre_authorized_cors_preflight
+@conditional_get("clients")
 def get_all_clients():
     print("[GET] Fetching all clients...")
     try:
-        clients = db.session.query(Client).all()
+        serializer, _ = requested_fields(serialize_client_summary, request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        query = narrow_query(db.session.query(Client), Client, serializer)
+        stream_format = requested_stream_format()
+        if stream_format:
+            print(f"[GET] Streaming clients as {stream_format}.")
+            return stream_query(query.order_by(Client.id), serializer, stream_format)
+
+        clients = query.all()
         if not clients:
             print("[GET] No clients found!")
             return jsonify({"message": "No clients found"}), 404
 
-        client_list = []
-        for client in clients:
-            client_data = {
-                "id": client.id,
-                "code": client.code,
-                "title": client.title,
-                "first_name": client.first_name,
-                "last_name": client.last_name,
-                "nationality": client.nationality,
-                "contact_type": client.contact_type,
-                "contact": client.contact,
-                "starting_date": client.starting_date.strftime('%Y-%m-%d') if client.starting_date else None,
-                "move_in": client.move_in.strftime('%Y-%m-%d') if client.move_in else None,
-                "budget": float(client.budget) if client.budget else None,
-                "bedrooms": client.bedrooms,
-                "bath": client.bath,
-                "area": client.area,
-                "preferred": client.preferred,
-                "status": client.status,
-                "work_sheet": client.work_sheet
-            }
-            client_list.append(client_data)
+        client_list = serializer.many(clients)
         print(f"[GET] Found {len(client_list)} clients.")
         return jsonify(client_list), 200
     except Exception as e:
@@ -282,66 +322,158 @@ def remove_property_from_client(client_id, property_id):
     print("[DELETE] Link removed successfully.")
     return jsonify({"message": "Property removed from client"}), 200
 
+# ----------------------------------------
+# 6b. BATCH ADD/REMOVE Assigned Properties
+# ----------------------------------------
+def parse_property_ids(data):
+    """
+    The "property_ids" list of a batch request: (unique integer ids in
+    request order, entries that are not ids). Raises ValueError when the
+    list is missing, empty or too long.
+    """
+    raw_ids = (data or {}).get("property_ids")
+    if not isinstance(raw_ids, list) or not raw_ids:
+        raise ValueError("property_ids must be a non-empty list")
+    if len(raw_ids) > MAX_BATCH_PROPERTY_IDS:
+        raise ValueError(f"At most {MAX_BATCH_PROPERTY_IDS} property_ids per request")
+    ids, invalid = [], []
+    for value in raw_ids:
+        if isinstance(value, bool) or not isinstance(value, (int, str)) or not str(value).isdigit():
+            invalid.append(value)
+        elif int(value) not in ids:
+            ids.append(int(value))
+    return ids, invalid
+
+def batch_results(ids, invalid, statuses):
+    """Per-id outcomes plus a count per outcome."""
+    results = [{"property_id": value, "status": "invalid"} for value in invalid]
+    results += [{"property_id": property_id, "status": statuses[property_id]} for property_id in ids]
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    return {"results": results, "counts": counts}
+
+@client_bp.route("/clients/<int:client_id>/properties/batch", methods=["POST"])
+@pre_authorized_cors_preflight
+def add_properties_to_client(client_id):
+    """
+    Assign many properties at once: {"property_ids": [...]}. One query
+    checks which properties exist and one INSERT .. ON CONFLICT DO NOTHING
+    creates the missing links. Each id comes back as "assigned",
+    "already_assigned", "not_found" or "invalid".
+    """
+    try:
+        ids, invalid = parse_property_ids(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    print(f"[POST] Batch assign {len(ids)} properties to client {client_id}")
+
+    try:
+        if not db.session.query(Client.id).filter(Client.id == client_id).first():
+            return jsonify({"error": "Client not found"}), 404
+        existing = {
+            property_id for (property_id,) in
+            db.session.query(Property.id).filter(Property.id.in_(ids))
+        } if ids else set()
+
+        assigned = set()
+        if existing:
+            # New assignments default to inactive (is_active=False)
+            now = datetime.utcnow()
+            stmt = (
+                dialect_insert(ClientProperty)
+                .values([
+                    {"client_id": client_id, "property_id": property_id, "is_active": False, "created_at": now}
+                    for property_id in ids if property_id in existing
+                ])
+                .on_conflict_do_nothing(index_elements=["client_id", "property_id"])
+                .returning(ClientProperty.property_id)
+            )
+            assigned = {property_id for (property_id,) in db.session.execute(stmt)}
+        if assigned:
+            bump_versions(db.session, ["clients", f"client:{client_id}"])
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"[POST] Batch assign failed: {str(e)}")
+        return jsonify({"error": f"Failed to assign properties: {str(e)}"}), 500
+
+    statuses = {
+        property_id: "assigned" if property_id in assigned
+        else "already_assigned" if property_id in existing else "not_found"
+        for property_id in ids
+    }
+    print(f"[POST] Batch assigned {len(assigned)} new properties to client {client_id}.")
+    return jsonify(dict(batch_results(ids, invalid, statuses), client_id=client_id)), 200
+
+@client_bp.route("/clients/<int:client_id>/properties/batch", methods=["DELETE"])
+@pre_authorized_cors_preflight
+def remove_properties_from_client(client_id):
+    """
+    Remove many assignments at once: {"property_ids": [...]}, with a single
+    DELETE .. RETURNING. Each id comes back as "removed", "not_assigned" or
+    "invalid".
+    """
+    try:
+        ids, invalid = parse_property_ids(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    print(f"[DELETE] Batch remove {len(ids)} properties from client {client_id}")
+
+    try:
+        if not db.session.query(Client.id).filter(Client.id == client_id).first():
+            return jsonify({"error": "Client not found"}), 404
+        removed = set()
+        if ids:
+            stmt = (
+                ClientProperty.__table__.delete()
+                .where(ClientProperty.client_id == client_id, ClientProperty.property_id.in_(ids))
+                .returning(ClientProperty.property_id)
+            )
+            removed = {property_id for (property_id,) in db.session.execute(stmt)}
+        if removed:
+            bump_versions(db.session, ["clients", f"client:{client_id}"])
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"[DELETE] Batch remove failed: {str(e)}")
+        return jsonify({"error": f"Failed to remove properties: {str(e)}"}), 500
+
+    statuses = {property_id: "removed" if property_id in removed else "not_assigned" for property_id in ids}
+    print(f"[DELETE] Batch removed {len(removed)} properties from client {client_id}.")
+    return jsonify(dict(batch_results(ids, invalid, statuses), client_id=client_id)), 200
+
 # ----------------------------------------
 # 7. GET Client Details by Code
 # ----------------------------------------
 @client_bp.route("/clients/code/<string:client_code>", methods=["GET"])
 @pre_authorized_cors_preflight
+@query_budget(2)
 def get_client_by_code(client_code):
+    # Repeat portal views are answered from the pre-rendered response cache
+    cached, generation = cached_portal_response()
+    if cached is not None:
+        return cached
+
     print(f"[GET] Fetching client with code: {client_code}")
-    client = db.session.query(Client).filter(Client.code == client_code).first()
+    client = query_client_with_properties().filter(Client.code == client_code).first()
     if not client:
         print("[GET] Client not found!")
         return jsonify({"error": "Client not found"}), 404
-    assigned_props = []
-    for cp in client.client_properties:
-        prop = cp.property
-        print(f"[DEBUG] Property ID: {prop.id}, Building: {prop.building}, Unit: {prop.unit}, Size: {prop.size}, Year Built: {prop.year_built}")
-        assigned_props.append({
-            "id": prop.id,
-            "property_code": prop.property_code,
-            "building": prop.building.name if prop.building else prop.building_name,
-            "unit": prop.unit,
-            "owner": prop.owner,
-            "contact": prop.contact,
-            "size": float(prop.size) if prop.size else None,
-            "bedrooms": prop.bedrooms,
-            "bathrooms": prop.bathrooms,
-            "year_built": prop.year_built,
-            "floor": prop.floor,
-            "area": prop.area,
-            "status": prop.status,
-            "price": float(prop.price) if prop.price else None,
-            "sell_price": float(prop.sell_price) if prop.sell_price else None,
-            "sent": prop.sent,
-            "preferred_tenant": prop.preferred_tenant,
-            "photo_urls": prop.get_photo_urls(),
-            "created_at": cp.created_at.strftime('%Y-%m-%d %H:%M:%S') if cp.created_at else None,
-            "comment": cp.comment,
-            "is_active": cp.is_active
-        })
-    return jsonify({
-        "id": client.id,
-        "code": client.code,
-        "building": client.client_properties[-1].property.building.name if client.client_properties and client.client_properties[-1].property.building else None,
-        "title": client.title,
-        "first_name": client.first_name,
-        "last_name": client.last_name,
-        "nationality": client.nationality,
-        "contact_type": client.contact_type,
-        "contact": client.contact,
-        "starting_date": client.starting_date.strftime('%Y-%m-%d') if client.starting_date else None,
-        "move_in": client.move_in.strftime('%Y-%m-%d') if client.move_in else None,
-        "budget": float(client.budget) if client.budget else None,
-        "bedrooms": client.bedrooms,
-        "bath": client.bath,
-        "area": client.area,
-        "size": float(client.size) if client.size else None,  # NEW: include size here
-        "preferred": client.preferred,
-        "status": client.status,
-        "work_sheet": client.work_sheet,
-        "assigned_properties": assigned_props
-    })
+    links = [cp for cp in client.client_properties if cp.property]
+    assigned_props = serialize_assigned_property.many(links)
+    last_property = links[-1].property if links else None
+    response = jsonify(dict(
+        serialize_client_portal(client),
+        building=get_building_directory().name(last_property.building_id) if last_property else None,
+        assigned_properties=assigned_props,
+    ))
+    dependencies = {f"client:{client.id}"}
+    for cp in links:
+        dependencies.add(f"property:{cp.property_id}")
+        dependencies.add(f"building:{cp.property.building_id}")
+    return store_portal_response(response, dependencies, generation)
+
 # ----------------------------------------
 # 8. Generate Login Details (Recalculate access key and login link)
 # ----------------------------------------
@@ -414,4 +546,80 @@ def update_client_property_comment(client_id, property_id):
     except Exception as e:
         db.session.rollback()
         print(f"[DEBUG] Exception during commit: {e}")
-        return jsonify({"error": f"Failed to update client property: {str(e)}"}), 500
\ No newline at end of file
+        return jsonify({"error": f"Failed to update client property: {str(e)}"}), 500
+
+# ----------------------------------------
+# 9b. BATCH UPDATE Client Property Comments and Active Status
+# ----------------------------------------
+def parse_link_updates(data):
+    """
+    The "updates" list of a batch request: ({property_id: {"comment": ...,
+    "is_active": ...}} in request order, property ids that are not ids).
+    A repeated property id merges into one update, later values winning.
+    is_active must be a JSON boolean (0/1 and strings are refused). Raises
+    ValueError for a malformed request.
+    """
+    raw_updates = (data or {}).get("updates")
+    if not isinstance(raw_updates, list) or not raw_updates:
+        raise ValueError("updates must be a non-empty list")
+    if len(raw_updates) > MAX_BATCH_PROPERTY_IDS:
+        raise ValueError(f"At most {MAX_BATCH_PROPERTY_IDS} updates per request")
+    updates, invalid = {}, []
+    for raw in raw_updates:
+        if not isinstance(raw, dict) or ("comment" not in raw and "is_active" not in raw):
+            raise ValueError("each update needs a property_id and 'comment' and/or 'is_active'")
+        value = raw.get("property_id")
+        if isinstance(value, bool) or not isinstance(value, (int, str)) or not str(value).isdigit():
+            invalid.append(value)
+            continue
+        changes = updates.setdefault(int(value), {})
+        if "comment" in raw:
+            if raw["comment"] is not None and not isinstance(raw["comment"], str):
+                raise ValueError(f"Invalid comment for property {value}")
+            changes["comment"] = raw["comment"]
+        if "is_active" in raw:
+            if not isinstance(raw["is_active"], bool):
+                raise ValueError(f"is_active must be true or false for property {value}")
+            changes["is_active"] = raw["is_active"]
+    return updates, invalid
+
+@client_bp.route("/clients/<int:client_id>/properties/batch", methods=["PATCH"])
+@pre_authorized_cors_preflight
+def update_client_properties(client_id):
+    """
+    Save many comments / active flags at once:
+        {"updates": [{"property_id": 1, "is_active": true}, {"property_id": 2, "comment": "..."}]}
+    All of them are applied by one UPDATE .. FROM (VALUES ...) in one
+    transaction. Each property id comes back as "updated", "not_assigned"
+    or "invalid".
+    """
+    try:
+        updates, invalid = parse_link_updates(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    print(f"[PATCH] Batch update {len(updates)} assignments of client {client_id}")
+
+    try:
+        updated = set()
+        if updates:
+            stmt = (
+                update_from_values(ClientProperty.__table__, "property_id", updates)
+                .where(ClientProperty.client_id == client_id)
+                .returning(ClientProperty.property_id)
+            )
+            updated = {property_id for (property_id,) in db.session.execute(stmt)}
+        if updated:
+            bump_versions(db.session, ["clients", f"client:{client_id}"])
+        elif not db.session.query(Client.id).filter(Client.id == client_id).first():
+            db.session.rollback()
+            return jsonify({"error": "Client not found"}), 404
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"[PATCH] Batch update failed: {str(e)}")
+        return jsonify({"error": f"Failed to update client properties: {str(e)}"}), 500
+
+    ids = list(updates)
+    statuses = {property_id: "updated" if property_id in updated else "not_assigned" for property_id in ids}
+    print(f"[PATCH] Batch updated {len(updated)} assignments of client {client_id}.")
+    return jsonify(dict(batch_results(ids, invalid, statuses), client_id=client_id)), 200
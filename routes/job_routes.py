@@ -0,0 +1,20 @@
+from flask import Blueprint, jsonify
+from models.sql_models import Job
+from database import db
+from helpers.cors_helpers import pre_authorized_cors_preflight
+from helpers.jobs import fail_if_stale, serialize_job
+
+job_bp = Blueprint('job_bp', __name__)
+
+# ----------------------------------------
+# GET Background Job Status
+# ----------------------------------------
+@job_bp.route("/jobs/<string:job_id>", methods=["GET"])
+@pre_authorized_cors_preflight
+def get_job(job_id):
+    job = db.session.query(Job).filter(Job.id == job_id).first()
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    # A job whose worker died is reported failed rather than left running
+    fail_if_stale(job)
+    return jsonify(serialize_job(job)), 200
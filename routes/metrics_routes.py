@@ -0,0 +1,16 @@
+from flask import Blueprint, jsonify
+import helpers.metrics as metrics
+
+metrics_bp = Blueprint('metrics_bp', __name__)
+
+# ----------------------------------------
+# Prometheus scrape endpoint (aggregated across gunicorn workers)
+# ----------------------------------------
+@metrics_bp.route("/metrics", methods=["GET"])
+def get_metrics():
+    # Only served to scrapers holding METRICS_TOKEN; not found when none is configured
+    if not metrics.METRICS_TOKEN:
+        return jsonify({"error": "Not found"}), 404
+    if not metrics.metrics_authorized():
+        return jsonify({"error": "Invalid metrics token"}), 401
+    return metrics.metrics_response()
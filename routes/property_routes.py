@@ -4,131 +4,242 @@ import json
 import logging
 from datetime import datetime
 from flask import Blueprint, request, jsonify
-from models.sql_models import Property, Building
+from models.sql_models import Property
 from database import db
 from helpers.cors_helpers import pre_authorized_cors_preflight
-import boto3
-from dotenv import load_dotenv
-from sqlalchemy.orm import joinedload
-
-# Load .env file
-load_dotenv()
-
-# Read Cloudflare R2 credentials and endpoint from environment variables
-R2_ACCESS_KEY = os.environ.get("R2_ACCESS_KEY")
-R2_SECRET_KEY = os.environ.get("R2_SECRET_KEY")
-R2_ENDPOINT = os.environ.get("R2_ENDPOINT") 
-
-# Configure boto3 client using the environment variables
-s3_client = boto3.client(
-    "s3",
-    endpoint_url=R2_ENDPOINT,
-    aws_access_key_id=R2_ACCESS_KEY,
-    aws_secret_access_key=R2_SECRET_KEY,
+from helpers.bulk_sql import update_from_values
+from helpers.jobs import submit_job
+from helpers.property_import import (
+    CREATED, INVALID, SKIPPED_DUPLICATE, import_properties, run_import_job, summarize,
+)
+from helpers.query_budget import query_budget
+from helpers.serializers import narrow_query, requested_fields, serialize_property
+from helpers.spreadsheet_import import import_spreadsheet, iter_csv_rows, iter_xlsx_rows
+from helpers.pagination import apply_keyset, decode_cursor, parse_page_size, split_page
+from helpers.streaming import requested_stream_format, stream_query
+from helpers.versioning import bump_versions, conditional_get
+from sqlalchemy import func, select
+from werkzeug.datastructures import MultiDict
+from database.search import SEARCH_CONFIG
+from helpers.image_variants import schedule_photo_variants
+from helpers.storage import (
+    MAX_PHOTO_BYTES, PHOTO_CONTENT_TYPES, PLACEHOLDER_PHOTO_KEY,
+    head_photo, new_photo_key, photo_key_prefix, presign_photo_upload, public_url,
+    upload_file, upload_files,
 )
 
 property_bp = Blueprint('property_bp', __name__)
 
+# Bulk uploads larger than this are processed as a background job
+BULK_INLINE_LIMIT = int(os.environ.get("BULK_INLINE_LIMIT", "500"))
+# Most per-row patches accepted by one PATCH /properties/bulk request
+MAX_BULK_PATCHES = int(os.environ.get("MAX_BULK_PATCHES", "1000"))
+# GET /properties filters a filtered bulk update may use (see apply_property_filters)
+BULK_FILTER_KEYS = {
+    "status", "area", "bedrooms", "building_id",
+    "min_price", "max_price", "min_sell_price", "max_sell_price",
+}
+
 ALLOWED_LABELS = {
     "main", "bathroom", "bedroom", "kitchen",
     "living_room", "balcony", "closet", "amenities"
 }
 
 # ----------------------------------------
-# GET All Properties
+# GET All Properties (cursor paginated, with filters)
 # ----------------------------------------
-from sqlalchemy.orm import joinedload  # optional: for eager loading
+def apply_property_filters(query, args):
+    """
+    Narrow a Property query using the list endpoint's query-string filters:
+    status, area, bedrooms, building_id, min_price/max_price and
+    min_sell_price/max_sell_price. Raises ValueError on malformed numbers.
+    """
+    statuses = [value for value in args.getlist("status") if value]
+    if statuses:
+        query = query.filter(Property.status.in_(statuses))
+    areas = [value for value in args.getlist("area") if value]
+    if areas:
+        query = query.filter(Property.area.in_(areas))
+    if args.get("bedrooms"):
+        query = query.filter(Property.bedrooms == int(args["bedrooms"]))
+    if args.get("building_id"):
+        query = query.filter(Property.building_id == int(args["building_id"]))
+    if args.get("min_price"):
+        query = query.filter(Property.price >= float(args["min_price"]))
+    if args.get("max_price"):
+        query = query.filter(Property.price <= float(args["max_price"]))
+    if args.get("min_sell_price"):
+        query = query.filter(Property.sell_price >= float(args["min_sell_price"]))
+    if args.get("max_sell_price"):
+        query = query.filter(Property.sell_price <= float(args["max_sell_price"]))
+    return query
 
 @property_bp.route("/properties", methods=["GET"])
 @pre_authorized_cors_preflight
+@conditional_get("properties", "buildings")
 def get_all_properties():
-    print("[GET] Request to fetch all properties.")
+    print(f"[GET] Request to fetch properties: {dict(request.args)}")
+    try:
+        limit = parse_page_size(request.args.get("limit"))
+        cursor = decode_cursor(request.args["cursor"]) if request.args.get("cursor") else None
+        serializer, _ = requested_fields(serialize_property, request.args.get("fields"))
+        query = apply_property_filters(
+            narrow_query(db.session.query(Property), Property, serializer, "created_at"),
+            request.args,
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     try:
-        # Optionally use eager loading to ensure building is loaded:
-        properties = db.session.query(Property).options(joinedload(Property.building)).all()
-        if not properties:
-            print("[GET] No properties found.")
-            return jsonify({"message": "No properties found"}), 404
-
-        property_list = []
-        for prop in properties:
-            property_data = {
-                "id": prop.id,
-                "property_code": prop.property_code,
-                "building": prop.building.name if prop.building else None,
-                "building_id": prop.building_id,
-                "unit": prop.unit,
-                "owner": prop.owner,
-                "contact": prop.contact,
-                "size": float(prop.size) if prop.size else None,
-                "bedrooms": prop.bedrooms,
-                "bathrooms": prop.bathrooms,
-                "year_built": prop.year_built,
-                "floor": prop.floor,
-                "area": prop.area,
-                "status": prop.status,
-                "price": float(prop.price) if prop.price else None,
-                "sell_price": float(prop.sell_price) if prop.sell_price else None,
-                "sent": prop.sent,
-                "preferred_tenant": prop.preferred_tenant,
-                "photo_urls": prop.get_photo_urls(),
-                "created_at": prop.created_at.strftime('%Y-%m-%d %H:%M:%S') if prop.created_at else None,
-            }
-            property_list.append(property_data)
-        
-        # Log the complete data before returning it
-        print("[GET] Returning list of properties:")
-        for p in property_list:
-            print(p)
-        
-        return jsonify(property_list), 200
+        # Streaming mode returns every matching row instead of a single page
+        stream_format = requested_stream_format()
+        if stream_format:
+            print(f"[GET] Streaming properties as {stream_format}.")
+            query = query.order_by(Property.created_at.asc(), Property.id.asc())
+            return stream_query(query, serializer, stream_format)
+
+        query = apply_keyset(query, Property.created_at, Property.id, cursor, limit)
+        properties, next_cursor = split_page(query.all(), limit)
+
+        property_list = serializer.many(properties)
+        print(f"[GET] Returning {len(property_list)} properties (next cursor: {next_cursor}).")
+        return jsonify({"properties": property_list, "next": next_cursor}), 200
 
     except Exception as e:
         print(f"[GET] Exception: {str(e)}")
         return jsonify({"error": f"Failed to fetch properties: {str(e)}"}), 500
+
+# ----------------------------------------
+# SEARCH Properties (full text, ranked)
+# ----------------------------------------
+@property_bp.route("/properties/search", methods=["GET"])
+@pre_authorized_cors_preflight
+@conditional_get("properties", "buildings")
+def search_properties():
+    """
+    Full-text search over property code, building name, unit, owner, area,
+    status and preferred tenant using the GIN-indexed search_vector column. "q" takes
+    web-search syntax ("quoted phrases", OR, -exclude). Results are ranked
+    best first and paged with limit/offset; the list filters also apply.
+    """
+    term = (request.args.get("q") or "").strip()
+    if not term:
+        return jsonify({"error": "Missing search term 'q'"}), 400
+    try:
+        limit = parse_page_size(request.args.get("limit"))
+        offset = int(request.args.get("offset") or 0)
+        if offset < 0:
+            raise ValueError("offset must not be negative")
+        serializer, _ = requested_fields(serialize_property, request.args.get("fields"))
+        ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, term)
+        rank = func.ts_rank_cd(Property.search_vector, ts_query).label("rank")
+        query = apply_property_filters(
+            narrow_query(db.session.query(Property, rank), Property, serializer)
+            .filter(Property.search_vector.op("@@")(ts_query)),
+            request.args,
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        rows = query.order_by(rank.desc(), Property.id.desc()).offset(offset).limit(limit + 1).all()
+        next_offset = offset + limit if len(rows) > limit else None
+        results = [
+            dict(data, rank=round(score, 4))
+            for data, (_, score) in zip(serializer.many(prop for prop, _ in rows[:limit]), rows)
+        ]
+        print(f"[SEARCH] '{term}' returned {len(results)} properties (offset {offset}).")
+        return jsonify({"properties": results, "next_offset": next_offset}), 200
+    except Exception as e:
+        print(f"[SEARCH] Exception: {str(e)}")
+        return jsonify({"error": f"Failed to search properties: {str(e)}"}), 500
+
 # ----------------------------------------
 # GET Property by ID
 # ----------------------------------------
 @property_bp.route("/properties/<int:property_id>", methods=["GET"])
 @pre_authorized_cors_preflight
+@conditional_get("property:{property_id}", "buildings")
+@query_budget(1)
 def get_property(property_id):
+    try:
+        serializer, _ = requested_fields(serialize_property, request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     try:
         prop = (
-            db.session.query(Property)
-            .options(joinedload(Property.building))
+            narrow_query(db.session.query(Property), Property, serializer)
             .filter(Property.id == property_id)
             .first()
         )
         if not prop:
             return jsonify({"error": "Property not found"}), 404
 
-        property_data = {
-            "id": prop.id,
-            "property_code": prop.property_code,
-            "building": prop.building.name if prop.building else None,
-            "building_id": prop.building_id,
-            "unit": prop.unit,
-            "owner": prop.owner,
-            "contact": prop.contact,
-            "size": float(prop.size) if prop.size else None,
-            "bedrooms": prop.bedrooms,
-            "bathrooms": prop.bathrooms,
-            "year_built": prop.year_built,
-            "floor": prop.floor,
-            "area": prop.area,
-            "status": prop.status,
-            "price": float(prop.price) if prop.price else None,
-            "sell_price": float(prop.sell_price) if prop.sell_price else None,
-            "sent": prop.sent,
-            "preferred_tenant": prop.preferred_tenant,
-            "photo_urls": prop.get_photo_urls(),
-            "created_at": prop.created_at.strftime('%Y-%m-%d %H:%M:%S') if prop.created_at else None,
-        }
+        property_data = serializer(prop)
         return jsonify(property_data), 200
 
     except Exception as e:
         return jsonify({"error": f"Failed to fetch property: {str(e)}"}), 500
 
+# ----------------------------------------
+# GET Similar Properties (nearest neighbours)
+# ----------------------------------------
+@property_bp.route("/properties/<int:property_id>/similar", methods=["GET"])
+@pre_authorized_cors_preflight
+@conditional_get("properties", "buildings")
+def get_similar_properties(property_id):
+    """
+    The k listings whose feature vectors are closest to this one, served by
+    the HNSW index on properties.embedding. The list filters (status, area,
+    ...) narrow the neighbours that are returned.
+    """
+    try:
+        k = max(1, min(int(request.args.get("k") or 10), 50))
+        serializer, _ = requested_fields(serialize_property, request.args.get("fields"))
+        neighbours = apply_property_filters(
+            narrow_query(db.session.query(Property), Property, serializer), request.args
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        target = (
+            db.session.query(Property.embedding)
+            .filter(Property.id == property_id)
+            .first()
+        )
+        if not target:
+            return jsonify({"error": "Property not found"}), 404
+        if target.embedding is None:
+            return jsonify({"error": "Property has no feature vector yet"}), 409
+
+        distance = Property.embedding.l2_distance(target.embedding)
+        rows = (
+            neighbours.add_columns(distance.label("distance"))
+            .filter(Property.id != property_id, Property.embedding.isnot(None))
+            .order_by(distance)
+            .limit(k)
+            .all()
+        )
+        similar = [
+            dict(data, distance=round(dist, 4))
+            for data, (_, dist) in zip(serializer.many(prop for prop, _ in rows), rows)
+        ]
+        print(f"[SIMILAR] Property {property_id}: {len(similar)} neighbours.")
+        return jsonify({"property_id": property_id, "similar": similar}), 200
+    except Exception as e:
+        print(f"[SIMILAR] Exception: {str(e)}")
+        return jsonify({"error": f"Failed to fetch similar properties: {str(e)}"}), 500
+
+def queue_photo_variants(prop):
+    """Start thumbnail/WebP generation for new photos; never fails the request."""
+    try:
+        schedule_photo_variants(prop)
+    except Exception as e:
+        db.session.rollback()
+        print(f"[PHOTO VARIANTS] Could not queue variants for property {prop.id}: {str(e)}")
+
 # ----------------------------------------
 # CREATE a New Property
 # ----------------------------------------
@@ -164,6 +275,7 @@ def create_property():
         db.session.commit()
 
         print(f"[POST] Property created successfully with ID: {new_property.id}")
+        queue_photo_variants(new_property)
         return jsonify({"message": "Property created successfully", "property_id": new_property.id}), 201
 
     except Exception as e:
@@ -209,6 +321,7 @@ def update_property(property_id):
 
         db.session.commit()
         print("[PUT] Property updated successfully.")
+        queue_photo_variants(prop)
         return jsonify({"message": "Property updated successfully"}), 200
 
     except Exception as e:
@@ -216,6 +329,138 @@ def update_property(property_id):
         print(f"[PUT] Exception occurred while updating property: {str(e)}")
         return jsonify({"error": f"Failed to update property: {str(e)}"}), 500
 
+# ----------------------------------------
+# BULK UPDATE Properties (status, prices, ...)
+# ----------------------------------------
+def _text_or_none(value):
+    return str(value) if value is not None else None
+
+# Fields a bulk patch may set, with the converter applied to each value
+# (None clears the field). Codes, buildings and photos still go through
+# PUT /properties/<id>.
+BULK_PATCH_FIELDS = {
+    "unit": str,
+    "owner": _text_or_none,
+    "contact": _text_or_none,
+    "size": float,
+    "bedrooms": int,
+    "bathrooms": int,
+    "year_built": int,
+    "floor": int,
+    "area": _text_or_none,
+    "status": _text_or_none,
+    "price": float,
+    "sell_price": float,
+    "sent": _text_or_none,
+    "preferred_tenant": _text_or_none,
+}
+NOT_NULL_PATCH_FIELDS = {"unit"}
+
+def parse_property_patch(patch):
+    """Validate and convert one {field: value} patch. Raises ValueError."""
+    if not isinstance(patch, dict) or not patch:
+        raise ValueError("each patch must be a non-empty object")
+    unknown = sorted(set(patch) - set(BULK_PATCH_FIELDS))
+    if unknown:
+        raise ValueError(f"Fields cannot be bulk updated: {', '.join(unknown)}")
+    converted = {}
+    for field, value in patch.items():
+        if value is None:
+            if field in NOT_NULL_PATCH_FIELDS:
+                raise ValueError(f"{field} cannot be cleared")
+            converted[field] = None
+            continue
+        try:
+            converted[field] = BULK_PATCH_FIELDS[field](value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid value for {field}: {value!r}")
+    return converted
+
+@property_bp.route("/properties/bulk", methods=["PATCH"])
+@pre_authorized_cors_preflight
+def bulk_update_properties():
+    """
+    Update many properties with one statement. Either per-row patches,
+        {"patches": [{"id": 1, "status": "Rented"}, {"id": 2, "price": 18000}]}
+    or one patch for every property matching the GET /properties filters,
+        {"filter": {"building_id": 4, "status": "Available"}, "patch": {"price": 20000}}
+    Returns the updated properties; ids that did not exist are listed
+    under "not_found". Either form touches at most MAX_BULK_PATCHES rows; a
+    filter matching more is refused with a 400 and nothing is changed.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        if "patches" in data:
+            raw_patches = data["patches"]
+            if not isinstance(raw_patches, list) or not raw_patches:
+                raise ValueError("patches must be a non-empty list")
+            if len(raw_patches) > MAX_BULK_PATCHES:
+                raise ValueError(f"At most {MAX_BULK_PATCHES} patches per request")
+            patches = {}
+            for raw in raw_patches:
+                raw = dict(raw) if isinstance(raw, dict) else {}
+                property_id = raw.pop("id", None)
+                if isinstance(property_id, bool) or not isinstance(property_id, int):
+                    raise ValueError("each patch needs an integer id")
+                # A repeated id merges into one patch, later values winning
+                patches.setdefault(property_id, {}).update(parse_property_patch(raw))
+            stmt = update_from_values(Property.__table__, "id", patches, updated_at=datetime.utcnow())
+        elif "filter" in data:
+            filters = data["filter"]
+            if not isinstance(filters, dict) or not filters:
+                raise ValueError("filter must be a non-empty object")
+            unknown = sorted(set(filters) - BULK_FILTER_KEYS)
+            if unknown:
+                raise ValueError(f"Unknown filters: {', '.join(unknown)}")
+            args = MultiDict([
+                (key, str(value))
+                for key, value_or_list in filters.items()
+                for value in (value_or_list if isinstance(value_or_list, list) else [value_or_list])
+            ])
+            patch = parse_property_patch(data.get("patch"))
+            patches = None
+            # Capped like patches (one version key is bumped per row): one row
+            # past the cap is matched so an over-broad filter can be refused
+            matching = apply_property_filters(select(Property.id), args).order_by(Property.id)
+            stmt = (
+                Property.__table__.update()
+                .where(Property.id.in_(matching.limit(MAX_BULK_PATCHES + 1)))
+                .values(dict(patch, updated_at=datetime.utcnow()))
+            )
+        else:
+            raise ValueError('Expecting "patches" or "filter" and "patch"')
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    print(f"[BULK UPDATE] Updating {len(patches) if patches else 'filtered'} properties.")
+    try:
+        updated = db.session.execute(
+            stmt.returning(*[getattr(Property, key) for key in serialize_property.columns])
+        ).all()
+        if patches is None and len(updated) > MAX_BULK_PATCHES:
+            db.session.rollback()
+            return jsonify({
+                "error": f"filter matches more than {MAX_BULK_PATCHES} properties; narrow it or send patches"
+            }), 400
+        if updated:
+            bump_versions(db.session, ["properties", *(f"property:{row.id}" for row in updated)])
+            # The UPDATE bypasses the unit of work; mark the match snapshot stale ourselves
+            db.session.info["properties_changed"] = True
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"[BULK UPDATE] Exception occurred while updating properties: {str(e)}")
+        return jsonify({"error": f"Failed to update properties: {str(e)}"}), 500
+
+    updated_ids = {row.id for row in updated}
+    print(f"[BULK UPDATE] Updated {len(updated_ids)} properties.")
+    return jsonify({
+        "message": f"{len(updated_ids)} properties updated",
+        "updated": len(updated_ids),
+        "properties": serialize_property.many(sorted(updated, key=lambda row: row.id)),
+        "not_found": sorted(set(patches) - updated_ids) if patches else [],
+    }), 200
+
 # ----------------------------------------
 # DELETE a Property
 # ----------------------------------------
@@ -263,25 +508,65 @@ def upload_photo():
         print(f"[UPLOAD DEBUG] {error_message}")
         return jsonify({"error": error_message}), 400
 
-    bucket_name = "amasproperties"
     filename = f"{uuid.uuid4()}_{file.filename}"
     print(f"[UPLOAD DEBUG] Generated filename: {filename}")
 
     try:
-        s3_client.upload_fileobj(
-            file,
-            bucket_name,
-            filename,
-            ExtraArgs={"ACL": "public-read", "ContentType": file.content_type}
-        )
-        endpoint_hostname = R2_ENDPOINT.replace("https://", "")
-        file_url = f"https://{bucket_name}.{endpoint_hostname}/{filename}"
-        print(f"[UPLOAD DEBUG] File successfully uploaded: {file_url}")
-        return jsonify({"url": f"{R2_ENDPOINT}/{filename}", "label": label}), 200
+        url = upload_file(file, filename, file.content_type)
+        print(f"[UPLOAD DEBUG] File successfully uploaded: {url}")
+        return jsonify({"url": url, "label": label}), 200
     except Exception as e:
         print(f"[UPLOAD DEBUG] Error during upload: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+# ----------------------------------------
+# UPLOAD MANY PHOTOS IN ONE REQUEST
+# ----------------------------------------
+@property_bp.route("/upload/batch", methods=["POST"])
+@pre_authorized_cors_preflight
+def upload_photo_batch():
+    """
+    Multipart form with several "files" parts and either one "labels" value
+    per file (same order) or a single "label" for all of them. The files are
+    uploaded concurrently; the response lists one result per file and is 207
+    when only some of them succeeded.
+    """
+    files = [f for f in request.files.getlist("files") if f.filename]
+    if not files:
+        return jsonify({"error": "No files in the request"}), 400
+
+    labels = request.form.getlist("labels")
+    if not labels and request.form.get("label"):
+        labels = [request.form.get("label")] * len(files)
+    if len(labels) != len(files):
+        return jsonify({"error": "Provide one label per file, or a single label for all files"}), 400
+    invalid = sorted({label for label in labels if label not in ALLOWED_LABELS})
+    if invalid:
+        return jsonify({
+            "error": f"Invalid label(s) {', '.join(invalid)}. Allowed labels: {', '.join(ALLOWED_LABELS)}"
+        }), 400
+
+    print(f"[UPLOAD BATCH] Uploading {len(files)} files.")
+    outcomes = upload_files([(f, f"{uuid.uuid4()}_{f.filename}", f.content_type) for f in files])
+
+    results = []
+    for f, label, (url, error) in zip(files, labels, outcomes):
+        if error:
+            print(f"[UPLOAD BATCH] Error uploading {f.filename}: {error}")
+            results.append({"filename": f.filename, "label": label, "error": error})
+        else:
+            results.append({"filename": f.filename, "label": label, "url": url})
+
+    failed = sum(1 for result in results if "error" in result)
+    print(f"[UPLOAD BATCH] {len(results) - failed} uploaded, {failed} failed.")
+    if failed == len(results):
+        status = 500
+    elif failed:
+        status = 207
+    else:
+        status = 200
+    return jsonify({"results": results, "uploaded": len(results) - failed, "failed": failed}), status
+
 # ----------------------------------------
 # UPLOAD BULK PROPERTY 
 # ----------------------------------------
@@ -293,94 +578,150 @@ def bulk_create_properties():
         print("[BULK UPLOAD] Invalid input: expecting a list of properties.")
         return jsonify({"error": "Invalid input, expecting a list of properties"}), 400
 
-    created_count = 0
-    skipped_count = 0
-    total = len(data)
-    print(f"[BULK UPLOAD] Received {total} properties to process.")
+    print(f"[BULK UPLOAD] Received {len(data)} properties to process.")
+    default_photo_urls = {"main": [public_url(PLACEHOLDER_PHOTO_KEY)]}
 
-    for idx, prop in enumerate(data, start=1):
-        property_code = prop.get("property_code")
-        if property_code:
-            # Remove any extraneous whitespace
-            property_code = property_code.strip()
-        else:
-            print(f"[BULK UPLOAD] Property at index {idx} missing property_code. Skipping.")
-            skipped_count += 1
-            continue
+    # Large uploads run on the background job pool; poll GET /jobs/<id> for progress
+    if len(data) > BULK_INLINE_LIMIT or request.args.get("async") == "true":
+        try:
+            job_id = submit_job(
+                "property_import", run_import_job, data, default_photo_urls, total=len(data)
+            )
+        except Exception as e:
+            db.session.rollback()
+            print(f"[BULK UPLOAD] Failed to queue import: {str(e)}")
+            return jsonify({"error": f"Failed to queue import: {str(e)}"}), 500
+        return jsonify({
+            "message": f"Import of {len(data)} properties queued",
+            "job_id": job_id,
+            "status_url": f"/jobs/{job_id}",
+        }), 202
+
+    try:
+        results = import_properties(data, default_photo_urls=default_photo_urls)
+    except Exception as e:
+        db.session.rollback()
+        print(f"[BULK UPLOAD] Import failed: {str(e)}")
+        return jsonify({"error": f"Failed to create properties: {str(e)}"}), 500
 
-        print(f"[BULK UPLOAD] Processing property {idx}/{total}: Code={property_code}")
+    counts = summarize(results)
+    print(f"[BULK UPLOAD] Import finished: {counts}")
+    return jsonify({
+        "message": (
+            f"{counts[CREATED]} properties created successfully, "
+            f"{counts[SKIPPED_DUPLICATE]} skipped as duplicates, {counts[INVALID]} invalid"
+        ),
+        "counts": counts,
+        "results": results,
+    }), 201
 
-        existing_property = db.session.query(Property).filter(Property.property_code == property_code).first()
-        if existing_property:
-            print(f"[BULK UPLOAD] Skipping property {property_code}: Duplicate found.")
-            skipped_count += 1
-            continue
+# ----------------------------------------
+# IMPORT PROPERTIES FROM A CSV / XLSX FILE
+# ----------------------------------------
+@property_bp.route("/properties/import", methods=["POST"])
+@pre_authorized_cors_preflight
+def import_properties_file():
+    if "file" not in request.files:
+        return jsonify({"error": "No file part in the request"}), 400
 
+    file = request.files["file"]
+    extension = os.path.splitext(file.filename or "")[1].lower()
+    print(f"[IMPORT] Received file {file.filename}")
+    if extension == ".csv":
+        rows = iter_csv_rows(file.stream)
+    elif extension == ".xlsx":
         try:
-            # Retrieve building info from the payload
-            building_name = prop.get("building")
-            building_id = prop.get("building_id")  # Optional, provided if available
-
-            # If no building_id is provided but we have a building name, try to look it up or create a new one
-            if not building_id and building_name:
-                building_name = building_name.strip()
-                building = db.session.query(Building).filter(Building.name == building_name).first()
-                if building:
-                    building_id = building.id
-                    print(f"[BULK UPLOAD] Found existing building '{building_name}' with id {building_id}.")
-                else:
-                    # Create new building record
-                    building = Building(name=building_name)
-                    db.session.add(building)
-                    db.session.flush()  # Flush to get the new building's ID without committing
-                    building_id = building.id
-                    print(f"[BULK UPLOAD] Created new building '{building_name}' with id {building_id}.")
-
-            # You can choose to either enforce that every property must have a building id
-            # or allow it to be None. Here, we assume it's required.
-            if not building_id:
-                print(f"[BULK UPLOAD] Property {property_code} has no building id and no building name. Skipping.")
-                skipped_count += 1
-                continue
-
-            new_property = Property(
-                property_code=property_code,
-                building_id=building_id,
-                building_name=building_name,  # Directly store the provided building name
-                unit=prop.get("unit"),
-                owner=prop.get("owner"),
-                contact=prop.get("contact"),
-                size=float(prop["size"]) if prop.get("size") else None,
-                bedrooms=int(prop["bedrooms"]) if prop.get("bedrooms") else None,
-                bathrooms=int(prop["bathrooms"]) if prop.get("bathrooms") else None,
-                year_built=int(prop["year_built"]) if prop.get("year_built") else None,
-                floor=int(prop["floor"]) if prop.get("floor") else None,
-                area=prop.get("area"),
-                status=prop.get("status"),
-                price=float(prop["price"]) if prop.get("price") else None,
-                sell_price=float(prop["sell_price"]) if prop.get("sell_price") else None,
-                sent=prop.get("sent"),
-                preferred_tenant=prop.get("preferred_tenant"),
-                photo_urls=prop.get("photo_urls") or {
-                    "main": [f"{R2_ENDPOINT}/noimageyet.jpg"]
-                }
-            )
-            db.session.add(new_property)
-            created_count += 1
-            print(f"[BULK UPLOAD] Added property {property_code} for insertion.")
-        except Exception as e:
-            print(f"[BULK UPLOAD] Error processing property {property_code}: {str(e)}")
-            skipped_count += 1
-            continue
+            rows = iter_xlsx_rows(file.stream)
+        except ImportError:
+            return jsonify({"error": "XLSX import requires openpyxl"}), 415
+    else:
+        return jsonify({"error": "Unsupported file type, expecting .csv or .xlsx"}), 415
 
     try:
-        db.session.commit()
-        print(f"[BULK UPLOAD] Commit successful: {created_count} created, {skipped_count} skipped.")
-        return jsonify({
-            "message": f"{created_count} properties created successfully, {skipped_count} properties skipped due to duplicate or missing data"
-        }), 201
+        report = import_spreadsheet(rows, default_photo_urls={"main": [public_url(PLACEHOLDER_PHOTO_KEY)]})
+        print(f"[IMPORT] Import finished: {report['counts']}")
+        return jsonify(report), 201
+    except Exception as e:
+        db.session.rollback()
+        print(f"[IMPORT] Import failed: {str(e)}")
+        return jsonify({"error": f"Failed to import properties: {str(e)}"}), 500
+
+# ----------------------------------------
+# PRESIGNED DIRECT-TO-STORAGE PHOTO UPLOADS
+# ----------------------------------------
+@property_bp.route("/properties/<int:property_id>/photos/presign", methods=["POST"])
+@pre_authorized_cors_preflight
+def presign_property_photo(property_id):
+    data = request.get_json() or {}
+    label = data.get("label")
+    content_type = data.get("content_type")
+    method = (data.get("method") or "put").lower()
+    print(f"[PRESIGN] Property {property_id}: label={label}, content_type={content_type}, size={data.get('size')}")
+
+    if not label or label not in ALLOWED_LABELS:
+        return jsonify({"error": f"Invalid label provided. Allowed labels: {', '.join(ALLOWED_LABELS)}"}), 400
+    if content_type not in PHOTO_CONTENT_TYPES:
+        return jsonify({"error": f"Invalid content_type. Allowed: {', '.join(PHOTO_CONTENT_TYPES)}"}), 400
+    if method not in ("put", "post"):
+        return jsonify({"error": "method must be 'put' or 'post'"}), 400
+    try:
+        size = int(data.get("size"))
+    except (TypeError, ValueError):
+        return jsonify({"error": "size (in bytes) is required"}), 400
+    if size < 1 or size > MAX_PHOTO_BYTES:
+        return jsonify({"error": f"size must be between 1 and {MAX_PHOTO_BYTES} bytes"}), 400
+
+    if not db.session.query(Property.id).filter(Property.id == property_id).first():
+        return jsonify({"error": "Property not found"}), 404
+
+    try:
+        key = new_photo_key(property_id, label, content_type)
+        upload = presign_photo_upload(key, content_type, size, method=method)
+        return jsonify({"key": key, "label": label, "url": public_url(key), "upload": upload}), 200
+    except Exception as e:
+        print(f"[PRESIGN] Error signing upload: {str(e)}")
+        return jsonify({"error": f"Failed to sign upload: {str(e)}"}), 500
+
+@property_bp.route("/properties/<int:property_id>/photos/confirm", methods=["POST"])
+@pre_authorized_cors_preflight
+def confirm_property_photo(property_id):
+    data = request.get_json() or {}
+    key = data.get("key") or ""
+    label = data.get("label")
+    print(f"[PRESIGN] Confirming upload {key} for property {property_id}")
+
+    if not label or label not in ALLOWED_LABELS:
+        return jsonify({"error": f"Invalid label provided. Allowed labels: {', '.join(ALLOWED_LABELS)}"}), 400
+    if not key.startswith(photo_key_prefix(property_id, label)):
+        return jsonify({"error": "key was not issued for this property and label"}), 400
+
+    try:
+        head = head_photo(key)
+    except Exception as e:
+        print(f"[PRESIGN] Uploaded object not found: {str(e)}")
+        return jsonify({"error": "Uploaded object not found"}), 404
+    if head["ContentType"] not in PHOTO_CONTENT_TYPES or head["ContentLength"] > MAX_PHOTO_BYTES:
+        return jsonify({"error": "Uploaded object has an invalid content type or size"}), 400
 
+    try:
+        # Lock the row so concurrent confirms do not overwrite each other's URLs
+        prop = db.session.query(Property).filter(Property.id == property_id).with_for_update().first()
+        if not prop:
+            return jsonify({"error": "Property not found"}), 404
+
+        url = public_url(key)
+        photo_urls = dict(prop.get_photo_urls())
+        existing = photo_urls.get(label) or []
+        existing = [existing] if isinstance(existing, str) else list(existing)
+        if url not in existing:
+            existing.append(url)
+        photo_urls[label] = existing
+        prop.photo_urls = photo_urls
+        db.session.commit()
+        print(f"[PRESIGN] Recorded {url} under {label} for property {property_id}")
+        queue_photo_variants(prop)
+        return jsonify({"message": "Photo recorded", "url": url, "label": label, "photo_urls": photo_urls}), 200
     except Exception as e:
         db.session.rollback()
-        print(f"[BULK UPLOAD] Commit failed: {str(e)}")
-        return jsonify({"error": f"Failed to create properties: {str(e)}"}), 500
+        print(f"[PRESIGN] Error recording photo: {str(e)}")
+        return jsonify({"error": f"Failed to record photo: {str(e)}"}), 500
@@ -0,0 +1,111 @@
+# tests/conftest.py
+# The tests run the real app against a disposable PostgreSQL database named
+# by TEST_DATABASE_URL (its public schema is dropped and rebuilt with the
+# migrations once per run). Without it every test is skipped.
+#
+#   TEST_DATABASE_URL=postgresql://postgres@localhost/crm_test python -m pytest
+
+import os
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import pytest
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+if TEST_DATABASE_URL:
+    # Read by config.py when the app is imported
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+# Keep the background analytics refresh out of the way of the tests
+os.environ.setdefault("ANALYTICS_REFRESH_DELAY", "3600")
+
+
+@pytest.fixture(scope="session")
+def app():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    from sqlalchemy import text
+    from app import app as flask_app
+    from database import db
+    from database.migrate import upgrade
+
+    flask_app.config["TESTING"] = True
+    with flask_app.app_context():
+        with db.engine.begin() as connection:
+            connection.execute(text("DROP SCHEMA IF EXISTS public CASCADE"))
+            connection.execute(text("CREATE SCHEMA public"))
+        upgrade(db.engine)
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    """A test client on an empty database with cold per-worker caches."""
+    from sqlalchemy import text
+    from database import db
+    from helpers.building_cache import invalidate_building_cache
+    from helpers.matching import property_snapshot
+    from helpers.portal_cache import invalidate_portal_cache
+
+    with app.app_context():
+        tables = [table.name for table in db.metadata.sorted_tables if table.name != "schema_migrations"]
+        with db.engine.begin() as connection:
+            connection.execute(text(f"TRUNCATE {', '.join(tables)} RESTART IDENTITY CASCADE"))
+    invalidate_building_cache()
+    invalidate_portal_cache()
+    property_snapshot.mark_stale()
+    return app.test_client()
+
+
+@pytest.fixture
+def sample(app, client):
+    """
+    Three buildings, nine properties and client "ABC" with the first three
+    properties assigned. Returns the ids.
+    """
+    from database import db
+    from models.sql_models import Building, Client, ClientProperty, Property
+
+    with app.app_context():
+        buildings = [Building(name=f"Tower {i}") for i in range(3)]
+        db.session.add_all(buildings)
+        db.session.flush()
+        start = datetime(2024, 1, 1)
+        properties = [
+            Property(
+                property_code=f"P{i:03d}", building_id=buildings[i % 3].id, unit=str(100 + i),
+                bedrooms=1 + i % 3, bathrooms=1, area="SK", status="Available",
+                price=10000 + 1000 * i, size=30 + i, created_at=start + timedelta(minutes=i),
+            )
+            for i in range(9)
+        ]
+        db.session.add_all(properties)
+        db.session.flush()
+        abc = Client(code="ABC", first_name="Ann", last_name="Lee", contact="ann@example.com")
+        db.session.add(abc)
+        db.session.flush()
+        db.session.add_all(ClientProperty(client_id=abc.id, property_id=p.id) for p in properties[:3])
+        db.session.commit()
+        ids = {
+            "building_ids": [b.id for b in buildings],
+            "property_ids": [p.id for p in properties],
+            "client_id": abc.id,
+            "client_code": abc.code,
+        }
+        db.session.remove()
+    return ids
+
+
+@contextmanager
+def counted_queries(app):
+    """
+    count_queries() around test client calls. The requests share this app
+    context (and so its session), which is cleared again afterwards.
+    """
+    from database import db
+    from helpers.query_budget import count_queries
+
+    with app.app_context():
+        try:
+            with count_queries() as counter:
+                yield counter
+        finally:
+            db.session.remove()
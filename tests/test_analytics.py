@@ -0,0 +1,21 @@
+from database import db
+from helpers.analytics import refresh_analytics
+from models.sql_models import Property
+
+
+def test_building_prices_count_listings_with_a_rent_price(app, client, sample):
+    with app.app_context():
+        prop = db.session.get(Property, sample["property_ids"][0])
+        prop.price = None
+        prop.sell_price = 5000000
+        db.session.commit()
+        assert refresh_analytics(db.engine) == "refreshed"
+        db.session.remove()
+
+    response = client.get("/analytics")
+    assert response.status_code == 200
+    buildings = {b["building"]: b for b in response.get_json()["buildings"]}
+    assert buildings["Tower 0"]["listings"] == 3
+    assert buildings["Tower 0"]["rental_priced_listings"] == 2
+    assert buildings["Tower 0"]["for_sale_listings"] == 1
+    assert buildings["Tower 1"]["rental_priced_listings"] == 3
@@ -0,0 +1,27 @@
+from routes import property_routes
+
+
+def bulk(client, body):
+    return client.patch("/properties/bulk", json=body)
+
+
+def prices(client):
+    response = client.get("/properties", query_string={"limit": 50})
+    return {p["property_code"]: p["price"] for p in response.get_json()["properties"]}
+
+
+def test_filter_update_changes_every_match(client, sample):
+    response = bulk(client, {"filter": {"building_id": sample["building_ids"][0]}, "patch": {"price": 20000}})
+    assert response.status_code == 200
+    assert response.get_json()["updated"] == 3
+    changed = {code for code, price in prices(client).items() if price == 20000}
+    assert changed == {"P000", "P003", "P006"}
+
+
+def test_filter_matching_more_than_the_cap_is_refused(client, sample, monkeypatch):
+    monkeypatch.setattr(property_routes, "MAX_BULK_PATCHES", 2)
+    before = prices(client)
+    response = bulk(client, {"filter": {"building_id": sample["building_ids"][0]}, "patch": {"price": 1}})
+    assert response.status_code == 400
+    assert "more than 2" in response.get_json()["error"]
+    assert prices(client) == before
@@ -0,0 +1,117 @@
+def batch(client, method, client_id, body):
+    return client.open(f"/clients/{client_id}/properties/batch", method=method, json=body)
+
+
+def assigned_ids(client, client_id):
+    response = client.get(f"/clients/{client_id}")
+    return sorted(p["id"] for p in response.get_json()["assigned_properties"])
+
+
+def statuses(response):
+    return [(result["property_id"], result["status"]) for result in response.get_json()["results"]]
+
+
+# ----------------------------------------
+# POST: batch assign
+# ----------------------------------------
+def test_batch_assign_reports_every_outcome(client, sample):
+    ids = sample["property_ids"]
+    client_id = sample["client_id"]
+    response = batch(client, "POST", client_id, {"property_ids": [ids[0], ids[3], 99999, "abc", ids[4]]})
+    assert response.status_code == 200
+    assert statuses(response) == [
+        ("abc", "invalid"),
+        (ids[0], "already_assigned"),
+        (ids[3], "assigned"),
+        (99999, "not_found"),
+        (ids[4], "assigned"),
+    ]
+    assert response.get_json()["counts"] == {"invalid": 1, "already_assigned": 1, "assigned": 2, "not_found": 1}
+    assert assigned_ids(client, client_id) == sorted(ids[:5])
+
+
+def test_batch_assign_deduplicates_repeated_ids(client, sample):
+    ids = sample["property_ids"]
+    response = batch(client, "POST", sample["client_id"], {"property_ids": [ids[5], str(ids[5]), ids[5]]})
+    assert statuses(response) == [(ids[5], "assigned")]
+    assert response.get_json()["counts"] == {"assigned": 1}
+
+
+def test_batch_assign_to_an_unknown_client_is_not_found(client, sample):
+    response = batch(client, "POST", 99999, {"property_ids": [sample["property_ids"][0]]})
+    assert response.status_code == 404
+
+
+def test_batch_assign_needs_a_list_of_ids(client, sample):
+    for body in ({}, {"property_ids": []}, {"property_ids": "1,2"}):
+        assert batch(client, "POST", sample["client_id"], body).status_code == 400
+
+
+# ----------------------------------------
+# DELETE: batch remove
+# ----------------------------------------
+def test_batch_remove_reports_every_outcome(client, sample):
+    ids = sample["property_ids"]
+    client_id = sample["client_id"]
+    response = batch(client, "DELETE", client_id, {"property_ids": [ids[1], ids[1], ids[6], None]})
+    assert response.status_code == 200
+    assert statuses(response) == [(None, "invalid"), (ids[1], "removed"), (ids[6], "not_assigned")]
+    assert assigned_ids(client, client_id) == sorted([ids[0], ids[2]])
+
+
+def test_batch_remove_from_an_unknown_client_is_not_found(client, sample):
+    response = batch(client, "DELETE", 99999, {"property_ids": [sample["property_ids"][0]]})
+    assert response.status_code == 404
+
+
+# ----------------------------------------
+# PATCH: batch comments and active flags
+# ----------------------------------------
+def links(client, client_id):
+    response = client.get(f"/clients/{client_id}")
+    return {p["id"]: (p["comment"], p["is_active"]) for p in response.get_json()["assigned_properties"]}
+
+
+def test_batch_update_merges_repeated_ids_later_values_winning(client, sample):
+    ids = sample["property_ids"]
+    client_id = sample["client_id"]
+    response = batch(client, "PATCH", client_id, {"updates": [
+        {"property_id": ids[0], "comment": "first", "is_active": True},
+        {"property_id": ids[1], "comment": "other"},
+        {"property_id": str(ids[0]), "comment": "second"},
+        {"property_id": ids[0], "is_active": False},
+    ]})
+    assert response.status_code == 200
+    assert statuses(response) == [(ids[0], "updated"), (ids[1], "updated")]
+    current = links(client, client_id)
+    assert current[ids[0]] == ("second", False)
+    assert current[ids[1]] == ("other", False)
+    assert current[ids[2]] == (None, False)
+
+
+def test_batch_update_reports_unassigned_and_invalid_ids(client, sample):
+    ids = sample["property_ids"]
+    response = batch(client, "PATCH", sample["client_id"], {"updates": [
+        {"property_id": ids[2], "is_active": True},
+        {"property_id": ids[7], "is_active": True},
+        {"property_id": "x1", "comment": "?"},
+    ]})
+    assert statuses(response) == [("x1", "invalid"), (ids[2], "updated"), (ids[7], "not_assigned")]
+    assert response.get_json()["counts"] == {"invalid": 1, "updated": 1, "not_assigned": 1}
+
+
+def test_batch_update_only_accepts_booleans_for_is_active(client, sample):
+    property_id = sample["property_ids"][0]
+    for value in (0, 1, "true", None):
+        response = batch(client, "PATCH", sample["client_id"], {"updates": [
+            {"property_id": property_id, "is_active": value},
+        ]})
+        assert response.status_code == 400
+    assert links(client, sample["client_id"])[property_id] == (None, False)
+
+
+def test_batch_update_for_an_unknown_client_is_not_found(client, sample):
+    response = batch(client, "PATCH", 99999, {"updates": [
+        {"property_id": sample["property_ids"][0], "is_active": True},
+    ]})
+    assert response.status_code == 404
@@ -0,0 +1,58 @@
+import time
+from datetime import datetime, timedelta
+
+from database import db
+from helpers.jobs import FAILED, JOB_STALE_SECONDS, RUNNING, SUCCEEDED, submit_job
+from models.sql_models import Job
+
+
+def add_job(app, status, heartbeat_age):
+    job_id = f"job-{status}-{heartbeat_age}"
+    with app.app_context():
+        job = Job(
+            id=job_id, kind="test", status=status, processed=0,
+            owner="gone:1", heartbeat_at=datetime.utcnow() - timedelta(seconds=heartbeat_age),
+        )
+        db.session.add(job)
+        db.session.commit()
+        db.session.remove()
+    return job_id
+
+
+def wait_for_job(client, job_id):
+    for _ in range(100):
+        job = client.get(f"/jobs/{job_id}").get_json()
+        if job["status"] in (SUCCEEDED, FAILED):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_job_runs_and_records_its_owner(app, client):
+    with app.app_context():
+        job_id = submit_job("test", lambda context, value: {"value": value}, 3)
+    job = wait_for_job(client, job_id)
+    assert job["status"] == SUCCEEDED
+    assert job["result"] == {"value": 3}
+    assert job["owner"] and job["heartbeat_at"]
+
+
+def test_job_without_heartbeat_is_failed(client):
+    stale = add_job(client.application, RUNNING, JOB_STALE_SECONDS + 60)
+    live = add_job(client.application, RUNNING, 5)
+
+    job = client.get(f"/jobs/{stale}").get_json()
+    assert job["status"] == FAILED
+    assert "heartbeat" in job["errors"][0]["reason"]
+    assert job["finished_at"]
+    assert client.get(f"/jobs/{live}").get_json()["status"] == RUNNING
+
+
+def test_stale_failure_is_not_overwritten_by_a_late_finish(app, client):
+    from helpers.jobs import _update_job
+
+    job_id = add_job(app, RUNNING, JOB_STALE_SECONDS + 60)
+    assert client.get(f"/jobs/{job_id}").get_json()["status"] == FAILED
+    with app.app_context():
+        assert not _update_job(job_id, RUNNING, status=SUCCEEDED)
+    assert client.get(f"/jobs/{job_id}").get_json()["status"] == FAILED
@@ -0,0 +1,32 @@
+from sqlalchemy import inspect
+
+from database import db
+from database.migrate import discover_migrations
+
+
+def test_migrations_build_every_model_column(app):
+    with app.app_context():
+        inspector = inspect(db.engine)
+        for table in db.metadata.sorted_tables:
+            columns = {column["name"] for column in inspector.get_columns(table.name)}
+            assert {column.name for column in table.columns} <= columns, table.name
+
+
+def test_migrations_build_every_model_index(app):
+    with app.app_context():
+        inspector = inspect(db.engine)
+        for table in db.metadata.sorted_tables:
+            indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            assert {index.name for index in table.indexes} <= indexes, table.name
+
+
+def test_migration_versions_are_contiguous():
+    versions = [migration.version for migration in discover_migrations()]
+    assert versions == list(range(1, len(versions) + 1))
+
+
+def test_migrations_make_the_keyset_columns_not_null(app):
+    with app.app_context():
+        columns = {column["name"]: column for column in inspect(db.engine).get_columns("properties")}
+        assert not columns["created_at"]["nullable"]
+        assert not columns["id"]["nullable"]
@@ -0,0 +1,111 @@
+from datetime import datetime
+
+import pytest
+
+from database import db
+from helpers.pagination import decode_cursor, encode_cursor
+from models.sql_models import Property
+
+
+def codes(response):
+    return [p["property_code"] for p in response.get_json()["properties"]]
+
+
+def walk(client, **params):
+    """Every page of GET /properties, following the cursor until it runs out."""
+    pages, cursor = [], None
+    while True:
+        response = client.get("/properties", query_string={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        pages.append(codes(response))
+        cursor = response.get_json()["next"]
+        if cursor is None:
+            return pages
+
+
+def set_columns(app, codes_to_values):
+    with app.app_context():
+        for code, values in codes_to_values.items():
+            db.session.query(Property).filter(Property.property_code == code).update(values)
+        db.session.commit()
+        db.session.remove()
+
+
+def test_cursor_round_trips():
+    created_at = datetime(2024, 1, 1, 12, 30, 15, 123456)
+    token = encode_cursor(created_at, 42)
+    assert "=" not in token
+    assert decode_cursor(token) == (created_at, 42)
+
+
+@pytest.mark.parametrize("token", ["not-a-cursor", encode_cursor(datetime(2024, 1, 1), 1)[:-3], "WzEsMl0"])
+def test_decode_rejects_malformed_cursors(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
+
+
+def test_invalid_cursor_is_a_400(client, sample):
+    response = client.get("/properties", query_string={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Invalid cursor"}
+
+
+def test_pages_cover_every_row_once(client, sample):
+    pages = walk(client, limit=2)
+    assert [len(page) for page in pages] == [2, 2, 2, 2, 1]
+    assert sum(pages, []) == [f"P{i:03d}" for i in range(9)]
+
+
+def test_pages_break_created_at_ties_on_id(app, client, sample):
+    # Four rows share one timestamp and a page boundary falls inside the group
+    tied = datetime(2024, 1, 1, 0, 2)
+    set_columns(app, {f"P{i:03d}": {"created_at": tied} for i in (2, 3, 4, 5)})
+    pages = walk(client, limit=3)
+    assert [len(page) for page in pages] == [3, 3, 3]
+    assert sum(pages, []) == [f"P{i:03d}" for i in range(9)]
+
+
+def test_exact_page_has_no_next_cursor(client, sample):
+    response = client.get("/properties", query_string={"limit": 9})
+    assert len(codes(response)) == 9
+    assert response.get_json()["next"] is None
+
+
+def test_cursor_pages_keep_their_filters(client, sample):
+    pages = walk(client, limit=1, building_id=sample["building_ids"][1])
+    assert pages == [["P001"], ["P004"], ["P007"]]
+
+
+@pytest.mark.parametrize("params, expected", [
+    ({"status": "Rented"}, ["P001", "P005"]),
+    ({"status": ["Rented", "Sold"]}, ["P001", "P005", "P008"]),
+    ({"status": ""}, [f"P{i:03d}" for i in range(9)]),
+    ({"area": "TL"}, ["P002", "P005"]),
+    ({"area": ["TL", "AS"], "status": "Rented"}, ["P005"]),
+    ({"bedrooms": 2}, ["P001", "P004", "P007"]),
+    ({"min_price": 13000, "max_price": 15000}, ["P003", "P004", "P005"]),
+    ({"min_sell_price": 3000000}, ["P007", "P008"]),
+    ({"max_sell_price": 3000000}, ["P006", "P007"]),
+])
+def test_filters(app, client, sample, params, expected):
+    set_columns(app, {
+        "P001": {"status": "Rented"},
+        "P005": {"status": "Rented", "area": "TL"},
+        "P002": {"area": "TL"},
+        "P006": {"sell_price": 2500000},
+        "P007": {"sell_price": 3000000},
+        "P008": {"status": "Sold", "sell_price": 4000000},
+    })
+    response = client.get("/properties", query_string=params)
+    assert response.status_code == 200
+    assert codes(response) == expected
+
+
+def test_building_filter(client, sample):
+    response = client.get("/properties", query_string={"building_id": sample["building_ids"][2]})
+    assert codes(response) == ["P002", "P005", "P008"]
+
+
+@pytest.mark.parametrize("params", [{"bedrooms": "two"}, {"building_id": "x"}, {"min_price": "cheap"}, {"limit": 0}])
+def test_malformed_filters_are_a_400(client, sample, params):
+    assert client.get("/properties", query_string=params).status_code == 400
@@ -0,0 +1,175 @@
+import io
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+import pytest
+from botocore.config import Config as BotoConfig
+from PIL import Image
+
+from database import db
+from helpers import image_variants, storage
+from models.sql_models import Property
+
+moto_server = pytest.importorskip("moto.server")
+
+BUCKET = "test-photos"
+
+
+@pytest.fixture(scope="module")
+def s3_endpoint():
+    server = moto_server.ThreadedMotoServer(port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+    yield f"http://{host}:{port}"
+    server.stop()
+
+
+@pytest.fixture
+def bucket(s3_endpoint, monkeypatch):
+    """Point helpers.storage at a fresh bucket on the moto server."""
+    s3 = boto3.client(
+        "s3", endpoint_url=s3_endpoint, region_name="us-east-1",
+        aws_access_key_id="test", aws_secret_access_key="test",
+        config=BotoConfig(signature_version="s3v4"),
+    )
+    s3.create_bucket(Bucket=BUCKET)
+    monkeypatch.setattr(storage, "s3_client", s3)
+    monkeypatch.setattr(storage, "R2_BUCKET", BUCKET)
+    monkeypatch.setattr(storage, "R2_ENDPOINT", s3_endpoint)
+    # The variant job would download the photo again; not under test here
+    monkeypatch.setattr("routes.property_routes.queue_photo_variants", lambda prop: None)
+    yield s3
+    for item in s3.list_objects_v2(Bucket=BUCKET).get("Contents", []):
+        s3.delete_object(Bucket=BUCKET, Key=item["Key"])
+    s3.delete_bucket(Bucket=BUCKET)
+
+
+def presign(client, property_id, body, label="bedroom"):
+    return client.post(
+        f"/properties/{property_id}/photos/presign",
+        json={"label": label, "content_type": "image/jpeg", "size": len(body)},
+    )
+
+
+def put(upload, body):
+    request = urllib.request.Request(upload["url"], data=body, method="PUT", headers=upload["headers"])
+    with urllib.request.urlopen(request) as response:
+        return response.status
+
+
+def test_presign_put_confirm_records_the_photo(client, sample, bucket):
+    property_id = sample["property_ids"][0]
+    body = b"\xff\xd8\xff" + b"0" * 1024
+    signed = presign(client, property_id, body).get_json()
+    assert signed["key"].startswith(f"properties/{property_id}/bedroom/")
+    assert put(signed["upload"], body) == 200
+
+    response = client.post(
+        f"/properties/{property_id}/photos/confirm", json={"key": signed["key"], "label": "bedroom"}
+    )
+    assert response.status_code == 200
+    assert response.get_json()["photo_urls"]["bedroom"] == [signed["url"]]
+    photo = client.get(f"/properties/{property_id}").get_json()
+    assert signed["url"] in photo["photo_urls"]["bedroom"]
+
+
+def test_confirm_rejects_a_key_for_another_property_or_label(client, sample, bucket):
+    first, second = sample["property_ids"][:2]
+    body = b"0" * 10
+    signed = presign(client, first, body).get_json()
+    put(signed["upload"], body)
+
+    for property_id, label in ((second, "bedroom"), (first, "kitchen")):
+        response = client.post(
+            f"/properties/{property_id}/photos/confirm", json={"key": signed["key"], "label": label}
+        )
+        assert response.status_code == 400
+
+
+def test_confirm_without_an_upload_is_not_found(client, sample, bucket):
+    property_id = sample["property_ids"][0]
+    signed = presign(client, property_id, b"0" * 10).get_json()
+    response = client.post(
+        f"/properties/{property_id}/photos/confirm", json={"key": signed["key"], "label": "bedroom"}
+    )
+    assert response.status_code == 404
+    assert client.get(f"/properties/{property_id}").get_json()["photo_urls"] in ({}, None)
+
+
+class FakeJob:
+    def update(self, **fields):
+        pass
+
+
+def png(size=(40, 30)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, "red").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_variant_job_records_undecodable_photos_and_skips_them(app, sample, bucket, monkeypatch):
+    monkeypatch.setattr(image_variants, "s3_client", bucket)
+    monkeypatch.setattr(image_variants, "R2_BUCKET", BUCKET)
+    # Render in-process; the spawned pool would not see these patches
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(image_variants, "_get_process_pool", lambda: pool)
+    property_id = sample["property_ids"][0]
+    bucket.put_object(Bucket=BUCKET, Key="properties/good.png", Body=png())
+    bucket.put_object(Bucket=BUCKET, Key="properties/bad.heic", Body=b"not an image")
+    good, bad = storage.public_url("properties/good.png"), storage.public_url("properties/bad.heic")
+
+    with app.app_context():
+        prop = db.session.get(Property, property_id)
+        prop.photo_urls = {"main": [good, bad]}
+        db.session.commit()
+        assert image_variants.photo_urls_missing_variants(prop) == [good, bad]
+
+        result = image_variants.generate_photo_variants(FakeJob(), property_id, [good, bad])
+        assert result == {"generated": 1, "failed": 1}
+        prop = db.session.get(Property, property_id)
+        assert set(prop.photo_variants[good]["thumb"]) >= {"webp"}
+        assert "error" in prop.photo_variants[bad]
+        assert image_variants.photo_urls_missing_variants(prop) == []
+        db.session.remove()
+    pool.shutdown()
+
+
+def test_presign_rejects_formats_without_variants(client, sample, bucket):
+    response = client.post(
+        f"/properties/{sample['property_ids'][0]}/photos/presign",
+        json={"label": "main", "content_type": "image/heic", "size": 10},
+    )
+    assert response.status_code == 400
+
+
+def test_bulk_variant_job_renders_a_shared_photo_once(app, sample, bucket, monkeypatch):
+    monkeypatch.setattr(image_variants, "R2_BUCKET", BUCKET)
+    downloads = []
+
+    class CountingClient:
+        def get_object(self, **kwargs):
+            downloads.append(kwargs["Key"])
+            return bucket.get_object(**kwargs)
+
+        def put_object(self, **kwargs):
+            return bucket.put_object(**kwargs)
+
+    monkeypatch.setattr(image_variants, "s3_client", CountingClient())
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(image_variants, "_get_process_pool", lambda: pool)
+    bucket.put_object(Bucket=BUCKET, Key="listings/shared.png", Body=png())
+    shared = storage.public_url("listings/shared.png")
+    first, second = sample["property_ids"][:2]
+
+    with app.app_context():
+        for property_id in (first, second):
+            db.session.get(Property, property_id).photo_urls = {"main": [shared]}
+        db.session.commit()
+        result = image_variants.generate_bulk_photo_variants(FakeJob(), [(first, [shared]), (second, [shared])])
+        assert result == {"properties": 2, "generated": 1, "failed": 0}
+        assert downloads == ["listings/shared.png"]
+        for property_id in (first, second):
+            assert "webp" in db.session.get(Property, property_id).photo_variants[shared]["thumb"]
+        db.session.remove()
+    pool.shutdown()
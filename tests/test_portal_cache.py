@@ -0,0 +1,91 @@
+from types import SimpleNamespace
+
+from conftest import counted_queries
+from database import db
+from helpers import portal_cache
+from models.sql_models import Building, Client, Property
+
+
+def portal(client, headers=None):
+    return client.get("/clients/code/ABC", headers=headers)
+
+
+def served_from_cache(app, client):
+    """GET the portal and report whether it was answered without touching the database."""
+    with counted_queries(app) as counter:
+        response = portal(client)
+    assert response.status_code == 200
+    return counter.count == 0
+
+
+def change(app, model, row_id, **values):
+    with app.app_context():
+        row = db.session.get(model, row_id)
+        for name, value in values.items():
+            setattr(row, name, value)
+        db.session.commit()
+        db.session.remove()
+
+
+def test_repeat_views_are_served_from_the_cache(app, client, sample):
+    first = portal(client)
+    assert first.status_code == 200
+    assert served_from_cache(app, client)
+    assert portal(client).get_data() == first.get_data()
+
+
+def test_client_change_drops_the_entry(app, client, sample):
+    portal(client)
+    change(app, Client, sample["client_id"], first_name="Bea")
+    assert not served_from_cache(app, client)
+    assert portal(client).get_json()["first_name"] == "Bea"
+
+
+def test_assigned_property_change_drops_the_entry(app, client, sample):
+    portal(client)
+    change(app, Property, sample["property_ids"][-1], price=99000)  # not assigned to ABC
+    assert served_from_cache(app, client)
+
+    change(app, Property, sample["property_ids"][0], price=99000)
+    assert not served_from_cache(app, client)
+    prices = {p["property_code"]: p["price"] for p in portal(client).get_json()["assigned_properties"]}
+    assert prices["P000"] == 99000
+
+
+def test_building_change_drops_the_entry(app, client, sample):
+    portal(client)
+    change(app, Building, sample["building_ids"][0], nearest_bts="Asok")
+    assert not served_from_cache(app, client)
+
+
+def test_change_during_a_fill_is_not_stored(app, client, sample):
+    with app.test_request_context("/clients/code/ABC"):
+        cached, generation = portal_cache.cached_portal_response()
+        assert cached is None
+        response = app.response_class(b'{"stale": true}', mimetype="application/json")
+        # A committed change lands while the response is being built
+        portal_cache.invalidate_portal_cache(f"property:{sample['property_ids'][0]}")
+        assert portal_cache.store_portal_response(response, {"client:1"}, generation).status_code == 200
+        assert portal_cache.cached_portal_response() == (None, generation + 1)
+    assert "stale" not in portal(client).get_json()
+
+
+def test_entries_expire_after_the_ttl(app, client, sample, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(portal_cache, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    monkeypatch.setattr(portal_cache, "PORTAL_CACHE_TTL_SECONDS", 60)
+    portal(client)
+    now[0] += 59
+    assert served_from_cache(app, client)
+    now[0] += 2
+    assert not served_from_cache(app, client)
+
+
+def test_matching_etag_gets_a_304(app, client, sample):
+    etag = portal(client).headers["ETag"]
+    with counted_queries(app) as counter:
+        response = portal(client, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.get_data() == b""
+    assert counter.count == 0
+    assert portal(client, headers={"If-None-Match": '"other"'}).status_code == 200
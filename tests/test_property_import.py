@@ -0,0 +1,54 @@
+import pytest
+from flask import Flask
+
+from database import db
+from helpers import image_variants, property_import, storage
+from helpers.bulk_sql import check_upsert_support
+from helpers.property_import import CREATED, INVALID, SKIPPED_DUPLICATE, import_properties
+from models.sql_models import Property
+
+
+def listing(code, building="Tower 0"):
+    return {"property_code": code, "building": building, "unit": "1", "area": "SK", "price": 15000}
+
+
+def test_failed_chunk_keeps_outcomes_found_before_the_error(app, sample, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    rows = [listing("P000"), listing("NEW1"), listing("NEW1"), {"property_code": "BAD"}, listing("NEW2")]
+    with app.app_context():
+        monkeypatch.setattr(property_import, "bump_versions", fail)
+        results = import_properties(rows)
+        assert [r["status"] for r in results] == [
+            SKIPPED_DUPLICATE, INVALID, SKIPPED_DUPLICATE, INVALID, INVALID,
+        ]
+        assert results[1]["reason"] == results[4]["reason"] == "database error: boom"
+        assert db.session.query(Property).filter(Property.property_code.in_(["NEW1", "NEW2"])).count() == 0
+
+        monkeypatch.undo()
+        results = import_properties(rows)
+        assert [r["status"] for r in results] == [
+            SKIPPED_DUPLICATE, CREATED, SKIPPED_DUPLICATE, INVALID, CREATED,
+        ]
+        db.session.remove()
+
+
+def test_unsupported_database_fails_at_startup():
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "mysql://user@localhost/crm"
+    with pytest.raises(RuntimeError, match="mysql"):
+        check_upsert_support(app)
+
+
+def test_created_rows_with_stored_photos_get_variants_queued(app, sample, monkeypatch):
+    queued = []
+    monkeypatch.setattr(storage, "R2_ENDPOINT", "https://r2.example")
+    monkeypatch.setattr(image_variants, "submit_job", lambda kind, func, missing, total: queued.append(missing))
+    photo = {"main": ["https://r2.example/properties/new/main/a.jpg"]}
+    placeholder = {"main": [f"https://r2.example/{storage.PLACEHOLDER_PHOTO_KEY}"]}
+    rows = [dict(listing("NEW1"), photo_urls=photo), listing("NEW2"), listing("P000")]
+    with app.app_context():
+        results = import_properties(rows, default_photo_urls=placeholder)
+        assert queued == [[(results[0]["id"], photo["main"])]]
+        db.session.remove()
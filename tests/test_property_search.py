@@ -0,0 +1,23 @@
+from database import db
+from models.sql_models import Building
+
+
+def search_codes(client, term):
+    response = client.get("/properties/search", query_string={"q": term, "limit": 50})
+    assert response.status_code == 200
+    return sorted(p["property_code"] for p in response.get_json()["properties"])
+
+
+def test_search_matches_building_unit_and_code(client, sample):
+    assert search_codes(client, "tower 1") == ["P001", "P004", "P007"]
+    assert search_codes(client, "P005") == ["P005"]
+    assert search_codes(client, "105") == ["P005"]
+
+
+def test_renaming_a_building_reindexes_its_properties(app, client, sample):
+    with app.app_context():
+        building = db.session.get(Building, sample["building_ids"][1])
+        building.name = "Riverside"
+        db.session.commit()
+    assert search_codes(client, "riverside") == ["P001", "P004", "P007"]
+    assert search_codes(client, "tower 1") == []
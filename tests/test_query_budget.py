@@ -0,0 +1,47 @@
+import pytest
+from conftest import counted_queries
+from helpers.query_budget import QueryBudgetExceeded, query_budget
+
+
+def route_queries(counter):
+    # The version lookup behind ETag/304 (conditional_get) is not part of the
+    # route's own budget
+    return [statement for statement in counter.statements if "resource_versions" not in statement]
+
+
+@pytest.mark.parametrize("warm_building_cache", [False, True])
+def test_get_client_stays_within_two_queries(app, client, sample, warm_building_cache):
+    if warm_building_cache:
+        client.get(f"/buildings/{sample['building_ids'][0]}")
+    with counted_queries(app) as counter:
+        response = client.get(f"/clients/{sample['client_id']}")
+    assert response.status_code == 200
+    assert len(response.get_json()["assigned_properties"]) == 3
+    assert len(route_queries(counter)) == 2
+
+
+@pytest.mark.parametrize("warm_building_cache", [False, True])
+def test_get_client_by_code_stays_within_two_queries(app, client, sample, warm_building_cache):
+    if warm_building_cache:
+        client.get(f"/buildings/{sample['building_ids'][0]}")
+    with counted_queries(app) as counter:
+        response = client.get(f"/clients/code/{sample['client_code']}")
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [p["building"] for p in body["assigned_properties"]] == ["Tower 0", "Tower 1", "Tower 2"]
+    assert body["building"] == "Tower 2"
+    assert len(route_queries(counter)) == 2
+
+
+def test_budget_is_enforced_under_testing(app, client, sample):
+    from database import db
+    from models.sql_models import Property
+
+    @query_budget(1)
+    def two_queries():
+        db.session.query(Property).first()
+        db.session.query(Property).count()
+
+    with app.test_request_context("/"):
+        with pytest.raises(QueryBudgetExceeded):
+            two_queries()
@@ -0,0 +1,32 @@
+from sqlalchemy.orm import load_only
+
+from database import db
+from helpers.serializers import serialize_assigned_property, serialize_property
+from models.sql_models import ClientProperty, Property
+
+
+def test_expired_attributes_are_reloaded(app, sample):
+    with app.app_context():
+        prop = db.session.get(Property, sample["property_ids"][0])
+        db.session.execute(
+            Property.__table__.update().where(Property.id == prop.id).values(unit="9Z", price=12345)
+        )
+        db.session.commit()  # expires prop
+        data = serialize_property(prop)
+        assert (data["unit"], data["price"], data["building"]) == ("9Z", 12345.0, "Tower 0")
+        db.session.remove()
+
+
+def test_unloaded_columns_and_relationships_are_loaded_on_read(app, sample):
+    with app.app_context():
+        prop = (
+            db.session.query(Property).options(load_only(Property.id))
+            .filter(Property.id == sample["property_ids"][1]).one()
+        )
+        assert serialize_property(prop)["property_code"] == "P001"
+
+        link = db.session.query(ClientProperty).filter(ClientProperty.client_id == sample["client_id"]).first()
+        data = serialize_assigned_property(link)
+        assert data["property_code"] == link.property.property_code
+        assert data["is_active"] is False
+        db.session.remove()
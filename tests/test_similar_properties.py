@@ -0,0 +1,42 @@
+from sqlalchemy import text
+
+from database import db
+from models.sql_models import Building
+
+
+def embeddings(app, building_id):
+    with app.app_context():
+        rows = db.session.execute(
+            text("SELECT id, embedding::text, updated_at FROM properties WHERE building_id = :b ORDER BY id"),
+            {"b": building_id},
+        ).all()
+        db.session.remove()
+    return rows
+
+
+def test_similar_returns_nearest_neighbours(client, sample):
+    property_id = sample["property_ids"][0]
+    response = client.get(f"/properties/{property_id}/similar")
+    assert response.status_code == 200
+    similar = response.get_json()["similar"]
+    assert similar and property_id not in [p["id"] for p in similar]
+    assert [p["distance"] for p in similar] == sorted(p["distance"] for p in similar)
+
+
+def test_building_distances_reembed_only_the_embedding(app, client, sample):
+    building_id = sample["building_ids"][1]
+    before = embeddings(app, building_id)
+    with app.app_context():
+        building = db.session.get(Building, building_id)
+        building.distance_to_bts = 0.2
+        db.session.commit()
+    after = embeddings(app, building_id)
+    assert [row.id for row in after] == [row.id for row in before]
+    assert all(new.embedding != old.embedding for new, old in zip(after, before))
+    assert [row.updated_at for row in after] == [row.updated_at for row in before]
+
+    # The property trigger and the building trigger agree on the vector
+    with app.app_context():
+        db.session.execute(text("UPDATE properties SET price = price WHERE building_id = :b"), {"b": building_id})
+        db.session.commit()
+    assert embeddings(app, building_id) == after
@@ -0,0 +1,79 @@
+import re
+
+import pytest
+
+from conftest import counted_queries
+
+
+def selected_columns(counter, table):
+    """Columns of table in the SELECT list of the statement that reads it."""
+    for statement in counter.statements:
+        head, _, rest = " ".join(statement.split()).partition(" FROM ")
+        if re.match(rf"{table}\b", rest) and head.startswith("SELECT"):
+            return set(re.findall(rf"\b{table}\.(\w+)", head))
+    raise AssertionError(f"no SELECT from {table}")
+
+
+def get(app, client, url, **params):
+    with counted_queries(app) as counter:
+        response = client.get(url, query_string=params)
+    assert response.status_code == 200
+    return response.get_json(), counter
+
+
+def test_property_list_narrows_keys_and_columns(app, client, sample):
+    data, counter = get(app, client, "/properties", fields="id,property_code,price")
+    assert [set(p) for p in data["properties"]] == [{"id", "property_code", "price"}] * 9
+    # created_at is loaded as well for the keyset cursor
+    assert selected_columns(counter, "properties") == {"id", "property_code", "price", "created_at"}
+
+
+def test_computed_fields_load_the_columns_they_read(app, client, sample):
+    data, counter = get(app, client, "/properties", fields="building", limit=1)
+    assert data["properties"] == [{"building": "Tower 0"}]
+    assert selected_columns(counter, "properties") == {"id", "building_id", "building_name", "created_at"}
+
+
+def test_property_detail_narrows_keys_and_columns(app, client, sample):
+    data, counter = get(app, client, f"/properties/{sample['property_ids'][0]}", fields="unit,status")
+    assert data == {"unit": "100", "status": "Available"}
+    assert selected_columns(counter, "properties") == {"id", "unit", "status"}
+
+
+def test_client_list_narrows_keys_and_columns(app, client, sample):
+    data, counter = get(app, client, "/clients", fields="code")
+    assert data == [{"code": "ABC"}]
+    assert selected_columns(counter, "clients") == {"id", "code"}
+
+
+def test_client_detail_skips_unrequested_assignments(app, client, sample):
+    data, counter = get(app, client, f"/clients/{sample['client_id']}", fields="code,first_name")
+    assert data == {"code": "ABC", "first_name": "Ann"}
+    assert selected_columns(counter, "clients") == {"id", "code", "first_name"}
+    assert not any("client_properties" in statement for statement in counter.statements)
+
+
+def test_building_list_narrows_keys(app, client, sample):
+    data, _ = get(app, client, "/buildings", fields="id,name")
+    assert data == [{"id": b, "name": f"Tower {i}"} for i, b in enumerate(sample["building_ids"])]
+
+
+def test_without_fields_every_key_is_returned(app, client, sample):
+    data, counter = get(app, client, "/properties", limit=1)
+    assert {"owner", "photo_urls", "photo_variants", "preferred_tenant"} <= set(data["properties"][0])
+    assert {"owner", "photo_urls", "photo_variants"} <= selected_columns(counter, "properties")
+
+
+@pytest.mark.parametrize("url", [
+    "/properties", "/properties/{property_id}", "/clients", "/clients/{client_id}", "/buildings",
+])
+def test_unknown_field_is_a_400(client, sample, url):
+    url = url.format(property_id=sample["property_ids"][0], client_id=sample["client_id"])
+    response = client.get(url, query_string={"fields": "id,nope"})
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Unknown field(s): nope"}
+
+
+def test_empty_field_list_is_a_400(client, sample):
+    response = client.get("/properties", query_string={"fields": " , "})
+    assert response.status_code == 400
@@ -0,0 +1,68 @@
+import io
+
+from database import db
+from models.sql_models import Building, Property
+
+HEADER = "Property Code,Building,Building ID,Unit,Area,Price\n"
+
+
+def upload_csv(client, body):
+    return client.post(
+        "/properties/import",
+        data={"file": (io.BytesIO((HEADER + body).encode()), "listings.csv")},
+        content_type="multipart/form-data",
+    )
+
+
+def test_csv_import_merges_valid_rows_and_reports_rejects(app, client, sample):
+    tower_0 = sample["building_ids"][0]
+    rows = [
+        f"N001,,{tower_0},1A,SK,15000",  # row 2: created in an existing building
+        "N002,Harbour View,,2B,SK,18000",  # row 3: created with a new building
+        "N001,Harbour View,,3C,SK,19000",  # row 4: repeated earlier in the file
+        "P000,Harbour View,,4D,SK,20000",  # row 5: already exists
+        "N003,,99999,5E,SK,21000",  # row 6: unknown building id
+        "N004,Harbour View,,,SK,22000",  # row 7: missing unit
+        "N005,Harbour View,,7G,SK,not-a-number",  # row 8: bad price
+    ]
+    response = upload_csv(client, "\n".join(rows) + "\n")
+    assert response.status_code == 201
+    report = response.get_json()
+    assert report["counts"] == {"created": 2, "skipped_duplicate": 2, "invalid": 3}
+    assert report["buildings_created"] == 1
+    assert [(error["row"], error["property_code"], error["status"]) for error in report["errors"]] == [
+        (4, "N001", "skipped_duplicate"),
+        (5, "P000", "skipped_duplicate"),
+        (6, "N003", "invalid"),
+        (7, "N004", "invalid"),
+        (8, "N005", "invalid"),
+    ]
+    assert report["errors"][2]["reason"] == "building_id does not exist"
+
+    with app.app_context():
+        created = {
+            prop.property_code: (prop.unit, prop.building.name, float(prop.price))
+            for prop in db.session.query(Property).filter(Property.property_code.in_(["N001", "N002"]))
+        }
+        assert created == {"N001": ("1A", "Tower 0", 15000.0), "N002": ("2B", "Harbour View", 18000.0)}
+        assert db.session.query(Property).filter(Property.property_code == "P000").one().unit == "100"
+        assert db.session.query(Building).count() == 4
+        db.session.remove()
+
+
+def test_merged_rows_get_variants_for_stored_default_photos(app, client, sample, monkeypatch):
+    from helpers import image_variants, storage
+    from helpers.spreadsheet_import import import_spreadsheet
+
+    queued = []
+    monkeypatch.setattr(storage, "R2_ENDPOINT", "https://r2.example")
+    monkeypatch.setattr(image_variants, "submit_job", lambda kind, func, missing, total: queued.append(missing))
+    rows = [(2, {"property_code": "N001", "building": "Tower 0", "unit": "1A"}),
+            (3, {"property_code": "N002", "building": "Tower 1", "unit": "2B"})]
+    photo = {"main": ["https://r2.example/listings/default.jpg"]}
+    with app.app_context():
+        assert import_spreadsheet(iter(rows), default_photo_urls=photo)["counts"]["created"] == 2
+        new = db.session.query(Property.id).filter(Property.property_code.in_(["N001", "N002"]))
+        ids = [prop_id for prop_id, in new.order_by(Property.id)]
+        assert queued == [[(prop_id, photo["main"]) for prop_id in ids]]
+        db.session.remove()
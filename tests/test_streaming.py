@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+from database import db
+from helpers.streaming import stream_query
+from models.sql_models import Property
+
+
+def ordered_properties():
+    return db.session.query(Property).order_by(Property.id)
+
+
+def serialize_until(limit):
+    seen = []
+
+    def serialize(prop):
+        if len(seen) == limit:
+            raise RuntimeError("bad row")
+        seen.append(prop.id)
+        return {"code": prop.property_code}
+
+    return serialize
+
+
+def test_streams_every_property_as_ndjson(client, sample):
+    response = client.get("/properties", headers={"Accept": "application/x-ndjson"})
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert sorted(p["property_code"] for p in lines) == [f"P{i:03d}" for i in range(9)]
+
+
+def test_failure_in_the_first_batch_raises_before_the_response(app, sample):
+    with app.test_request_context():
+        with pytest.raises(RuntimeError, match="bad row"):
+            stream_query(ordered_properties(), serialize_until(1), "ndjson", batch_size=4)
+        db.session.remove()
+
+
+@pytest.mark.parametrize("fmt", ["ndjson", "array"])
+def test_failure_mid_stream_ends_with_an_error_marker(app, sample, fmt):
+    with app.test_request_context():
+        response = stream_query(ordered_properties(), serialize_until(5), fmt, batch_size=2)
+        body = "".join(chunk if isinstance(chunk, str) else chunk.decode() for chunk in response.response)
+        db.session.remove()
+    if fmt == "ndjson":
+        lines = [json.loads(line) for line in body.splitlines()]
+    else:
+        assert not body.endswith("]")
+        lines = json.loads(body + "]")
+    assert lines[:4] == [{"code": f"P{i:03d}"} for i in range(4)]
+    assert lines[-1] == {"error": "Stream failed: bad row"}
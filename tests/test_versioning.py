@@ -0,0 +1,47 @@
+from database import db
+from helpers.versioning import bump_versions
+from models.sql_models import Property, ResourceVersion
+
+
+def versions(session, *keys):
+    rows = session.query(ResourceVersion).filter(ResourceVersion.resource.in_(keys))
+    return {row.resource: row.version for row in rows}
+
+
+def test_collection_keys_are_bumped_at_commit(app, sample):
+    property_id = sample["property_ids"][0]
+    key = f"property:{property_id}"
+    with app.app_context():
+        before = versions(db.session, "properties", key)
+        db.session.rollback()
+
+        bump_versions(db.session, ["properties", key])
+        during = versions(db.session, "properties", key)
+        assert during[key] == before.get(key, 0) + 1
+        assert during.get("properties") == before.get("properties")
+
+        db.session.commit()
+        after = versions(db.session, "properties", key)
+        assert after == {"properties": before["properties"] + 1, key: before.get(key, 0) + 1}
+        db.session.remove()
+
+
+def test_orm_writes_bump_the_collection_once_per_commit(app, sample):
+    with app.app_context():
+        before = versions(db.session, "properties")["properties"]
+        for property_id in sample["property_ids"][:3]:
+            db.session.get(Property, property_id).status = "Rented"
+            db.session.flush()
+        db.session.commit()
+        assert versions(db.session, "properties")["properties"] == before + 1
+        db.session.remove()
+
+
+def test_rolled_back_collection_bumps_are_dropped(app, sample):
+    with app.app_context():
+        before = versions(db.session, "properties")["properties"]
+        bump_versions(db.session, ["properties"])
+        db.session.rollback()
+        db.session.commit()
+        assert versions(db.session, "properties")["properties"] == before
+        db.session.remove()